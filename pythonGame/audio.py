@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pygame
+
+# 音效管理：混音器初始化和 WAV 解码放在后台线程中进行，不阻塞第一帧画面
+# 加载完成之前 play() 什么也不做；某个文件不存在或没有音频设备时，对应的音效保持静音。
+#
+# play() 只是登记本帧要播放的音效，每帧调用一次 flush() 统一播放：
+#   - 同一帧中重复的音效合并为一次
+#   - 同一个音效两次播放之间至少间隔 SOUND_INTERVALS 秒，连续按跳跃键不会刷屏
+#   - 使用固定数量的声道，声道都在播放时，优先级高的音效（游戏结束）抢占优先级最低的声道，
+#     否则丢弃新的音效
+
+SOUND_FILES = {
+    "jump": "sounds/jump.wav",
+    "collect": "sounds/collect.wav",
+    "explosion": "sounds/explosion.wav",
+    "power_up": "sounds/power_up.wav",
+    "game_over": "sounds/game_over.wav",
+}
+
+# 优先级，数值越大越重要
+SOUND_PRIORITIES = {
+    "jump": 0,
+    "collect": 1,
+    "power_up": 2,
+    "explosion": 3,
+    "game_over": 4,
+}
+
+# 同一个音效的最短间隔（秒）
+SOUND_INTERVALS = {
+    "jump": 0.08,
+    "collect": 0.05,
+    "power_up": 0.1,
+    "explosion": 0.1,
+    "game_over": 0.5,
+}
+
+# 声道数量
+SOUND_CHANNELS = 8
+
+class Sounds:
+    def __init__(self, files=SOUND_FILES, channels=SOUND_CHANNELS, priorities=SOUND_PRIORITIES,
+                 intervals=SOUND_INTERVALS, clock=time.perf_counter):
+        self.files = files
+        self.channel_count = channels
+        self.priorities = priorities
+        self.intervals = intervals
+        self.clock = clock
+        self.sounds = {}
+        self.loaded = threading.Event()
+        self.thread = None
+
+        # 声道池和每个声道正在播放的音效的优先级
+        self.channels = []
+        self.channel_priority = []
+        # 本帧登记的音效和每个音效上次播放的时间
+        self.pending = set()
+        self.last_played = {}
+
+        # 统计：播放、合并、因间隔过短跳过、因没有空闲声道丢弃、抢占声道的次数
+        self.played = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.dropped = 0
+        self.preempted = 0
+
+    # 在后台线程中初始化混音器并加载音效
+    def start(self):
+        self.thread = threading.Thread(target=self._load, name="sound-loader", daemon=True)
+        self.thread.start()
+
+    def _load(self):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.set_num_channels(self.channel_count)
+            channels = [pygame.mixer.Channel(k) for k in range(self.channel_count)]
+            sounds = {}
+            for name, path in self.files.items():
+                try:
+                    sounds[name] = pygame.mixer.Sound(path)
+                except (pygame.error, OSError):
+                    pass
+            self.channels = channels
+            self.channel_priority = [0] * len(channels)
+            self.sounds = sounds
+        except pygame.error:
+            pass
+        finally:
+            self.loaded.set()
+
+    # 等待加载完成（测试或需要立即播放时使用），返回是否在 timeout 秒内完成
+    def wait(self, timeout=None):
+        return self.loaded.wait(timeout)
+
+    # 登记一个音效，由 flush() 播放
+    def play(self, name):
+        if name not in self.sounds:
+            return
+        if name in self.pending:
+            self.coalesced += 1
+        else:
+            self.pending.add(name)
+
+    # 播放本帧登记的音效，优先级高的先播放
+    def flush(self):
+        if not self.pending:
+            return
+        priorities = self.priorities
+        now = self.clock()
+        for name in sorted(self.pending, key=lambda name: -priorities.get(name, 0)):
+            last = self.last_played.get(name)
+            if last is not None and now - last < self.intervals.get(name, 0):
+                self.throttled += 1
+                continue
+            priority = priorities.get(name, 0)
+            channel = self._channel(priority)
+            if channel is None:
+                self.dropped += 1
+                continue
+            self.channels[channel].play(self.sounds[name])
+            self.channel_priority[channel] = priority
+            self.last_played[name] = now
+            self.played += 1
+        self.pending.clear()
+
+    # 空闲的声道；没有空闲声道时抢占优先级更低的声道，都不低于 priority 时返回 None
+    def _channel(self, priority):
+        channels = self.channels
+        for index, channel in enumerate(channels):
+            if not channel.get_busy():
+                return index
+        if not channels:
+            return None
+        lowest = min(range(len(channels)), key=self.channel_priority.__getitem__)
+        if self.channel_priority[lowest] >= priority:
+            return None
+        self.preempted += 1
+        return lowest
+
+    def stats(self):
+        return {
+            "played": self.played,
+            "coalesced": self.coalesced,
+            "throttled": self.throttled,
+            "dropped": self.dropped,
+            "preempted": self.preempted,
+        }
@@ -0,0 +1,236 @@
+import math
+import os
+import weakref
+
+import pygame
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# 渲染后端：render.Renderer 决定画什么、画在哪里，后端负责怎样把画面交给屏幕。
+# Renderer 通过后端的 canvas 绘制，canvas 提供 pygame.Surface 中用到的那部分接口
+# （blit、blits、fill、get_size 等），所以精灵缓存、文字缓存和背景层不需要知道用的是哪个后端。
+#
+#   SurfaceBackend  软件渲染：画到显示窗口的 Surface 上，用 display.flip()/update() 提交，支持脏矩形
+#   TextureBackend  pygame._sdl2.video 的 Renderer/Texture：每个精灵第一次用到时上传为纹理，
+#                   之后每次绘制只是一次纹理复制，由 SDL 合批提交；旋转障碍物用一张纹理按角度旋转绘制。
+#                   有显卡加速时使用加速的驱动，没有时（或 accelerated=0）使用 SDL 的软件渲染器
+#
+# 后端在启动时选择（settings.RENDER_BACKEND 或 python sky_robot_game.py --backend texture）。
+# python backends.py 用两个后端绘制同样的画面并比较像素（parity()）
+
+SURFACE = "surface"
+TEXTURE = "texture"
+BACKENDS = (SURFACE, TEXTURE)
+
+class SurfaceBackend:
+    name = SURFACE
+    # 可以只提交有变化的区域（脏矩形）
+    partial_updates = True
+    # canvas 支持 blit_rotated()
+    rotation = False
+    # canvas 是 pygame.Surface，可以直接用 pygame.draw 绘制
+    primitives = True
+
+    def __init__(self, screen):
+        self.canvas = screen
+
+    # 与画布同样大小和格式的离屏图层（Renderer 的背景缓存）
+    def layer(self):
+        return pygame.Surface(self.canvas.get_size(), 0, self.canvas)
+
+    # rects 为 None 时提交整个画面
+    def present(self, rects=None):
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    # 当前画面的像素，用于比较
+    def read_pixels(self):
+        return self.canvas.copy()
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+# 纹理画布：接口与 pygame.Surface 的 blit 等方法相同，绘制变成纹理复制。
+# 纹理按 Surface 对象缓存，Surface 释放后纹理也随之释放；
+# 所以画到这里的 Surface 在第一次绘制之后不能再修改（精灵、文字、背景层都满足这一点）
+class TextureCanvas:
+    def __init__(self, renderer, size):
+        from pygame._sdl2.video import Texture
+
+        self.Texture = Texture
+        self.renderer = renderer
+        self.size = size
+        self.rect = pygame.Rect((0, 0), size)
+        self.textures = weakref.WeakKeyDictionary()
+        # 统计：上传的纹理数、纹理复制次数
+        self.uploads = 0
+        self.copies = 0
+
+    def texture(self, surface):
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self.textures[surface] = self.Texture.from_surface(self.renderer, surface)
+            self.uploads += 1
+        return texture
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self):
+        return self.rect.copy()
+
+    # 与 Surface.blit 相同，返回画面上被覆盖的区域
+    def blit(self, source, dest, area=None):
+        texture = self.texture(source)
+        if area is None:
+            rect = pygame.Rect(dest[0], dest[1], texture.width, texture.height)
+        else:
+            area = pygame.Rect(area).clip(0, 0, texture.width, texture.height)
+            rect = pygame.Rect(dest[0], dest[1], area.width, area.height)
+        texture.draw(area, rect)
+        self.copies += 1
+        return rect.clip(self.rect)
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = [self.blit(*arguments) for arguments in blit_sequence]
+        return rects if doreturn else None
+
+    # 把 source 绕自身的中心点顺时针旋转 angle（弧度）后画在 center 处
+    def blit_rotated(self, source, center, angle):
+        texture = self.texture(source)
+        width, height = texture.width, texture.height
+        rect = pygame.Rect(center[0] - width // 2, center[1] - height // 2, width, height)
+        texture.draw(None, rect, math.degrees(angle), (width // 2, height // 2))
+        self.copies += 1
+        return rect.clip(self.rect)
+
+    def fill(self, color, rect=None):
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            renderer.clear()
+            return self.rect.copy()
+        rect = pygame.Rect(rect).clip(self.rect)
+        renderer.fill_rect(rect)
+        return rect
+
+class TextureBackend:
+    name = TEXTURE
+    # 每帧都重新绘制整个画面，不使用脏矩形
+    partial_updates = False
+    rotation = True
+    primitives = False
+
+    # accelerated：-1 自动选择，1 只用显卡加速的驱动，0 使用软件渲染器；hidden：不显示窗口（比较像素时使用）；
+    # window_size：窗口大小，与 size 不同时由 SDL 按比例缩放（保持宽高比，留黑边）
+    def __init__(self, size=(SCREEN_WIDTH, SCREEN_HEIGHT), title="", accelerated=-1, vsync=False, hidden=False,
+                 window_size=None):
+        from pygame._sdl2.video import Window, Renderer
+
+        # 连续的纹理复制合成一批提交给显卡
+        os.environ.setdefault("SDL_RENDER_BATCHING", "1")
+        self.window = Window(title, size=window_size or size, hidden=hidden)
+        self.renderer = Renderer(self.window, accelerated=accelerated, vsync=vsync)
+        if window_size is not None and tuple(window_size) != tuple(size):
+            self.renderer.logical_size = size
+        self.canvas = TextureCanvas(self.renderer, size)
+
+    def present(self, rects=None):
+        self.renderer.present()
+
+    def read_pixels(self):
+        return self.renderer.to_surface()
+
+    def stats(self):
+        return {"textures": len(self.canvas.textures), "uploads": self.canvas.uploads, "copies": self.canvas.copies}
+
+    def close(self):
+        self.window.destroy()
+
+# ---- 比较 ----
+
+# 两个画面中任一通道相差超过 tolerance 的像素所占的比例，以及最大的差值
+def compare_pixels(first, second, tolerance=2):
+    import numpy as np
+
+    a = pygame.surfarray.pixels3d(first).astype(np.int16)
+    b = pygame.surfarray.pixels3d(second).astype(np.int16)
+    difference = np.abs(a - b).max(axis=2)
+    return float((difference > tolerance).mean()), int(difference.max())
+
+# 用软件渲染和隐藏窗口中的 TextureBackend 绘制同样的画面（菜单、游戏中的几个时刻、结束画面），
+# 返回 [(画面名, 不同像素的比例, 最大差值)]。
+# 纹理的透明混合与 pygame 的软件混合在取整上可能差 1，旋转障碍物的纹理旋转与按角度重画的叶片边缘略有不同，
+# 所以按 tolerance 和 PARITY_MAX_FRACTION 判断是否一致
+PARITY_MAX_FRACTION = 0.005
+
+def parity(seed=0, steps=(1, 120, 400), tolerance=2, accelerated=0):
+    import random
+
+    from world import World
+    from particles import ParticleSystem
+    from render import Renderer
+    from sky_robot_game import handle_events
+    from audio import Sounds
+
+    pygame.display.init()
+    pygame.font.init()
+    texture = TextureBackend(hidden=True, accelerated=accelerated)
+    surface = SurfaceBackend(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)))
+    renderers = [Renderer(backend=surface), Renderer(backend=texture)]
+    for renderer in renderers:
+        renderer.set_dirty_rects(False)
+        renderer.prepare()
+
+    def draw(name, paint):
+        frames = []
+        for renderer in renderers:
+            paint(renderer)
+            frames.append(renderer.backend.read_pixels())
+        results.append((name,) + compare_pixels(frames[0], frames[1], tolerance))
+
+    results = []
+    draw("menu", lambda renderer: renderer.draw_menu(["开始游戏", "退出"], 0, 42, 10))
+
+    world = World(rng=random.Random(seed))
+    particles = ParticleSystem()
+    particles.seed(seed)
+    silent = Sounds()
+    step = 0
+    for target in steps:
+        while step < target and not world.game_over:
+            world.robot.lives = 3
+            robot = world.robot
+            handle_events(world.step(robot.y > SCREEN_HEIGHT / 2 and robot.velocity > 0), particles, silent)
+            particles.update()
+            step += 1
+        draw("step %d" % step, lambda renderer: renderer.draw_world(world, particles, step, 0.5))
+
+    draw("game over", lambda renderer: renderer.draw_game_over(world.score, 99, 700))
+    texture.close()
+    return results
+
+if __name__ == "__main__":
+    import sys
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+    # 软件渲染和纹理后端的像素比较：python backends.py [种子]，不同像素超过 0.5% 时退出码为 1
+    failed = False
+    for name, fraction, largest in parity(int(sys.argv[1]) if len(sys.argv) > 1 else 0):
+        ok = fraction <= PARITY_MAX_FRACTION
+        failed |= not ok
+        print("%-10s 不同像素 %.3f%%，最大差值 %3d  %s" % (name, fraction * 100, largest, "一致" if ok else "不一致"))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,122 @@
+import math
+
+import pygame
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLACK, SKY_BLUE
+from sprites import display_format
+
+# 视差背景层：云层预先渲染成一张可以首尾相接的宽图，每帧只按偏移量 blit 两次，开销与云朵的数量无关。
+# 星星闪烁的动画预先烘焙成一个小的循环，每颗星星每个阶段一张小图
+
+class ParallaxLayer:
+    # frames：一张或多张等宽的平铺图（多张时循环播放）
+    # scroll_divisor：每多少帧移动一个像素；direction：-1 向左滚动，1 向右滚动
+    # cycle：动画循环一次的帧数
+    def __init__(self, frames, y=0, scroll_divisor=1, direction=-1, cycle=1, origin=0):
+        self.frames = frames
+        self.y = y
+        self.scroll_divisor = scroll_divisor
+        self.direction = direction
+        self.cycle = cycle
+        self.origin = origin
+        self.width = frames[0].get_width()
+        self.height = frames[0].get_height()
+
+    def frame_at(self, frame_count):
+        if len(self.frames) == 1:
+            index = 0
+        else:
+            index = (frame_count % self.cycle) * len(self.frames) // self.cycle
+        return self.frames[index]
+
+    # 把这一层画到 surface 上，返回覆盖的区域
+    def draw(self, surface, frame_count):
+        tile = self.frame_at(frame_count)
+        offset = (self.origin + frame_count // self.scroll_divisor) % self.width
+        x = -offset if self.direction < 0 else offset - self.width
+        target_width = surface.get_width()
+        while x < target_width:
+            surface.blit(tile, (x, self.y))
+            x += self.width
+        return pygame.Rect(0, self.y, target_width, self.height)
+
+# 云层：count 朵云，间距 spacing，连同天空底色一起渲染成不透明的横条
+# 每两帧向左移动一个像素，与原来的 draw_clouds 速度相同
+CLOUD_LAYER_HEIGHT = 100
+
+def make_cloud_layer(count=5, spacing=200):
+    width = max(count * spacing, SCREEN_WIDTH)
+    tile = pygame.Surface((width, CLOUD_LAYER_HEIGHT))
+    tile.fill(SKY_BLUE)
+    for k in range(count):
+        cloud_x = k * spacing
+        pygame.draw.ellipse(tile, WHITE, (cloud_x, 50, 100, 50))
+        pygame.draw.ellipse(tile, WHITE, (cloud_x + 25, 25, 70, 60))
+        pygame.draw.ellipse(tile, WHITE, (cloud_x + 50, 40, 80, 50))
+    return ParallaxLayer([display_format(tile)], scroll_divisor=2, origin=100)
+
+# 星空：count 颗星星，位置与闪烁规律与原来的 draw_stars 相同，每四帧向右移动一个像素。
+# 大小和亮度的周期分别约为 125.7 帧和 314.2 帧，两者在 628.3 帧后同时回到起点，
+# 这一个循环分成 frames 个阶段。星星很稀疏，不烘焙整屏的图，而是每颗星星每个阶段烘焙一张
+# 只有几个像素的小图，绘制时逐颗 blit，叠加在黑色底色上
+STAR_CYCLE = 2 * math.pi / 0.01
+GRAY_PALETTE = [(level, level, level) for level in range(256)]
+
+class StarLayer:
+    # sprites[phase]：这一阶段每颗星星的 (小图, x, y)，x、y 是小图在整屏平铺图中的位置
+    def __init__(self, sprites, width, height, scroll_divisor=4, cycle=1):
+        self.sprites = sprites
+        self.width = width
+        self.height = height
+        self.scroll_divisor = scroll_divisor
+        self.cycle = cycle
+
+    def draw(self, surface, frame_count):
+        sprites = self.sprites[(frame_count % self.cycle) * len(self.sprites) // self.cycle]
+        # 与向右滚动的平铺图相同：第一份从 offset - width 开始，直到铺满 surface
+        offset = (frame_count // self.scroll_divisor) % self.width
+        target_width = surface.get_width()
+        blit = surface.blit
+        x = offset - self.width
+        while x < target_width:
+            for sprite, sprite_x, sprite_y in sprites:
+                left = x + sprite_x
+                if left < target_width and left + sprite.get_width() > 0:
+                    blit(sprite, (left, sprite_y))
+            x += self.width
+        return pygame.Rect(0, 0, target_width, self.height)
+
+# 在整屏平铺图中 (x, y) 处画一颗星星，只保留画出来的像素；
+# 超出平铺图边界的部分与原来一样被裁掉。什么都没有画出来时返回 None
+def bake_star(x, y, radius, color, width, height):
+    size = 2 * radius + 3
+    left, top = x - radius - 1, y - radius - 1
+    sprite = pygame.Surface((size, size), 0, 8)
+    sprite.set_palette(GRAY_PALETTE)
+    sprite.fill(BLACK)
+    sprite.set_colorkey(BLACK)
+    sprite.set_clip(pygame.Rect(-left, -top, width, height))
+    pygame.draw.circle(sprite, color, (radius + 1, radius + 1), radius)
+    area = sprite.get_bounding_rect()
+    if not area.width or not area.height:
+        return None
+    sprite = display_format(sprite.subsurface(area).copy())
+    sprite.set_colorkey(BLACK, pygame.RLEACCEL)
+    return sprite, left + area.x, top + area.y
+
+def make_star_layer(count=30, frames=24):
+    phases = []
+    for phase in range(frames):
+        frame_count = phase * STAR_CYCLE / frames
+        sprites = []
+        for i in range(count):
+            x = (i * 30) % SCREEN_WIDTH
+            y = (i * 25) % SCREEN_HEIGHT
+            size = 1 + math.sin(frame_count * 0.05 + i) * 1
+            brightness = 128 + int(math.sin(frame_count * 0.02 + i * 0.5) * 127)
+            color = (brightness, brightness, brightness)
+            star = bake_star(int(x), int(y), int(size), color, SCREEN_WIDTH, SCREEN_HEIGHT)
+            if star is not None:
+                sprites.append(star)
+        phases.append(sprites)
+    return StarLayer(phases, SCREEN_WIDTH, SCREEN_HEIGHT, scroll_divisor=4, cycle=round(STAR_CYCLE))
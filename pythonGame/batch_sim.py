@@ -0,0 +1,531 @@
+import random
+
+import numpy as np
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from world import World, OBSTACLE_TYPES, OBSTACLE_WEIGHTS, ITEM_TYPES, ITEM_WEIGHTS, min_spawn_rate
+from schedule import SpawnSchedule
+from entities import SpinningObstacle, blade_offsets
+
+# NumPy 批量模拟器：同时推进 N 局互相独立的游戏
+# 状态按列存放在数组里（机器人的 y/速度/计时器，障碍物的 x/缺口/y/角度等），
+# 碰撞检测按 entities.py 中 hit()/collect() 的规则整体向量化计算。
+# 生成障碍物和物品仍然逐局使用各自的生成计划（schedule.SpawnSchedule），和 World 完全一致，
+# 所以相同种子、相同操作下结果与 World 逐位相同（见 verify()）。
+
+# 障碍物种类，顺序与 world.OBSTACLE_TYPES 一致
+PIPE = 0
+MOVING = 1
+SPINNING = 2
+
+# 物品种类，顺序与 world.ITEM_TYPES 一致
+REWARD = 0
+SHIELD = 1
+BOOST = 2
+LIFE = 3
+
+# 与 entities.py 中的实体尺寸保持一致
+ROBOT_X = 100
+ROBOT_SIZE = 50
+OBSTACLE_WIDTH = 50
+PIPE_GAP = 180
+MOVING_HEIGHT = 100
+MOVING_SPEED = 2
+SPINNER_RADIUS = 80
+SPINNER_CORE = 20
+BLADE_LENGTH = 70
+BLADE_WIDTH = 8
+NUM_BLADES = 3
+ROTATION_SPEED = 0.05
+ITEM_SIZE = 25
+ITEM_SPEED = 3
+BOOST_SPEED = 2
+
+# 旋转障碍物的角度只取决于它更新了多少次，
+# 所以叶片末端偏移可以按"年龄"查表，表由 entities.blade_offsets 生成，保证和 World 完全一致
+class _BladeTable:
+    def __init__(self):
+        self.dx = np.zeros((0, NUM_BLADES))
+        self.dy = np.zeros((0, NUM_BLADES))
+        self.last_angle = 0
+        self.angle_steps = SpinningObstacle.angle_steps
+
+    def ensure(self, max_age):
+        if self.angle_steps != SpinningObstacle.angle_steps:
+            self.__init__()
+        start = len(self.dx)
+        if max_age < start:
+            return
+        end = max(max_age + 1, start * 2, 512)
+        dx = np.empty((end, NUM_BLADES))
+        dy = np.empty((end, NUM_BLADES))
+        dx[:start] = self.dx
+        dy[:start] = self.dy
+        angle = self.last_angle
+        for age in range(start, end):
+            if age > 0:
+                angle += ROTATION_SPEED
+            offsets = blade_offsets(angle, NUM_BLADES, BLADE_LENGTH, self.angle_steps)
+            dx[age] = [offset[0] for offset in offsets]
+            dy[age] = [offset[1] for offset in offsets]
+        self.dx = dx
+        self.dy = dy
+        self.last_angle = angle
+
+_blade_table = _BladeTable()
+
+# pygame.Rect 会把浮点坐标向零截断
+def _rect_coord(value):
+    return np.trunc(value)
+
+# pygame.Rect.colliderect，尺寸都为正数时的判定
+def _overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    return (ax < bx + bw) & (ax + aw > bx) & (ay < by + bh) & (ay + ah > by)
+
+# entities.capsule_hits_rect 的向量化版本，运算顺序相同
+def _capsule_hits_rect(x1, y1, x2, y2, radius, left, top, right, bottom):
+    min_x = np.minimum(x1, x2)
+    max_x = np.maximum(x1, x2)
+    min_y = np.minimum(y1, y2)
+    max_y = np.maximum(y1, y2)
+    possible = ((min_x - right < radius) & (left - max_x < radius) &
+                (min_y - bottom < radius) & (top - max_y < radius))
+
+    dx = x2 - x1
+    dy = y2 - y1
+
+    c = dx * y1 - dy * x1
+    low = np.minimum(dx * top, dx * bottom) - np.maximum(dy * left, dy * right)
+    high = np.maximum(dx * top, dx * bottom) - np.minimum(dy * left, dy * right)
+    hits = ((min_x <= right) & (max_x >= left) & (min_y <= bottom) & (max_y >= top) & (low <= c) & (c <= high))
+
+    r2 = radius * radius
+    for px, py in ((x1, y1), (x2, y2)):
+        ex = np.maximum(np.maximum(left - px, 0), px - right)
+        ey = np.maximum(np.maximum(top - py, 0), py - bottom)
+        hits |= ex * ex + ey * ey < r2
+    l2 = dx * dx + dy * dy
+    nonzero = l2 != 0
+    l2 = np.where(nonzero, l2, 1)
+    for px, py in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        t = np.clip(((px - x1) * dx + (py - y1) * dy) / l2, 0, 1)
+        ex = px - (x1 + t * dx)
+        ey = py - (y1 + t * dy)
+        hits |= nonzero & (ex * ex + ey * ey < r2)
+    return possible & hits
+
+# 每局一行的状态数组，局结束时一起压缩
+_ROW_STATE = (
+    "ids", "level_threshold", "item_rate",
+    "y", "prev_y", "velocity", "shield_active", "shield_timer", "boost_active", "boost_timer",
+    "lives", "invulnerable", "invulnerable_timer", "game_over",
+    "frame", "score", "level", "obstacle_speed", "spawn_rate", "next_obstacle", "next_item",
+    "o_active", "o_kind", "o_x", "o_prev_x", "o_speed", "o_passed", "o_a", "o_direction", "o_age", "o_reach",
+    "i_active", "i_kind", "i_x", "i_y",
+)
+
+# 槽位数组，容量不够时一起扩容
+_OBSTACLE_SLOTS = (("o_active", False), ("o_kind", 0), ("o_x", 0.0), ("o_prev_x", 0.0), ("o_speed", 0.0),
+                   ("o_passed", False), ("o_a", 0), ("o_direction", 0), ("o_age", 0),
+                   ("o_reach", 0.0))
+_ITEM_SLOTS = (("i_active", False), ("i_kind", 0), ("i_x", 0.0), ("i_y", 0))
+
+def _grow(array, capacity, fill):
+    grown = np.full((array.shape[0], capacity), fill, dtype=array.dtype)
+    grown[:, :array.shape[1]] = array
+    return grown
+
+class BatchWorld:
+    # seeds 决定每局的随机数流；其余参数可以是标量，也可以是每局一个值的序列
+    def __init__(self, seeds, obstacle_speed=3, spawn_rate=120, level_threshold=10, item_rate=180,
+                 obstacle_weights=OBSTACLE_WEIGHTS, item_weights=ITEM_WEIGHTS, capacity=8):
+        n = len(seeds)
+        self.n = n
+        self.seeds = list(seeds)
+
+        def per_game(value, dtype):
+            return np.array(np.broadcast_to(np.asarray(value, dtype=dtype), (n,)))
+
+        def per_game_weights(weights):
+            if np.ndim(weights) == 1:
+                return [list(weights)] * n
+            return [list(w) for w in weights]
+
+        # 逐局的参数
+        self.obstacle_weights = per_game_weights(obstacle_weights)
+        self.item_weights = per_game_weights(item_weights)
+        self.level_threshold = per_game(level_threshold, np.int64)
+        self.item_rate = per_game(item_rate, np.int64)
+
+        # 当前仍在进行的局在原始 seeds 中的下标
+        self.ids = np.arange(n)
+        self.alive = np.ones(n, dtype=bool)
+
+        # 机器人状态
+        self.y = np.full(n, float(SCREEN_HEIGHT // 2))
+        self.prev_y = self.y.copy()
+        self.velocity = np.zeros(n)
+        self.shield_active = np.zeros(n, dtype=bool)
+        self.shield_timer = np.zeros(n, dtype=np.int64)
+        self.boost_active = np.zeros(n, dtype=bool)
+        self.boost_timer = np.zeros(n, dtype=np.int64)
+        self.lives = np.full(n, 3, dtype=np.int64)
+        self.invulnerable = np.zeros(n, dtype=bool)
+        self.invulnerable_timer = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        # 每局的进度
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.obstacle_speed = per_game(obstacle_speed, np.float64)
+        self.spawn_rate = per_game(spawn_rate, np.int64)
+
+        # 障碍物槽位：每行一局，每列一个障碍物
+        # a 列：管道的上管高度 / 移动块的 y / 旋转障碍物的中心 y
+        self.o_active = np.zeros((n, capacity), dtype=bool)
+        self.o_kind = np.zeros((n, capacity), dtype=np.int8)
+        self.o_x = np.zeros((n, capacity))
+        self.o_prev_x = np.zeros((n, capacity))
+        self.o_speed = np.zeros((n, capacity))
+        self.o_passed = np.zeros((n, capacity), dtype=bool)
+        self.o_a = np.zeros((n, capacity), dtype=np.int64)
+        self.o_direction = np.zeros((n, capacity), dtype=np.int64)
+        self.o_age = np.zeros((n, capacity), dtype=np.int64)
+        self.o_reach = np.zeros((n, capacity))
+
+        # 物品槽位
+        self.i_active = np.zeros((n, capacity), dtype=bool)
+        self.i_kind = np.zeros((n, capacity), dtype=np.int8)
+        self.i_x = np.zeros((n, capacity))
+        self.i_y = np.zeros((n, capacity), dtype=np.int64)
+
+        # 已结束的局的结果，按 seeds 的顺序
+        self.result_score = np.zeros(n, dtype=np.int64)
+        self.result_level = np.zeros(n, dtype=np.int64)
+        self.result_frames = np.zeros(n, dtype=np.int64)
+        self.result_lives = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+
+        # 逐局的生成计划，和 World 一样由种子决定，第一个障碍物是管道
+        self.next_obstacle = self.spawn_rate.copy()
+        self.next_item = self.item_rate.copy()
+        self.schedules = [SpawnSchedule(random.Random(seed), OBSTACLE_TYPES, self.obstacle_weights[game],
+                                        ITEM_TYPES, self.item_weights[game], float(self.obstacle_speed[game]),
+                                        min_spawn_rate(self.spawn_rate[game]), first=OBSTACLE_TYPES[PIPE])
+                          for game, seed in enumerate(self.seeds)]
+        for row in range(n):
+            self._spawn_obstacle(row)
+
+    # ---- 生成 ----
+
+    def _free_slot(self, slots, row):
+        active = getattr(self, slots[0][0])
+        free = np.flatnonzero(~active[row])
+        if len(free):
+            return free[0]
+        slot = active.shape[1]
+        for name, fill in slots:
+            setattr(self, name, _grow(getattr(self, name), slot * 2, fill))
+        return slot
+
+    # 按生成计划生成下一个障碍物（计划留空时不生成）
+    def _spawn_obstacle(self, row):
+        cls, placement = self.schedules[self.ids[row]].next_obstacle(float(self.obstacle_speed[row]))
+        if cls is None:
+            return
+        kind = OBSTACLE_TYPES.index(cls)
+        slot = self._free_slot(_OBSTACLE_SLOTS, row)
+        self.o_active[row, slot] = True
+        self.o_kind[row, slot] = kind
+        self.o_x[row, slot] = SCREEN_WIDTH
+        self.o_prev_x[row, slot] = SCREEN_WIDTH
+        self.o_speed[row, slot] = self.obstacle_speed[row]
+        self.o_passed[row, slot] = False
+        self.o_age[row, slot] = 0
+        self.o_direction[row, slot] = 0
+        self.o_reach[row, slot] = OBSTACLE_WIDTH + ROBOT_SIZE / 2 + 1
+        # 摆放参数与 entities.py 中各类的 place() 一致
+        if kind == MOVING:
+            self.o_a[row, slot], self.o_direction[row, slot] = placement
+        else:
+            self.o_a[row, slot], = placement
+        if kind == SPINNING:
+            # 整个障碍物都在半径为 SPINNER_RADIUS 的圆内，粗筛范围相应放大
+            self.o_reach[row, slot] = SPINNER_RADIUS + ROBOT_SIZE / 2 + 1
+
+    def _spawn_item(self, row):
+        cls, placement = self.schedules[self.ids[row]].next_item()
+        kind = ITEM_TYPES.index(cls)
+        slot = self._free_slot(_ITEM_SLOTS, row)
+        self.i_active[row, slot] = True
+        self.i_kind[row, slot] = kind
+        self.i_x[row, slot] = SCREEN_WIDTH
+        self.i_y[row, slot], = placement
+
+    # ---- 推进一帧 ----
+
+    # jump：每个进行中的局一个布尔值（或一个标量，对所有局生效）
+    def step(self, jump=False):
+        if not len(self.ids):
+            return
+        jump = np.broadcast_to(np.asarray(jump, dtype=bool), self.ids.shape)
+        self.velocity[jump] = -10
+
+        self.frame += 1
+
+        # 难度随分数提高
+        current_level = 1 + self.score // self.level_threshold
+        level_up = current_level > self.level
+        self.level[level_up] = current_level[level_up]
+        self.obstacle_speed[level_up] += 0.5
+        faster = level_up & (self.spawn_rate > 60)
+        self.spawn_rate[faster] -= 10
+
+        # 生成障碍物和物品（逐局使用各自的生成计划），间隔为生成时的 spawn_rate / item_rate
+        rows = np.flatnonzero(self.frame == self.next_obstacle)
+        self.next_obstacle[rows] += self.spawn_rate[rows]
+        for row in rows:
+            self._spawn_obstacle(row)
+        rows = np.flatnonzero(self.frame == self.next_item)
+        self.next_item[rows] += self.item_rate[rows]
+        for row in rows:
+            self._spawn_item(row)
+
+        self._update_robot()
+
+        # 计算加速值
+        boost_speed = np.where(self.boost_active, BOOST_SPEED, 0)[:, None]
+
+        self._update_obstacles(boost_speed)
+        self._update_items(boost_speed)
+
+        self._retire(self.game_over)
+
+    def _update_robot(self):
+        self.prev_y[:] = self.y
+        self.velocity += 0.5
+        self.y += self.velocity
+
+        # 护盾、加速、无敌计时器
+        for active, timer in ((self.shield_active, self.shield_timer),
+                              (self.boost_active, self.boost_timer),
+                              (self.invulnerable, self.invulnerable_timer)):
+            timer[active] -= 1
+            active &= ~(active & (timer <= 0))
+
+        # 防止机器人飞出屏幕
+        low = self.y > SCREEN_HEIGHT - ROBOT_SIZE
+        self.y[low] = SCREEN_HEIGHT - ROBOT_SIZE
+        self.velocity[low] = 0
+        high = self.y < 0
+        self.y[high] = 0
+        self.velocity[high] = 0
+
+    def _update_obstacles(self, boost_speed):
+        active = self.o_active
+        # 空槽位的数据不会被读取，所以这里不必按 active 过滤
+        self.o_prev_x[:] = self.o_x
+        self.o_x -= self.o_speed + boost_speed
+        x = self.o_x
+
+        # 移动障碍物上下移动，碰到边缘就改变方向（其他种类的 direction 为 0）
+        self.o_a += self.o_direction * MOVING_SPEED
+        bounce = (self.o_direction != 0) & ((self.o_a <= 0) | (self.o_a + MOVING_HEIGHT >= SCREEN_HEIGHT))
+        self.o_direction[bounce] *= -1
+
+        # 旋转障碍物的角度由更新次数查表得到
+        self.o_age += 1
+
+        # 粗筛：只有 x 方向靠近机器人的障碍物才需要精确检测，
+        # 距离按这一步扫过的范围 [x, prev_x] 计算，包括连续检测的中间位置
+        center = ROBOT_X + ROBOT_SIZE / 2
+        distance = np.maximum(np.maximum(x - center, 0), center - self.o_prev_x)
+        near = active & (distance < self.o_reach)
+        hit_rows = np.zeros(len(self.ids), dtype=bool)
+        rows, cols = np.nonzero(near)
+        if len(rows):
+            hit_rows[rows[self._hit_candidates(rows, cols)]] = True
+
+        # 护盾挡住所有碰撞；无敌时间内碰撞不扣血，所以每帧最多扣一条命
+        hit = hit_rows & ~self.shield_active & ~self.invulnerable
+        self.lives -= hit
+        self.invulnerable |= hit
+        self.invulnerable_timer[hit] = 120
+        self.game_over |= hit & (self.lives <= 0)
+
+        # 通过障碍物得分
+        passed = active & ~self.o_passed & (x + OBSTACLE_WIDTH < ROBOT_X)
+        self.o_passed |= passed
+        self.score += passed.sum(axis=1)
+
+        # 移除屏幕外的障碍物
+        self.o_active &= ~(x < -OBSTACLE_WIDTH)
+
+    # 精确检测候选障碍物，规则与各障碍物类的 hit() 相同
+    def _hit_candidates(self, rows, cols):
+        kind = self.o_kind[rows, cols]
+        x = self.o_x[rows, cols]
+        a = self.o_a[rows, cols]
+        ry = self.y[rows]
+        robot_y = _rect_coord(ry)
+        ox = _rect_coord(x)
+
+        # 管道：上下两个矩形
+        hits = (kind == PIPE) & (
+            _overlap(ROBOT_X, robot_y, ROBOT_SIZE, ROBOT_SIZE, ox, 0, OBSTACLE_WIDTH, a) |
+            _overlap(ROBOT_X, robot_y, ROBOT_SIZE, ROBOT_SIZE, ox, a + PIPE_GAP,
+                     OBSTACLE_WIDTH, SCREEN_HEIGHT - (a + PIPE_GAP)))
+        # 移动块
+        hits |= (kind == MOVING) & _overlap(ROBOT_X, robot_y, ROBOT_SIZE, ROBOT_SIZE,
+                                            ox, a, OBSTACLE_WIDTH, MOVING_HEIGHT)
+
+        # 旋转障碍物：包围圆、中心方块和叶片胶囊体，连续检测时再检测中间位置
+        spin = np.flatnonzero(kind == SPINNING)
+        if len(spin):
+            sx = x[spin]
+            sy = a[spin]
+            r = rows[spin]
+            age = self.o_age[r, cols[spin]]
+            _blade_table.ensure(age.max())
+            offsets = (_blade_table.dx[age], _blade_table.dy[age])
+            left = float(ROBOT_X)
+            spin_hits = self._spinner_hits(left, _rect_coord(ry[spin]), sx, sy, offsets)
+            if SpinningObstacle.swept:
+                prev_x = self.o_prev_x[r, cols[spin]]
+                prev_y = self.prev_y[r]
+                dx = prev_x - sx
+                dy = ry[spin] - prev_y
+                steps = np.trunc(np.maximum(np.maximum(dx, dy), -dy) / BLADE_WIDTH) + 1
+                for k in range(1, int(steps.max())):
+                    more = np.flatnonzero(~spin_hits & (k < steps))
+                    if not len(more):
+                        break
+                    y = prev_y[more] + dy[more] * k / steps[more]
+                    x_k = prev_x[more] - dx[more] * k / steps[more]
+                    spin_hits[more] = self._spinner_hits(left, _rect_coord(y), x_k, sy[more],
+                                                         (offsets[0][more], offsets[1][more]))
+            hits[spin] = spin_hits
+        return hits
+
+    # SpinningObstacle.hit_at 的向量化版本：机器人左上角 (left, top)，障碍物中心 (x, y)
+    @staticmethod
+    def _spinner_hits(left, top, x, y, offsets):
+        right = left + ROBOT_SIZE
+        bottom = top + ROBOT_SIZE
+        ex = np.maximum(np.maximum(left - x, 0), x - right)
+        ey = np.maximum(np.maximum(top - y, 0), y - bottom)
+        inside = ex * ex + ey * ey < SPINNER_RADIUS * SPINNER_RADIUS
+
+        core = _rect_coord(x - SPINNER_CORE)
+        hits = inside & _overlap(left, top, ROBOT_SIZE, ROBOT_SIZE, core, y - SPINNER_CORE,
+                                 SPINNER_CORE * 2, SPINNER_CORE * 2)
+        x1 = x[:, None]
+        y1 = y[:, None]
+        blade = _capsule_hits_rect(x1, y1, x1 + offsets[0], y1 + offsets[1], BLADE_WIDTH / 2,
+                                   left, top[:, None], right, bottom[:, None]).any(axis=1)
+        return hits | (inside & blade)
+
+    def _update_items(self, boost_speed):
+        active = self.i_active
+        self.i_x -= np.where(active, ITEM_SPEED + boost_speed, 0)
+
+        robot_y = _rect_coord(self.y)[:, None]
+        collected = active & _overlap(ROBOT_X, robot_y, ROBOT_SIZE, ROBOT_SIZE,
+                                      _rect_coord(self.i_x), self.i_y, ITEM_SIZE, ITEM_SIZE)
+        if collected.any():
+            kind = self.i_kind
+            self.score += 5 * (collected & (kind == REWARD)).sum(axis=1)
+            shield = (collected & (kind == SHIELD)).any(axis=1)
+            self.shield_active |= shield
+            self.shield_timer[shield] = 300
+            boost = (collected & (kind == BOOST)).any(axis=1)
+            self.boost_active |= boost
+            self.boost_timer[boost] = 180
+            self.lives += (collected & (kind == LIFE)).sum(axis=1)
+
+        # 移除被收集的和屏幕外的物品
+        self.i_active &= ~(collected | (self.i_x < -ITEM_SIZE))
+
+    # 把结束的局写入结果并从数组中移除，后续帧只计算仍在进行的局
+    def _retire(self, finished):
+        if not finished.any():
+            return
+        ids = self.ids[finished]
+        self.result_score[ids] = self.score[finished]
+        self.result_level[ids] = self.level[finished]
+        self.result_frames[ids] = self.frame[finished]
+        self.result_lives[ids] = self.lives[finished]
+        self.done[ids] = True
+
+        keep = ~finished
+        for name in _ROW_STATE:
+            setattr(self, name, getattr(self, name)[keep])
+        self.alive[ids] = False
+
+    # 运行直到所有局结束或达到 max_frames，policy(y, velocity) 返回是否跳跃
+    def run(self, policy, max_frames=10000):
+        for _ in range(max_frames):
+            if not len(self.ids):
+                break
+            self.step(policy(self.y, self.velocity))
+        self._retire(np.ones(len(self.ids), dtype=bool))
+        return self.results()
+
+    def results(self):
+        return {
+            "score": self.result_score,
+            "level": self.result_level,
+            "frames": self.result_frames,
+            "lives": self.result_lives,
+        }
+
+# 简单的悬停策略：在屏幕中线以下下落时跳跃，适合做平衡测试的基准
+def hover_policy(y, velocity):
+    return (y > SCREEN_HEIGHT / 2) & (velocity > 0)
+
+# 第 index 局的参数：每局一个值的序列取出这一局的值，权重为二维序列时取这一局的一组
+def _game_params(params, index):
+    game = {}
+    for name, value in params.items():
+        if name in ("obstacle_weights", "item_weights"):
+            game[name] = list(value[index]) if np.ndim(value) == 2 else value
+        elif np.ndim(value):
+            game[name] = np.asarray(value)[index].item()
+        else:
+            game[name] = value
+    return game
+
+# 用 World 逐局运行同样的种子和策略，返回与 BatchWorld.run 相同格式的结果
+def run_scalar(seeds, policy, max_frames=10000, **params):
+    results = {"score": [], "level": [], "frames": [], "lives": []}
+    for index, seed in enumerate(seeds):
+        world = World(rng=random.Random(seed), **_game_params(params, index))
+        while not world.game_over and world.frame < max_frames:
+            world.step(bool(policy(world.robot.y, world.robot.velocity)))
+        results["score"].append(world.score)
+        results["level"].append(world.level)
+        results["frames"].append(world.frame)
+        results["lives"].append(world.robot.lives)
+    return {key: np.array(value) for key, value in results.items()}
+
+# 检查批量模拟器与 World 的结果是否逐位一致，返回不一致的种子列表
+def verify(seeds=range(200), policy=hover_policy, max_frames=5000, **params):
+    batch = BatchWorld(seeds, **params).run(policy, max_frames)
+    scalar = run_scalar(seeds, policy, max_frames, **params)
+    mismatched = np.zeros(len(batch["score"]), dtype=bool)
+    for key in batch:
+        mismatched |= batch[key] != scalar[key]
+    return [seed for seed, bad in zip(seeds, mismatched) if bad]
+
+if __name__ == "__main__":
+    import time
+
+    mismatches = verify()
+    print("与 World 不一致的种子:", mismatches)
+
+    start = time.perf_counter()
+    results = BatchWorld(range(10000)).run(hover_policy)
+    elapsed = time.perf_counter() - start
+    print("10000 局用时 %.2fs，平均得分 %.2f，平均存活 %.0f 帧" %
+          (elapsed, results["score"].mean(), results["frames"].mean()))
@@ -0,0 +1,360 @@
+import os
+
+# 无窗口运行：必须在导入 pygame 之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import gc
+import json
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+import pygame
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, RED, GREEN, BLUE, NET_MAX_ROLLBACK
+from entities import Robot, PipeObstacle, MovingObstacle, SpinningObstacle, point_to_line_distance
+from world import World
+from netplay import RollbackWorld
+import snapshot
+from particles import ParticleSystem
+from render import Renderer
+from sky_robot_game import handle_events, init_display, init_backend
+from backends import SURFACE, BACKENDS
+from audio import Sounds
+
+# 性能基准：无窗口（SDL dummy 驱动）运行几个固定的场景和热点函数的微基准，
+# 结果保存为 JSON，可以与之前保存的结果比较，变慢超过容差时返回非零退出码。
+#
+#   python bench.py                         运行全部场景并打印结果
+#   python bench.py -o result.json          同时保存结果
+#   python bench.py --compare base.json     与 base.json 比较，变慢超过 15% 时失败
+#   python bench.py --quick                 帧数减少到 1/5，用于快速检查
+#
+# 场景每帧按游戏主循环的顺序执行一步模拟，不限帧率，记录各阶段用时：
+#   sim        World.step 和事件处理（音效、生成粒子）
+#   particles  粒子更新
+#   render     绘制
+#   present    把画面提交到显示（脏矩形或整屏刷新）
+# 另外在新进程中启动游戏，记录从启动到显示第一帧的时间。
+# 内存分配用两个数字表示：运行期间垃圾回收的次数和耗时（新建容器对象越多，回收越频繁），
+# 以及运行前后 Python 分配的内存块数的变化
+
+# 基准中不播放音效
+_SILENT = Sounds()
+
+# 悬停策略，与 batch_sim.hover_policy 相同
+def hover(world):
+    robot = world.robot
+    return robot.y > SCREEN_HEIGHT / 2 and robot.velocity > 0
+
+class _GCMonitor:
+    def __init__(self):
+        self.collections = 0
+        self.time = 0.0
+        self.start = 0.0
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.start = time.perf_counter()
+        else:
+            self.collections += 1
+            self.time += time.perf_counter() - self.start
+
+# 场景：setup(renderer) 返回每帧调用的函数 frame(phases)，phases 为各阶段累计用时
+class Scenario:
+    def __init__(self, name, frames, setup):
+        self.name = name
+        self.frames = frames
+        self.setup = setup
+
+    def run(self, renderer, scale=1.0):
+        frames = max(1, int(self.frames * scale))
+        phases = {"sim": 0.0, "particles": 0.0, "render": 0.0, "present": 0.0}
+        frame = self.setup(renderer)
+
+        monitor = _GCMonitor()
+        gc.collect()
+        gc.callbacks.append(monitor)
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            for index in range(frames):
+                frame(index, phases)
+        finally:
+            elapsed = time.perf_counter() - start
+            gc.callbacks.remove(monitor)
+        blocks = sys.getallocatedblocks() - blocks
+
+        return {
+            "frames": frames,
+            "fps": frames / elapsed,
+            "frame_ms": elapsed * 1000 / frames,
+            "phases_ms": {name: value * 1000 / frames for name, value in phases.items()},
+            "gc_collections": monitor.collections,
+            "gc_ms": monitor.time * 1000,
+            "allocated_blocks": blocks,
+        }
+
+# 游戏中的一帧：模拟一步、更新粒子、绘制并提交画面
+# 场景都是无尽模式：每步之前把生命值补满，一步最多失去一条命，所以游戏不会结束
+def _play_frame(renderer, world, particles, index, phases, emit=None):
+    clock = time.perf_counter
+    world.robot.lives = 3
+    t0 = clock()
+    handle_events(world.step(hover(world)), particles, _SILENT)
+    if emit is not None:
+        emit(index)
+    t1 = clock()
+    particles.update()
+    t2 = clock()
+    renderer.draw_world(world, particles, index)
+    t3 = clock()
+    renderer.present()
+    t4 = clock()
+    phases["sim"] += t1 - t0
+    phases["particles"] += t2 - t1
+    phases["render"] += t3 - t2
+    phases["present"] += t4 - t3
+
+# 菜单界面空转
+def _menu(renderer):
+    options = ["开始游戏", "退出"]
+
+    def frame(index, phases):
+        t0 = time.perf_counter()
+        renderer.draw_menu(options, index // 30 % 2, 120, index)
+        t1 = time.perf_counter()
+        renderer.present()
+        phases["render"] += t1 - t0
+        phases["present"] += time.perf_counter() - t1
+    return frame
+
+# 密集的障碍物和物品
+def _dense(renderer):
+    world = World(rng=random.Random(1), spawn_rate=20, item_rate=15)
+    particles = ParticleSystem(rng=np.random.default_rng(1))
+
+    def frame(index, phases):
+        _play_frame(renderer, world, particles, index, phases)
+    return frame
+
+# 粒子风暴：每帧额外在随机位置产生三次爆发，粒子数一直处于预算上限附近
+def _particle_storm(renderer):
+    world = World(rng=random.Random(2))
+    particles = ParticleSystem(rng=np.random.default_rng(2))
+    rng = random.Random(2)
+    colors = [RED, GREEN, BLUE]
+
+    def emit(index):
+        for color in colors:
+            particles.emit(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), color, 20)
+
+    def frame(index, phases):
+        _play_frame(renderer, world, particles, index, phases, emit)
+    return frame
+
+# 长时间的无尽模式：难度随分数不断提高
+def _endless(renderer):
+    world = World(rng=random.Random(3))
+    particles = ParticleSystem(rng=np.random.default_rng(3))
+
+    def frame(index, phases):
+        _play_frame(renderer, world, particles, index, phases)
+    return frame
+
+SCENARIOS = [
+    Scenario("menu", 600, _menu),
+    Scenario("dense_obstacles", 1200, _dense),
+    Scenario("particle_storm", 900, _particle_storm),
+    Scenario("endless", 6000, _endless),
+]
+
+# ---- 微基准 ----
+
+# 每个微基准是一个无参数的函数，结果为每次调用的纳秒数
+def _micro_cases():
+    rng = random.Random(0)
+    robot = Robot()
+    # 障碍物放在机器人所在的位置，保证执行完整的碰撞检测
+    pipe = PipeObstacle(3, rng)
+    pipe.x = robot.x
+    moving = MovingObstacle(3, rng)
+    moving.x = robot.x + 100
+    spinner = SpinningObstacle(3, rng)
+    spinner.x = robot.x + robot.width + 60
+    spinner.prev_x = spinner.x
+    spinner.center_y = robot.y
+    spinner.angle = 0.3
+
+    particles = ParticleSystem(rng=np.random.default_rng(0))
+
+    # 游戏进行到一半时的快照
+    saved = World(rng=random.Random(4))
+    while saved.frame < 600:
+        saved.robot.lives = 3
+        saved.step(hover(saved))
+    state = snapshot.save(saved)
+
+    def particle_cycle():
+        # 保持大约 400 个粒子：每次补充一次爆发后更新
+        particles.emit(400, 300, RED, 20)
+        particles.update()
+
+    return {
+        "robot_update": robot.update,
+        "pipe_hit": lambda: pipe.hit(robot),
+        "moving_hit": lambda: moving.hit(robot),
+        "spinning_hit": lambda: spinner.hit(robot),
+        "point_to_line_distance": lambda: point_to_line_distance((125, 325), (230, 300), (300, 250)),
+        "particles_emit_update": particle_cycle,
+        "world_step": _world_stepper(),
+        "snapshot_save": lambda: snapshot.save(saved),
+        "snapshot_restore": lambda: snapshot.restore(saved, state),
+        "rollback_%d" % NET_MAX_ROLLBACK: _rollback_stepper(NET_MAX_ROLLBACK),
+    }
+
+def _world_stepper():
+    world = World(rng=random.Random(4))
+    robot = world.robot
+    step = world.step
+
+    def run():
+        robot.lives = 3
+        step(hover(world))
+    return run
+
+# 对方的输入落后 depth 步，而且每次都与预测不同：每次调用回滚 depth 步，重新模拟后再推进一步
+def _rollback_stepper(depth):
+    rollback = RollbackWorld(World(rng=random.Random(4)), depth)
+    # 生命数也会被回滚，不能每次重新设置，一开始就给足够多
+    rollback.world.robot.lives = 60000
+    for _ in range(depth):
+        rollback.advance()
+
+    def run():
+        rollback.add_input(True)
+        rollback.advance()
+    return run
+
+def run_micro(scale=1.0):
+    results = {}
+    for name, function in _micro_cases().items():
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        number = max(1, int(number * scale))
+        best = min(timer.repeat(repeat=5, number=number))
+        results[name] = best * 1e9 / number
+    return results
+
+# ---- 启动时间 ----
+
+# 在新进程中启动游戏（python sky_robot_game.py --first-frame），取 runs 次首帧用时的中位数（毫秒）
+def run_startup(runs=3):
+    directory = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "sky_robot_game.py", "--first-frame"], cwd=directory,
+                                capture_output=True, text=True, check=True).stdout
+        match = re.search(r"首帧用时: ([\d.]+) ms", output)
+        if match:
+            times.append(float(match.group(1)))
+    times.sort()
+    return times[len(times) // 2] if times else None
+
+# ---- 运行与比较 ----
+
+def run_all(scale=1.0, names=None, backend=SURFACE):
+    startup = run_startup(1 if scale < 1 else 3)
+    if backend == SURFACE:
+        renderer = Renderer(pygame.display.get_surface() or init_display())
+    else:
+        renderer = Renderer(backend=init_backend(backend))
+    renderer.prepare()
+
+    scenarios = {}
+    for scenario in SCENARIOS:
+        if names and scenario.name not in names:
+            continue
+        scenarios[scenario.name] = scenario.run(renderer, scale)
+
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "video_driver": pygame.display.get_driver(),
+            "scale": scale,
+            "backend": renderer.backend.name,
+        },
+        "startup_ms": startup,
+        "scenarios": scenarios,
+        "micro_ns": run_micro(scale),
+    }
+
+# 与基准结果比较，返回变慢超过 tolerance（比例）的项目
+def compare(baseline, current, tolerance=0.15):
+    regressions = []
+    before = baseline.get("startup_ms")
+    after = current.get("startup_ms")
+    if before and after and after > before * (1 + tolerance):
+        regressions.append(("startup_ms", before, after))
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before and result["fps"] < before["fps"] * (1 - tolerance):
+            regressions.append((name + ".fps", before["fps"], result["fps"]))
+    for name, value in current["micro_ns"].items():
+        before = baseline.get("micro_ns", {}).get(name)
+        if before and value > before * (1 + tolerance):
+            regressions.append((name + ".ns", before, value))
+    return regressions
+
+def print_results(results):
+    if results["startup_ms"] is not None:
+        print("首帧用时 %.1f ms\n" % results["startup_ms"])
+    print("%-18s %8s %9s %8s %8s %8s %8s %6s %8s" %
+          ("场景", "fps", "帧(ms)", "sim", "粒子", "绘制", "提交", "GC次数", "内存块"))
+    for name, result in results["scenarios"].items():
+        phases = result["phases_ms"]
+        print("%-18s %8.0f %9.3f %8.3f %8.3f %8.3f %8.3f %6d %8d" %
+              (name, result["fps"], result["frame_ms"], phases["sim"], phases["particles"],
+               phases["render"], phases["present"], result["gc_collections"], result["allocated_blocks"]))
+    print()
+    for name, value in results["micro_ns"].items():
+        print("%-24s %10.0f ns" % (name, value))
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="天空机器人性能基准")
+    parser.add_argument("-o", "--output", help="把结果保存为 JSON")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="允许变慢的比例，默认 0.15")
+    parser.add_argument("--quick", action="store_true", help="帧数和重复次数减少到 1/5")
+    parser.add_argument("--scenario", action="append", help="只运行指定的场景，可以重复")
+    parser.add_argument("--backend", choices=BACKENDS, default=SURFACE, help="渲染后端，默认 surface")
+    args = parser.parse_args()
+
+    results = run_all(0.2 if args.quick else 1.0, args.scenario, args.backend)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.tolerance)
+        for name, before, after in regressions:
+            print("变慢: %s %.1f -> %.1f" % (name, before, after))
+        if regressions:
+            sys.exit(1)
+        print("没有超过 %.0f%% 的性能下降" % (args.tolerance * 100))
@@ -0,0 +1,166 @@
+import time
+from collections import deque
+
+import pygame
+
+# 输入子系统：事件队列只接收用到的事件，并测量从按下跳跃键到画面变化的延迟。
+#
+#   1. 事件队列只接收用到的事件（QUIT、KEYDOWN），鼠标移动、松开按键、文字输入等事件不会进入队列，
+#      每次取事件都很快
+#   2. 主循环在等待帧率限制之后、模拟步之前用 poll() 取出所有事件，取事件和模拟步之间没有别的等待，
+#      在模拟步之前再取一次也取不到新的按键。延迟主要是等到下一次取事件的时间（平均半帧）加上绘制的时间
+#   3. 每次按下跳跃键记录时间：pygame 的事件不带时间戳，按键实际发生在上一次取事件和这一次之间，
+#      所以记录这两个时刻；模拟步处理这个按键时记录一次，这一帧的画面提交之后再记录一次
+#
+# 输入到画面的延迟按 提交画面的时刻 − (上一次取事件 + 这一次取事件) / 2 估计（按键在两次取事件之间均匀发生），
+# 不包括显示器本身的延迟。python controls.py 用模拟的游戏循环测量并与真实的按键时刻比较
+
+# 事件队列接收的事件
+ALLOWED_EVENTS = (pygame.QUIT, pygame.KEYDOWN)
+
+# 延迟统计：最近 window 次的毫秒数
+class LatencyStats:
+    def __init__(self, window=240):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000)
+        self.count += 1
+
+    def summary(self):
+        samples = sorted(self.samples)
+        if not samples:
+            return None
+        n = len(samples)
+        return {
+            "count": self.count,
+            "mean_ms": sum(samples) / n,
+            "p50_ms": samples[n // 2],
+            "p95_ms": samples[min(n - 1, int(n * 0.95))],
+            "max_ms": samples[-1],
+        }
+
+class Controls:
+    # clock：计时函数，与 profiler、timestep 一样可以替换
+    def __init__(self, clock=time.perf_counter, window=240):
+        self.clock = clock
+        self.last_poll = None
+        # 最近一次 poll() 的 (上一次取事件的时刻, 这一次)
+        self.window = None
+        # 还没有被模拟步处理的跳跃：(最早可能按下的时刻, 取出事件的时刻)
+        self.pending = []
+        # 模拟步已经处理、画面还没有提交的跳跃
+        self.in_flight = []
+        # 从取出事件到模拟步处理、到画面提交
+        self.to_step = LatencyStats(window)
+        self.to_photon = LatencyStats(window)
+
+    # 限制事件队列只接收 ALLOWED_EVENTS（需要先初始化显示）
+    def start(self, allowed=ALLOWED_EVENTS):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(allowed))
+        return self
+
+    # 每一帧开始时调用，返回这一帧要处理的事件；记录 (上一次取事件的时刻, 这一次)
+    def poll(self):
+        now = self.clock()
+        self.window = (self.last_poll if self.last_poll is not None else now, now)
+        self.last_poll = now
+        return pygame.event.get()
+
+    # 游戏中按下了跳跃键（poll() 返回的事件由主循环判断是否是跳跃）
+    def press(self):
+        self.pending.append(self.window)
+
+    # 模拟步开始时调用，返回这一步是否跳跃；同一步之前的多次按键合并为一次跳跃
+    def take_jump(self):
+        if not self.pending:
+            return False
+        now = self.clock()
+        for earliest, seen in self.pending:
+            self.to_step.add(now - seen)
+        self.in_flight.extend(self.pending)
+        self.pending = []
+        return True
+
+    # 画面提交之后调用
+    def presented(self):
+        if not self.in_flight:
+            return
+        now = self.clock()
+        for earliest, seen in self.in_flight:
+            self.to_photon.add(now - (earliest + seen) / 2)
+        self.in_flight = []
+
+    # 开始新的一局或离开游戏时丢弃还没有处理的跳跃
+    def reset(self):
+        self.pending = []
+
+    # {"step": ..., "photon": ...}，没有数据时为 None
+    def latency(self):
+        return {"step": self.to_step.summary(), "photon": self.to_photon.summary()}
+
+# 模拟的游戏循环：每帧取事件、推进模拟、绘制（work 秒）、提交，然后等待帧率限制；
+# 另一个线程在随机时刻发送跳跃键，返回真实的按键到画面提交的延迟（毫秒）和 Controls 的统计
+def measure(presses=200, fps=60, work=0.006, seed=0):
+    import random
+    import threading
+
+    from timestep import FixedTimestep
+
+    controls = Controls().start()
+    timestep = FixedTimestep()
+    clock = pygame.time.Clock()
+    rng = random.Random(seed)
+    sent = deque()
+    actual = []
+    done = threading.Event()
+
+    def press():
+        for _ in range(presses):
+            time.sleep(rng.uniform(0.02, 0.06))
+            sent.append(time.perf_counter())
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        done.set()
+
+    thread = threading.Thread(target=press, daemon=True)
+    thread.start()
+    waiting = []
+    while not done.is_set() or sent or waiting:
+        for event in controls.poll():
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                controls.press()
+        for _ in range(timestep.advance()):
+            # 按键按发送的顺序进入队列，这一步处理了几次按键就对应最早发送的几次
+            for _ in range(len(controls.pending)):
+                waiting.append(sent.popleft())
+            controls.take_jump()
+        time.sleep(work)
+        controls.presented()
+        now = time.perf_counter()
+        actual.extend(now - pressed for pressed in waiting)
+        waiting = []
+        clock.tick(fps)
+        if done.is_set() and not sent and not waiting and len(actual) >= presses:
+            break
+    thread.join()
+    actual.sort()
+    return {
+        "mean_ms": sum(actual) * 1000 / len(actual),
+        "p95_ms": actual[int(len(actual) * 0.95)] * 1000,
+    }, controls.latency()
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    presses = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    actual, measured = measure(presses)
+    photon = measured["photon"]
+    print("实际延迟 平均 %.1f ms p95 %.1f ms  估计 平均 %.1f ms p95 %.1f ms  到模拟步 平均 %.2f ms" % (
+        actual["mean_ms"], actual["p95_ms"], photon["mean_ms"], photon["p95_ms"], measured["step"]["mean_ms"]))
@@ -0,0 +1,543 @@
+import random
+import math
+
+import pygame
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, BLUE, RED, GREEN, YELLOW, PURPLE, ORANGE, SPINNER_ANGLE_STEPS, SPINNER_SWEPT
+
+# 游戏实体：只包含数据和规则，不负责绘制和播放音效
+# 绘制由 render.py 完成，音效由 World 产生的事件驱动
+
+# 机器人类
+class Robot:
+    def __init__(self):
+        self.width = 50
+        self.height = 50
+        self.x = 100
+        self.y = SCREEN_HEIGHT // 2
+        # 上一步的位置，渲染时在两步之间插值
+        self.prev_y = self.y
+        self.velocity = 0
+        self.gravity = 0.5
+        self.lift = -10
+        self.color = BLUE
+        self.shield_active = False
+        self.shield_timer = 0
+        self.boost_active = False
+        self.boost_timer = 0
+        # 加速时障碍物和物品每步多移动的像素
+        self.boost_speed = 2
+        self.lives = 3
+        self.invulnerable = False
+        self.invulnerable_timer = 0
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def update(self):
+        self.prev_y = self.y
+        self.velocity += self.gravity
+        self.y += self.velocity
+
+        # 护盾计时器
+        if self.shield_active:
+            self.shield_timer -= 1
+            if self.shield_timer <= 0:
+                self.shield_active = False
+
+        # 加速计时器
+        if self.boost_active:
+            self.boost_timer -= 1
+            if self.boost_timer <= 0:
+                self.boost_active = False
+
+        # 无敌计时器
+        if self.invulnerable:
+            self.invulnerable_timer -= 1
+            if self.invulnerable_timer <= 0:
+                self.invulnerable = False
+
+        # 防止机器人飞出屏幕
+        if self.y > SCREEN_HEIGHT - self.height:
+            self.y = SCREEN_HEIGHT - self.height
+            self.velocity = 0
+        if self.y < 0:
+            self.y = 0
+            self.velocity = 0
+
+    def jump(self):
+        self.velocity = self.lift
+
+    # 碰撞矩形：原地更新缓存的矩形，不再每次新建
+    # pygame.Rect 构造时截断小数、给属性赋值时却是四舍五入，所以这里先用 int() 截断
+    def get_rect(self):
+        rect = self.rect
+        rect.x = int(self.x)
+        rect.y = int(self.y)
+        return rect
+
+    def activate_shield(self):
+        self.shield_active = True
+        self.shield_timer = 300  # 持续5秒(60帧/秒)
+
+    def activate_boost(self):
+        self.boost_active = True
+        self.boost_timer = 180  # 持续3秒
+
+    # 返回值表示机器人是否失去所有生命
+    def hit(self):
+        if self.shield_active:
+            self.shield_active = False
+            return False
+        elif self.invulnerable:
+            return False
+        else:
+            self.lives -= 1
+            self.invulnerable = True
+            self.invulnerable_timer = 120  # 2秒无敌时间
+            return self.lives <= 0
+
+# 障碍物和物品都放在对象池（pool.py）中重复使用：
+# 构造函数只创建一次性的对象（碰撞矩形），其余状态都在 reset() 中原地重置，
+# 用 __slots__ 减少每个对象的内存
+
+# 障碍物基类
+# placement 为 place(rng) 返回的摆放参数（位置等随机的部分），为 None 时用 rng 重新生成；
+# 生成计划（schedule.py）提前生成摆放参数并检查能否通过，再交给 World 创建实体
+class Obstacle:
+    __slots__ = ("width", "x", "prev_x", "speed", "passed")
+
+    def __init__(self, speed, rng=random, placement=None):
+        self.reset(speed, rng, placement)
+
+    @staticmethod
+    def place(rng):
+        return ()
+
+    def reset(self, speed, rng=random, placement=None):
+        self.width = 50
+        self.x = SCREEN_WIDTH
+        # 上一步的位置，渲染时在两步之间插值
+        self.prev_x = self.x
+        self.speed = speed
+        self.passed = False
+
+    def update(self, boost_speed=0):
+        self.prev_x = self.x
+        self.x -= (self.speed + boost_speed)
+
+    def offscreen(self):
+        return self.x < -self.width
+
+    # 粗检测用的水平范围：机器人不在这个范围内时 hit() 一定返回 False
+    def x_extent(self, robot):
+        return self.x, self.x + self.width
+
+    # 机器人经过这个障碍物时不会碰撞的高度范围（机器人顶边 y 的闭区间列表）
+    def safe_bands(self, robot):
+        return [(0, SCREEN_HEIGHT - robot.height)]
+
+    def pass_robot(self, robot):
+        if not self.passed and self.x + self.width < robot.x:
+            self.passed = True
+            return True
+        return False
+
+# 常规障碍物类
+class PipeObstacle(Obstacle):
+    __slots__ = ("top_height", "bottom_y", "color", "top_rect", "bottom_rect")
+
+    gap = 180
+
+    def __init__(self, speed, rng=random, placement=None):
+        self.top_rect = pygame.Rect(0, 0, 0, 0)
+        self.bottom_rect = pygame.Rect(0, 0, 0, 0)
+        super().__init__(speed, rng, placement)
+
+    # 上管的高度
+    @staticmethod
+    def place(rng):
+        return (rng.randint(50, SCREEN_HEIGHT - PipeObstacle.gap - 50),)
+
+    def reset(self, speed, rng=random, placement=None):
+        super().reset(speed, rng)
+        self.top_height, = placement if placement is not None else self.place(rng)
+        self.bottom_y = self.top_height + self.gap
+        self.color = GREEN
+        self.top_rect.update(self.x, 0, self.width, self.top_height)
+        self.bottom_rect.update(self.x, self.bottom_y, self.width, SCREEN_HEIGHT - self.bottom_y)
+
+    def hit(self, robot):
+        if robot.shield_active:
+            return False
+
+        robot_rect = robot.get_rect()
+        top_rect = self.top_rect
+        bottom_rect = self.bottom_rect
+        top_rect.x = bottom_rect.x = int(self.x)
+
+        return robot_rect.colliderect(top_rect) or robot_rect.colliderect(bottom_rect)
+
+    def safe_bands(self, robot):
+        return [(self.top_height, self.bottom_y - robot.height)]
+
+# 移动障碍物类
+# 移动块一直在上下移动，机器人可以在任何高度等它让开，所以 safe_bands() 使用基类的整个屏幕
+class MovingObstacle(Obstacle):
+    __slots__ = ("y", "prev_y", "color", "direction", "move_speed", "rect")
+
+    height = 100
+
+    def __init__(self, speed, rng=random, placement=None):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        super().__init__(speed, rng, placement)
+
+    # 初始高度和移动方向
+    @staticmethod
+    def place(rng):
+        return rng.randint(50, SCREEN_HEIGHT - MovingObstacle.height - 50), rng.choice([-1, 1])
+
+    def reset(self, speed, rng=random, placement=None):
+        super().reset(speed, rng)
+        self.y, self.direction = placement if placement is not None else self.place(rng)
+        self.prev_y = self.y
+        self.color = PURPLE
+        self.move_speed = 2
+        self.rect.update(self.x, self.y, self.width, self.height)
+
+    def update(self, boost_speed=0):
+        super().update(boost_speed)
+        self.prev_y = self.y
+        self.y += self.direction * self.move_speed
+
+        # 碰到边缘就改变方向
+        if self.y <= 0 or self.y + self.height >= SCREEN_HEIGHT:
+            self.direction *= -1
+
+    def hit(self, robot):
+        if robot.shield_active:
+            return False
+
+        robot_rect = robot.get_rect()
+        obstacle_rect = self.rect
+        obstacle_rect.x = int(self.x)
+        obstacle_rect.y = int(self.y)
+
+        return robot_rect.colliderect(obstacle_rect)
+
+# 叶片末端相对中心的偏移，精确计算
+def exact_blade_offsets(angle, num_blades, blade_length):
+    offsets = []
+    for i in range(num_blades):
+        a = angle + (2 * math.pi / num_blades) * i
+        offsets.append((math.cos(a) * blade_length, math.sin(a) * blade_length))
+    return tuple(offsets)
+
+# 叶片偏移查找表：把一整圈分成 steps 份，每个角度的叶片末端偏移预先算好
+class BladeTable:
+    def __init__(self, steps, num_blades, blade_length):
+        self.steps = steps
+        self.step_angle = 2 * math.pi / steps
+        self.offsets = [exact_blade_offsets(k * self.step_angle, num_blades, blade_length)
+                        for k in range(steps)]
+
+    # 最接近 angle 的量化角度下标
+    def index(self, angle):
+        return int(round(angle / self.step_angle)) % self.steps
+
+    def lookup(self, angle):
+        return self.offsets[self.index(angle)]
+
+_blade_tables = {}
+
+def blade_table(steps, num_blades, blade_length):
+    key = (steps, num_blades, blade_length)
+    table = _blade_tables.get(key)
+    if table is None:
+        table = _blade_tables[key] = BladeTable(steps, num_blades, blade_length)
+    return table
+
+# 叶片末端偏移：angle_steps 为 0 时精确计算，否则查表
+def blade_offsets(angle, num_blades, blade_length, angle_steps=SPINNER_ANGLE_STEPS):
+    if angle_steps:
+        return blade_table(angle_steps, num_blades, blade_length).lookup(angle)
+    return exact_blade_offsets(angle, num_blades, blade_length)
+
+# 胶囊体（线段 (x1, y1)-(x2, y2) 向外扩展 radius）是否与矩形 [left, right] × [top, bottom] 相交
+# 只用加减乘除和比较、不开方，批量模拟器按同样的运算顺序做到逐位一致
+def capsule_hits_rect(x1, y1, x2, y2, radius, left, top, right, bottom):
+    # 胶囊体的包围盒与矩形的间隔不小于 radius 时不可能相交，大多数叶片在这里就排除了
+    min_x = min(x1, x2)
+    max_x = max(x1, x2)
+    min_y = min(y1, y2)
+    max_y = max(y1, y2)
+    if min_x - right >= radius or left - max_x >= radius or min_y - bottom >= radius or top - max_y >= radius:
+        return False
+
+    dx = x2 - x1
+    dy = y2 - y1
+
+    # 线段本身与矩形相交：分离轴为 x 轴、y 轴和线段的法线
+    if min_x <= right and max_x >= left and min_y <= bottom and max_y >= top:
+        c = dx * y1 - dy * x1
+        low = min(dx * top, dx * bottom) - max(dy * left, dy * right)
+        high = max(dx * top, dx * bottom) - min(dy * left, dy * right)
+        if low <= c <= high:
+            return True
+
+    # 不相交时，线段与矩形的最近点对中一定有线段的端点或矩形的角
+    r2 = radius * radius
+    for px, py in ((x1, y1), (x2, y2)):
+        ex = max(left - px, 0, px - right)
+        ey = max(top - py, 0, py - bottom)
+        if ex * ex + ey * ey < r2:
+            return True
+    l2 = dx * dx + dy * dy
+    if l2 == 0:
+        return False
+    for px, py in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / l2))
+        ex = px - (x1 + t * dx)
+        ey = py - (y1 + t * dy)
+        if ex * ex + ey * ey < r2:
+            return True
+    return False
+
+# 旋转障碍物类
+class SpinningObstacle(Obstacle):
+    __slots__ = ("center_y", "angle", "prev_angle", "color", "rotation_speed",
+                 "blade_length", "blade_width", "num_blades")
+
+    # 整个障碍物（中心和叶片）都在这个半径的圆内
+    radius = 80
+
+    # 角度量化级数（类属性，批量模拟也读取这里，所以只按类修改）
+    angle_steps = SPINNER_ANGLE_STEPS
+    # 连续碰撞检测
+    swept = SPINNER_SWEPT
+
+    # 中心高度
+    @staticmethod
+    def place(rng):
+        radius = SpinningObstacle.radius
+        return (rng.randint(radius + 50, SCREEN_HEIGHT - radius - 50),)
+
+    def reset(self, speed, rng=random, placement=None):
+        super().reset(speed, rng)
+        self.center_y, = placement if placement is not None else self.place(rng)
+        self.angle = 0
+        self.prev_angle = self.angle
+        self.color = ORANGE
+        self.rotation_speed = 0.05
+        self.blade_length = 70
+        # 与绘制的线宽一致
+        self.blade_width = 8
+        self.num_blades = 3
+
+    def update(self, boost_speed=0):
+        super().update(boost_speed)
+        self.prev_angle = self.angle
+        self.angle += self.rotation_speed
+
+    # 整个障碍物都在半径为 radius 的圆内；连续检测时还包括上一步的位置
+    def x_extent(self, robot):
+        right = max(self.x, self.prev_x) if self.swept else self.x
+        return self.x - self.radius, right + self.radius
+
+    # 从包围圆的上方或下方经过
+    def safe_bands(self, robot):
+        bands = [(0, self.center_y - self.radius - robot.height),
+                 (self.center_y + self.radius, SCREEN_HEIGHT - robot.height)]
+        return [(low, high) for low, high in bands if low <= high]
+
+    # 每个叶片末端的坐标，绘制和碰撞检测共用
+    def blade_ends(self):
+        return [(self.x + dx, self.center_y + dy)
+                for dx, dy in blade_offsets(self.angle, self.num_blades, self.blade_length, self.angle_steps)]
+
+    def hit(self, robot):
+        if robot.shield_active:
+            return False
+
+        offsets = blade_offsets(self.angle, self.num_blades, self.blade_length, self.angle_steps)
+        left = int(robot.x)
+        if self.hit_at(left, int(robot.y), robot, self.x, offsets):
+            return True
+        if not self.swept:
+            return False
+
+        # 连续检测：在机器人相对障碍物的运动路径上补充检测中间位置，
+        # 相邻两次检测之间的相对位移在两个方向上都小于叶片宽度。
+        # 一步中叶片末端只转过 blade_length * rotation_speed（约 3.5 像素），不到叶片宽度，
+        # 所以中间位置都使用当前的角度
+        dx = self.prev_x - self.x
+        dy = robot.y - robot.prev_y
+        steps = int(max(dx, dy, -dy) / self.blade_width) + 1
+        for k in range(1, steps):
+            y = robot.prev_y + dy * k / steps
+            x = self.prev_x - dx * k / steps
+            if self.hit_at(left, int(y), robot, x, offsets):
+                return True
+        return False
+
+    # 机器人矩形左上角在 (left, top)、障碍物中心在 (x, center_y) 时是否碰撞
+    def hit_at(self, left, top, robot, x, offsets):
+        right = left + robot.width
+        bottom = top + robot.height
+        y = self.center_y
+
+        # 包围圆：机器人矩形与中心的距离不小于 radius 时不可能碰撞
+        ex = max(left - x, 0, x - right)
+        ey = max(top - y, 0, y - bottom)
+        if ex * ex + ey * ey >= self.radius * self.radius:
+            return False
+
+        # 中心方块，与 pygame.Rect(int(x - 20), y - 20, 40, 40).colliderect 相同
+        core = int(x - 20)
+        if left < core + 40 and right > core and top < y + 20 and bottom > y - 20:
+            return True
+
+        # 叶片：从中心到末端、宽度为 blade_width 的胶囊体
+        half = self.blade_width / 2
+        for dx, dy in offsets:
+            if capsule_hits_rect(x, y, x + dx, y + dy, half, left, top, right, bottom):
+                return True
+        return False
+
+# 比较量化后的叶片与精确三角函数的差别：
+# 返回叶片末端的最大误差（像素）以及随机采样的碰撞结果中不一致的比例
+def validate_blade_quantization(steps=SPINNER_ANGLE_STEPS, samples=20000, rng=None):
+    # 没有 __slots__ 的子类可以按实例覆盖 angle_steps、swept，不影响游戏中的障碍物
+    class Probe(SpinningObstacle):
+        pass
+
+    rng = rng or random.Random(0)
+    spinner = Probe(0, rng)
+    # 只比较同一位置上的结果，不做连续检测
+    spinner.swept = False
+    robot = Robot()
+    table = blade_table(steps, spinner.num_blades, spinner.blade_length)
+
+    max_error = 0
+    for k in range(steps * 8):
+        angle = k * table.step_angle / 8
+        exact = exact_blade_offsets(angle, spinner.num_blades, spinner.blade_length)
+        for (ex, ey), (qx, qy) in zip(exact, table.lookup(angle)):
+            max_error = max(max_error, math.hypot(ex - qx, ey - qy))
+
+    mismatches = 0
+    for _ in range(samples):
+        spinner.angle = rng.uniform(0, 2 * math.pi)
+        spinner.x = robot.x + robot.width / 2 + rng.uniform(-110, 110)
+        robot.y = spinner.center_y - robot.height / 2 + rng.uniform(-110, 110)
+        spinner.angle_steps = 0
+        exact_hit = spinner.hit(robot)
+        spinner.angle_steps = steps
+        mismatches += exact_hit != spinner.hit(robot)
+    return max_error, mismatches / samples
+
+# 点到线段的距离计算
+# 平方用乘法而不是 **2：乘法在所有平台上结果一致，批量模拟器依赖这一点做到逐位相同
+def point_to_line_distance(point, line_start, line_end):
+    x, y = point
+    x1, y1 = line_start
+    x2, y2 = line_end
+    dx = x2 - x1
+    dy = y2 - y1
+
+    # 线段长度的平方
+    l2 = dx * dx + dy * dy
+
+    # 如果线段实际是一个点，则返回点到该点的距离
+    if l2 == 0:
+        return math.sqrt((x - x1) * (x - x1) + (y - y1) * (y - y1))
+
+    # 考虑点到线的投影是否在线段内
+    t = max(0, min(1, ((x - x1) * dx + (y - y1) * dy) / l2))
+
+    # 计算投影点
+    projection_x = x1 + t * dx
+    projection_y = y1 + t * dy
+
+    # 返回点到投影点的距离
+    px = x - projection_x
+    py = y - projection_y
+    return math.sqrt(px * px + py * py)
+
+# 物品基类
+class Item:
+    __slots__ = ("width", "height", "x", "y", "rect", "prev_x", "speed", "collected", "color")
+
+    def __init__(self, rng=random, placement=None):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(rng, placement)
+
+    # 高度
+    @staticmethod
+    def place(rng):
+        return (rng.randint(50, SCREEN_HEIGHT - 50),)
+
+    def reset(self, rng=random, placement=None):
+        self.width = 25
+        self.height = 25
+        self.x = SCREEN_WIDTH
+        self.y, = placement if placement is not None else self.place(rng)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        # 上一步的位置，渲染时在两步之间插值
+        self.prev_x = self.x
+        self.speed = 3
+        self.collected = False
+
+    def update(self, boost_speed=0):
+        self.prev_x = self.x
+        self.x -= (self.speed + boost_speed)
+
+    def offscreen(self):
+        return self.x < -self.width
+
+    # 粗检测用的水平范围：机器人不在这个范围内时 collect() 一定返回 False
+    def x_extent(self, robot):
+        return self.x, self.x + self.width
+
+    def collect(self, robot):
+        if self.collected:
+            return False
+
+        robot_rect = robot.get_rect()
+        item_rect = self.rect
+        item_rect.x = int(self.x)
+
+        if robot_rect.colliderect(item_rect):
+            self.collected = True
+            return True
+        return False
+
+# 普通奖励
+class Reward(Item):
+    __slots__ = ()
+
+    def reset(self, rng=random, placement=None):
+        super().reset(rng, placement)
+        self.color = RED
+
+# 护盾物品
+class Shield(Item):
+    __slots__ = ()
+
+    def reset(self, rng=random, placement=None):
+        super().reset(rng, placement)
+        self.color = BLUE
+
+# 加速物品
+class Boost(Item):
+    __slots__ = ()
+
+    def reset(self, rng=random, placement=None):
+        super().reset(rng, placement)
+        self.color = YELLOW
+
+# 生命物品
+class Life(Item):
+    __slots__ = ()
+
+    def reset(self, rng=random, placement=None):
+        super().reset(rng, placement)
+        self.color = RED
@@ -0,0 +1,292 @@
+import math
+import random
+
+import numpy as np
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from entities import PipeObstacle, MovingObstacle, SpinningObstacle, Reward, Shield, Boost, Life
+from world import World, EVENT_HIT
+
+# 训练环境：把无界面的 World 包装成强化学习常用的 reset()/step() 接口（与 Gymnasium 相同的返回值），
+# 规则与游戏完全相同。动作 0 为不跳跃、1 为跳跃，观测为固定长度的 float32 向量：
+#
+#   机器人（6 项）  y、速度、护盾、加速、无敌、生命数
+#   障碍物（3 × 6） 机器人前方最近的三个障碍物，每个为种类（三项独热）、水平距离和两个参数：
+#                  管道为缺口的上下边缘，移动块为上下边缘，旋转障碍物为中心高度和当前角度；
+#                  不足三个时补 0
+#   物品（3 项）    最近的一个物品的水平距离、高度和种类（1~4，没有时为 0）
+#
+# 坐标都按屏幕尺寸归一化。奖励为得分的增加量，每存活一步加 SURVIVAL_REWARD，失去一条命扣 LIFE_PENALTY
+
+NEAREST_OBSTACLES = 3
+OBSTACLE_FEATURES = 6
+OBSERVATION_SIZE = 6 + NEAREST_OBSTACLES * OBSTACLE_FEATURES + 3
+
+SURVIVAL_REWARD = 0.01
+LIFE_PENALTY = 1.0
+
+_OBSTACLE_KINDS = {PipeObstacle: 0, MovingObstacle: 1, SpinningObstacle: 2}
+_ITEM_KINDS = {Reward: 1, Shield: 2, Boost: 3, Life: 4}
+
+# 把 world 的状态写入 out（长度为 OBSERVATION_SIZE 的数组）
+def observe(world, out):
+    robot = world.robot
+    out[:] = 0
+    out[0] = robot.y / SCREEN_HEIGHT
+    out[1] = robot.velocity / 10
+    out[2] = robot.shield_active
+    out[3] = robot.boost_active
+    out[4] = robot.invulnerable
+    out[5] = robot.lives
+
+    # 还没有完全通过机器人的障碍物，按距离排序
+    ahead = sorted((obstacle for obstacle in world.obstacles if obstacle.x + obstacle.width >= robot.x),
+                   key=lambda obstacle: obstacle.x)
+    offset = 6
+    for obstacle in ahead[:NEAREST_OBSTACLES]:
+        kind = _OBSTACLE_KINDS[type(obstacle)]
+        out[offset + kind] = 1
+        out[offset + 3] = (obstacle.x - robot.x) / SCREEN_WIDTH
+        if kind == 0:
+            out[offset + 4] = obstacle.top_height / SCREEN_HEIGHT
+            out[offset + 5] = obstacle.bottom_y / SCREEN_HEIGHT
+        elif kind == 1:
+            out[offset + 4] = obstacle.y / SCREEN_HEIGHT
+            out[offset + 5] = (obstacle.y + obstacle.height) / SCREEN_HEIGHT
+        else:
+            out[offset + 4] = obstacle.center_y / SCREEN_HEIGHT
+            out[offset + 5] = obstacle.angle % (2 * math.pi) / (2 * math.pi)
+        offset += OBSTACLE_FEATURES
+
+    offset = 6 + NEAREST_OBSTACLES * OBSTACLE_FEATURES
+    items = [item for item in world.items if item.x + item.width >= robot.x]
+    if items:
+        item = min(items, key=lambda item: item.x)
+        out[offset] = (item.x - robot.x) / SCREEN_WIDTH
+        out[offset + 1] = item.y / SCREEN_HEIGHT
+        out[offset + 2] = _ITEM_KINDS[type(item)]
+    return out
+
+class SkyRobotEnv:
+    # seed：决定每一局的种子序列；max_steps：一局最多的步数，达到后截断；world_args 传给 World
+    def __init__(self, seed=None, max_steps=10000, **world_args):
+        self.seeds = random.Random(seed)
+        self.max_steps = max_steps
+        self.world_args = world_args
+        self.world = None
+        self.observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+
+    # 开始新的一局，seed 为 None 时使用种子序列中的下一个，返回 (观测, 信息)
+    def reset(self, seed=None):
+        if seed is None:
+            seed = self.seeds.randrange(2**32)
+        self.world = World(rng=random.Random(seed), **self.world_args)
+        return observe(self.world, self.observation).copy(), {"seed": seed}
+
+    # 返回 (观测, 奖励, 是否结束, 是否截断, 信息)
+    def step(self, action):
+        world = self.world
+        score = world.score
+        reward = SURVIVAL_REWARD
+        for event in world.step(bool(action)):
+            if event[0] == EVENT_HIT and event[3]:
+                reward -= LIFE_PENALTY
+        reward += world.score - score
+        terminated = world.game_over
+        truncated = not terminated and world.frame >= self.max_steps
+        info = {"score": world.score, "level": world.level, "lives": world.robot.lives, "steps": world.frame}
+        return observe(world, self.observation).copy(), reward, terminated, truncated, info
+
+# ---- 向量化环境 ----
+# 同时运行 n 个环境，step(actions) 推进所有环境一步，返回按环境排列的数组；
+# 结束或截断的环境自动开始新的一局，返回的观测是新一局的第一个观测，
+# infos["score"] 为这一步之后（重新开始之前）各环境的得分
+
+class _EnvGroup:
+    def __init__(self, seeds, max_steps, world_args):
+        self.envs = [SkyRobotEnv(seed, max_steps, **world_args) for seed in seeds]
+
+    def reset(self, observations):
+        for k, env in enumerate(self.envs):
+            observations[k] = env.reset()[0]
+
+    def step(self, actions, observations, rewards, terminated, truncated, scores):
+        for k, env in enumerate(self.envs):
+            observation, rewards[k], terminated[k], truncated[k], info = env.step(actions[k])
+            scores[k] = info["score"]
+            if terminated[k] or truncated[k]:
+                observation = env.reset()[0]
+            observations[k] = observation
+
+# 在当前进程中依次运行所有环境
+class SyncVectorEnv:
+    def __init__(self, num_envs, seed=0, max_steps=10000, **world_args):
+        self.num_envs = num_envs
+        self.group = _EnvGroup(_env_seeds(seed, num_envs), max_steps, world_args)
+        self.observations = np.zeros((num_envs, OBSERVATION_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(num_envs)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        self.group.reset(self.observations)
+        return self.observations.copy()
+
+    def step(self, actions):
+        self.group.step(np.asarray(actions), self.observations, self.rewards, self.terminated,
+                        self.truncated, self.scores)
+        return (self.observations.copy(), self.rewards.copy(), self.terminated.copy(),
+                self.truncated.copy(), {"score": self.scores.copy()})
+
+    def close(self):
+        pass
+
+# 每个环境的种子，与 SyncVectorEnv、ProcessVectorEnv 一致
+def _env_seeds(seed, num_envs):
+    rng = random.Random(seed)
+    return [rng.randrange(2**32) for _ in range(num_envs)]
+
+# 共享内存中的数组：动作、观测、奖励、结束、截断、得分
+_SHARED_ARRAYS = (
+    ("actions", np.int8, ()),
+    ("observations", np.float32, (OBSERVATION_SIZE,)),
+    ("rewards", np.float64, ()),
+    ("terminated", np.bool_, ()),
+    ("truncated", np.bool_, ()),
+    ("scores", np.int64, ()),
+)
+
+# 共享内存的大小，每个数组按 64 字节对齐
+def _buffer_size(num_envs):
+    size = 0
+    for _, dtype, shape in _SHARED_ARRAYS:
+        size += num_envs * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+        size = (size + 63) // 64 * 64
+    return size
+
+def _shared_views(buffer, num_envs):
+    views = {}
+    offset = 0
+    for name, dtype, shape in _SHARED_ARRAYS:
+        array = np.ndarray((num_envs,) + shape, dtype=dtype, buffer=buffer, offset=offset)
+        views[name] = array
+        offset += array.nbytes
+        offset = (offset + 63) // 64 * 64
+    return views
+
+# 工作进程：负责 [start, stop) 范围内的环境，直接读写共享内存，通过管道只传递命令
+def _worker(connection, memory_name, num_envs, start, stop, seeds, max_steps, world_args):
+    from multiprocessing import shared_memory
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+    # 共享内存上的数组要在 close() 之前释放；初始化中途出错时它们可能还没有创建
+    views = part = None
+    try:
+        views = _shared_views(memory.buf, num_envs)
+        part = {name: view[start:stop] for name, view in views.items()}
+        group = _EnvGroup(seeds, max_steps, world_args)
+        while True:
+            command = connection.recv()
+            if command == "step":
+                group.step(part["actions"], part["observations"], part["rewards"], part["terminated"],
+                           part["truncated"], part["scores"])
+            elif command == "reset":
+                group.reset(part["observations"])
+            else:
+                break
+            connection.send(None)
+    finally:
+        views = part = None
+        memory.close()
+        connection.close()
+
+# 在进程池中运行环境：每个工作进程负责一段连续的环境，
+# 动作和观测等数组放在共享内存中，每一步只通过管道发送一条命令，不复制观测数据。
+# 结果与相同参数的 SyncVectorEnv 完全相同
+class ProcessVectorEnv:
+    def __init__(self, num_envs, num_workers=None, seed=0, max_steps=10000, context=None, **world_args):
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        context = context or multiprocessing.get_context()
+        num_workers = min(num_workers or multiprocessing.cpu_count(), num_envs)
+        self.num_envs = num_envs
+        seeds = _env_seeds(seed, num_envs)
+
+        self.memory = shared_memory.SharedMemory(create=True, size=_buffer_size(num_envs))
+        self.views = _shared_views(self.memory.buf, num_envs)
+
+        self.connections = []
+        self.processes = []
+        for k in range(num_workers):
+            start = num_envs * k // num_workers
+            stop = num_envs * (k + 1) // num_workers
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(child, self.memory.name, num_envs, start, stop,
+                                            seeds[start:stop], max_steps, world_args))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.closed = False
+
+    def _command(self, command):
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self):
+        self._command("reset")
+        return self.views["observations"].copy()
+
+    def step(self, actions):
+        views = self.views
+        views["actions"][:] = actions
+        self._command("step")
+        return (views["observations"].copy(), views["rewards"].copy(), views["terminated"].copy(),
+                views["truncated"].copy(), {"score": views["scores"].copy()})
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self.connections:
+            try:
+                connection.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        for connection in self.connections:
+            connection.close()
+        del self.views
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # 用随机策略测量吞吐量：python env.py [环境数] [工作进程数] [步数]
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    steps = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    policy = np.random.default_rng(0)
+    with ProcessVectorEnv(num_envs, num_workers) as envs:
+        envs.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            envs.step(policy.random(num_envs) < 0.05)
+        elapsed = time.perf_counter() - start
+    print("%d 个环境，%d 个工作进程，%.0f 步/秒（约 %.1f 百万步/小时）" %
+          (num_envs, len(envs.processes), num_envs * steps / elapsed, num_envs * steps / elapsed * 3600 / 1e6))
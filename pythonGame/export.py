@@ -0,0 +1,243 @@
+import os
+
+# 无窗口运行：必须在导入 pygame 之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# 原始视频流可以写到标准输出，不能混入 pygame 导入时的提示
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import pygame
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from timestep import SIM_RATE
+from world import World
+from particles import ParticleSystem
+from render import Renderer
+from replay import Replay
+from sky_robot_game import handle_events, init_display
+from audio import Sounds
+
+# 导出画面：不打开窗口，按回放或脚本化的输入逐步模拟，每步把画面画到离屏 Surface 上，
+# 不等待帧率限制，所以比实时快得多。
+#
+# 画面经过有界队列交给写入线程，写成 PNG 序列或原始视频流（可以直接交给 ffmpeg 编码）。
+# 离屏 Surface 轮流使用（队列长度 + 2 个）：写入线程直接读取 Surface 的像素缓冲区，
+# 写完后把 Surface 还回来，绘制线程再用它画新的一帧，每帧不需要复制画面。
+# 写入跟不上时绘制线程等待空闲的 Surface，内存占用保持不变。
+#
+#   python export.py replays/last.rpl --png frames/        导出回放为 PNG 序列
+#   python export.py replays/last.rpl --ffmpeg run.mp4      用 ffmpeg 编码为视频
+#   python export.py --seed 7 --steps 600 --raw - | ...     悬停策略玩一局，原始视频流写到标准输出
+
+# 导出时不播放音效
+_SILENT = Sounds()
+
+# 悬停策略，与 bench.hover 相同
+def hover(world):
+    robot = world.robot
+    return robot.y > SCREEN_HEIGHT / 2 and robot.velocity > 0
+
+# Surface 像素在内存中的字节顺序，用 ffmpeg 的像素格式名表示（例如 "bgr0"、"bgra"）
+def pixel_format(surface):
+    if surface.get_bytesize() != 4:
+        raise ValueError("只支持 32 位的 Surface")
+    # 没有的通道（通常是 alpha）掩码为 0，对应的字节用 "0" 表示
+    names = {shift: name for name, shift, mask in zip("rgba", surface.get_shifts(), surface.get_masks()) if mask}
+    order = "".join(names.get(byte * 8, "0") for byte in range(4))
+    return order if sys.byteorder == "little" else order[::-1]
+
+# ---- 写入 ----
+
+# PNG 序列：directory/frame_000000.png ...
+class PngWriter:
+    def __init__(self, directory, pattern="frame_%06d.png"):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pattern = pattern
+
+    def write(self, surface, index):
+        pygame.image.save(surface, os.path.join(self.directory, self.pattern % index))
+
+    def close(self):
+        pass
+
+# 原始视频流：每帧依次写入 Surface 的像素缓冲区（格式见 pixel_format()），
+# stream 可以是文件、标准输出或子进程的管道
+class RawWriter:
+    def __init__(self, stream, process=None):
+        self.stream = stream
+        self.process = process
+
+    def write(self, surface, index):
+        # BufferProxy 直接引用 Surface 的像素，写入时不复制
+        buffer = surface.get_buffer()
+        try:
+            self.stream.write(buffer)
+        finally:
+            del buffer
+
+    def close(self):
+        self.stream.flush()
+        if self.process is not None:
+            self.stream.close()
+            self.process.wait()
+
+# 启动 ffmpeg，把原始视频流编码为 path（每个模拟步一帧，按 SIM_RATE 帧每秒，回放速度与游戏相同）
+def ffmpeg_writer(path, surface, executable="ffmpeg"):
+    if shutil.which(executable) is None:
+        raise OSError("找不到 %s" % executable)
+    width, height = surface.get_size()
+    process = subprocess.Popen(
+        [executable, "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", pixel_format(surface),
+         "-s", "%dx%d" % (width, height), "-r", str(SIM_RATE), "-i", "-", "-pix_fmt", "yuv420p", path],
+        stdin=subprocess.PIPE)
+    return RawWriter(process.stdin, process)
+
+# 离屏 Surface 池和写入线程
+class FrameExporter:
+    def __init__(self, writer, template, queue_size=4):
+        self.writer = writer
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.free = queue.Queue()
+        for _ in range(queue_size + 2):
+            self.free.put(pygame.Surface(template.get_size(), 0, template))
+        self.error = None
+        # 统计：提交的帧数、绘制线程等待空闲 Surface 的次数和时间
+        self.submitted = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self.thread.start()
+
+    # 取一个空闲的 Surface 用来绘制下一帧，写入跟不上时在这里等待
+    def acquire(self):
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            pass
+        start = time.perf_counter()
+        surface = self.free.get()
+        self.stalls += 1
+        self.stall_time += time.perf_counter() - start
+        return surface
+
+    # 提交画好的一帧
+    def submit(self, surface):
+        if self.error is not None:
+            raise self.error
+        self.frames.put((self.submitted, surface))
+        self.submitted += 1
+
+    def _run(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            index, surface = frame
+            if self.error is None:
+                try:
+                    self.writer.write(surface, index)
+                except (OSError, pygame.error) as e:
+                    self.error = e
+            self.free.put(surface)
+
+    # 等待所有帧写完
+    def close(self):
+        self.frames.put(None)
+        self.thread.join()
+        self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+# ---- 模拟并导出 ----
+
+# 从种子开始模拟，每步调用 decide(step, world) 得到是否跳跃，画面交给 writer；
+# 游戏结束或达到 max_steps 时停止，返回统计
+def export(writer, seed, decide, max_steps=None, queue_size=4, screen=None):
+    screen = screen or pygame.display.get_surface() or init_display()
+    renderer = Renderer(screen)
+    renderer.set_dirty_rects(False)
+    renderer.prepare()
+
+    world = World(rng=random.Random(seed))
+    particles = ParticleSystem()
+    particles.seed(seed)
+    exporter = FrameExporter(writer, screen, queue_size)
+
+    start = time.perf_counter()
+    try:
+        step = 0
+        while not world.game_over and (max_steps is None or step < max_steps):
+            handle_events(world.step(decide(step, world)), particles, _SILENT)
+            particles.update()
+            step += 1
+
+            surface = exporter.acquire()
+            renderer.set_target(surface)
+            renderer.draw_world(world, particles, step)
+            exporter.submit(surface)
+    finally:
+        exporter.close()
+        renderer.set_target(screen)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": exporter.submitted,
+        "score": world.score,
+        "seconds": elapsed,
+        "fps": exporter.submitted / elapsed if elapsed else 0.0,
+        "stalls": exporter.stalls,
+        "stall_ms": exporter.stall_time * 1000,
+    }
+
+# 导出回放，输入与记录时完全相同
+def export_replay(replay, writer, queue_size=4):
+    jumps = set(replay.jumps)
+    return export(writer, replay.seed, lambda step, world: step in jumps, replay.steps, queue_size)
+
+# 用策略 policy(world) 玩一局并导出
+def export_policy(seed, policy, writer, max_steps=None, queue_size=4):
+    return export(writer, seed, lambda step, world: policy(world), max_steps, queue_size)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="无窗口导出天空机器人的画面")
+    parser.add_argument("replay", nargs="?", help="回放文件；不指定时用悬停策略玩一局")
+    parser.add_argument("--seed", type=int, default=0, help="不使用回放时的种子")
+    parser.add_argument("--steps", type=int, help="最多导出的步数")
+    parser.add_argument("--queue", type=int, default=4, help="写入队列的长度")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--png", metavar="DIR", help="导出 PNG 序列到目录")
+    output.add_argument("--raw", metavar="FILE", help="导出原始视频流，- 表示标准输出")
+    output.add_argument("--ffmpeg", metavar="FILE", help="用 ffmpeg 编码为视频文件")
+    args = parser.parse_args()
+
+    screen = init_display()
+    if args.png:
+        writer = PngWriter(args.png)
+    elif args.raw:
+        writer = RawWriter(sys.stdout.buffer if args.raw == "-" else open(args.raw, "wb"))
+    else:
+        writer = ffmpeg_writer(args.ffmpeg, screen)
+
+    if args.replay:
+        result = export_replay(Replay.load(args.replay), writer, args.queue)
+    else:
+        result = export_policy(args.seed, hover, writer, args.steps, args.queue)
+
+    # 原始视频流写到标准输出时，信息写到标准错误
+    log = sys.stderr if args.raw == "-" else sys.stdout
+    print("%d 帧，得分 %d，用时 %.2fs（%.0f 帧/秒），等待写入 %d 次 %.0f ms" %
+          (result["frames"], result["score"], result["seconds"], result["fps"], result["stalls"],
+           result["stall_ms"]), file=log)
+    if args.raw:
+        print("像素格式 %s，%dx%d，%d 帧/秒" % (pixel_format(screen), SCREEN_WIDTH, SCREEN_HEIGHT, SIM_RATE), file=log)
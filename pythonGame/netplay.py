@@ -0,0 +1,442 @@
+import heapq
+import random
+import select
+import socket
+import struct
+import time
+
+from settings import SCREEN_HEIGHT, NET_SERVER, NET_MAX_ROLLBACK
+from world import World
+from timestep import FixedTimestep
+import snapshot
+
+# 联机对战：两台机器用同一个种子各玩一局，比谁的得分高。
+#
+# 模拟是确定的，所以两边只需要交换每一步是否跳跃。每台机器模拟两个 World：
+# 自己的（输入立即可知）和对方的（RollbackWorld）。对方的输入经过网络才能到达，
+# 没有到达的步先按预测（不跳跃）模拟下去，并在每个预测的步之前保存快照（snapshot.py）；
+# 对方的真实输入到达后如果与预测不同，恢复到那一步之前的快照，用真实输入重新模拟到当前步。
+# 对方的输入落后超过 max_rollback 步时暂停等待，回滚的步数不会超过这个值。
+#
+# 网络使用非阻塞的 UDP 套接字，两台机器都连接到中继服务器（Relay），由它配对、分配种子并转发输入。
+# 每条输入消息包含对方还没有确认收到的全部输入，丢失的数据报由后面的消息补上。
+# 中继服务器可以模拟延迟和丢包，测试时在本机运行，对手也可以用脚本化的替身（bot）代替：
+#
+#   python netplay.py server --delay 80 --loss 0.05   启动中继服务器（模拟 80ms 延迟、5% 丢包）
+#   python netplay.py bot                              替身玩家：悬停策略，按真实时间推进
+#   python netplay.py bot 192.168.1.20:47800 --height 250
+
+# 消息（UDP 数据报，小端），第一个字节为类型
+MSG_HELLO = 1   # 玩家 → 服务器：请求加入对战，收到 MSG_START 之前重复发送
+MSG_START = 2   # 服务器 → 玩家：种子(u32)、玩家编号(u8)
+MSG_INPUT = 3   # 玩家 → 服务器 → 对方：已收到的对方输入数(u32)、第一个输入的步数(u32)、输入数(u16)、跳跃位图
+
+_HELLO = struct.Struct("<B")
+_START = struct.Struct("<BIB")
+_INPUT = struct.Struct("<BIIH")
+# 一条消息最多携带的输入数
+MAX_INPUTS_PER_MESSAGE = 1024
+
+# 替身玩家的悬停策略，与 bench.hover 相同，悬停的高度可以调整
+def hover(world, height=SCREEN_HEIGHT / 2):
+    robot = world.robot
+    return robot.y > height and robot.velocity > 0
+
+def _pack_bits(values):
+    data = bytearray((len(values) + 7) // 8)
+    for k, value in enumerate(values):
+        if value:
+            data[k >> 3] |= 1 << (k & 7)
+    return bytes(data)
+
+def _bit(data, k):
+    return data[k >> 3] >> (k & 7) & 1
+
+# ---- 网络 ----
+
+# 非阻塞的 UDP 套接字，peer 为默认的发送地址
+class UdpTransport:
+    def __init__(self, address=("0.0.0.0", 0), peer=None):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.bind(address)
+        self.peer = peer
+        # 统计：发送和接收的数据报数、字节数，发送失败的次数
+        self.sent = 0
+        self.received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.send_errors = 0
+
+    @property
+    def address(self):
+        return self.socket.getsockname()
+
+    # 发送失败（缓冲区满、对方的端口还没有打开）时丢弃，与网络丢包一样由之后的消息补上
+    def send(self, data, address=None):
+        try:
+            self.socket.sendto(data, address or self.peer)
+        except OSError:
+            self.send_errors += 1
+            return
+        self.sent += 1
+        self.bytes_sent += len(data)
+
+    # 取出所有已经到达的数据报，返回 [(数据, 地址)]，不等待
+    def receive(self):
+        messages = []
+        while True:
+            try:
+                data, address = self.socket.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # 有些系统上前一次发送被拒绝时会在这里报告，忽略
+                continue
+            messages.append((data, address))
+            self.received += 1
+            self.bytes_received += len(data)
+        return messages
+
+    # 等待数据到达，最多 timeout 秒
+    def wait(self, timeout):
+        if timeout > 0:
+            select.select([self.socket], [], [], timeout)
+
+    def close(self):
+        self.socket.close()
+
+# 中继服务器：配对最先加入的两个玩家，分配种子，之后把输入消息转发给对方。
+# delay（秒）和 loss（0~1）在转发时模拟网络延迟和丢包；两个玩家都超过 idle 秒没有消息时结束这一场
+class Relay:
+    def __init__(self, address=NET_SERVER, delay=0.0, loss=0.0, seed=None, idle=10.0, clock=time.perf_counter):
+        self.transport = UdpTransport(address)
+        self.delay = delay
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.idle = idle
+        self.clock = clock
+        self.peers = []
+        self.seed = None
+        self.last_message = 0.0
+        # 延迟转发的消息：(转发时间, 序号, 数据, 地址)
+        self.pending = []
+        self.order = 0
+        # 统计：转发和模拟丢弃的消息数
+        self.forwarded = 0
+        self.dropped = 0
+
+    @property
+    def address(self):
+        return self.transport.address
+
+    def poll(self):
+        now = self.clock()
+        if self.peers and now - self.last_message > self.idle:
+            self.peers = []
+            self.pending = []
+
+        for data, address in self.transport.receive():
+            if not data:
+                continue
+            kind = data[0]
+            if kind == MSG_HELLO:
+                self._hello(address, now)
+            elif kind == MSG_INPUT and len(self.peers) == 2 and address in self.peers:
+                self.last_message = now
+                if self.rng.random() < self.loss:
+                    self.dropped += 1
+                    continue
+                other = self.peers[1 - self.peers.index(address)]
+                heapq.heappush(self.pending, (now + self.delay, self.order, data, other))
+                self.order += 1
+
+        while self.pending and self.pending[0][0] <= now:
+            _, _, data, address = heapq.heappop(self.pending)
+            self.transport.send(data, address)
+            self.forwarded += 1
+
+    def _hello(self, address, now):
+        if address not in self.peers:
+            if len(self.peers) == 2:
+                return
+            self.peers.append(address)
+            self.last_message = now
+            if len(self.peers) < 2:
+                return
+            self.seed = self.rng.randrange(2**32)
+            for player, peer in enumerate(self.peers):
+                self.transport.send(_START.pack(MSG_START, self.seed, player), peer)
+        elif len(self.peers) == 2:
+            # 玩家没有收到 MSG_START，重新发送
+            self.transport.send(_START.pack(MSG_START, self.seed, self.peers.index(address)), address)
+
+    # 一直运行，直到 duration 秒后（None 表示不限）
+    def serve(self, duration=None):
+        end = None if duration is None else self.clock() + duration
+        while end is None or self.clock() < end:
+            self.poll()
+            timeout = 0.01
+            if self.pending:
+                timeout = min(timeout, max(0.0, self.pending[0][0] - self.clock()))
+            self.transport.wait(timeout)
+
+    def close(self):
+        self.transport.close()
+
+# 连接中继服务器并等待配对，返回 (transport, 种子, 玩家编号)
+def connect(server=NET_SERVER, timeout=30.0, clock=time.perf_counter):
+    transport = UdpTransport(peer=server)
+    deadline = clock() + timeout
+    next_hello = 0.0
+    while clock() < deadline:
+        now = clock()
+        if now >= next_hello:
+            transport.send(_HELLO.pack(MSG_HELLO))
+            next_hello = now + 0.2
+        for data, _ in transport.receive():
+            if len(data) == _START.size and data[0] == MSG_START:
+                _, seed, player = _START.unpack(data)
+                return transport, seed, player
+        transport.wait(0.01)
+    transport.close()
+    raise TimeoutError("等待对手超时")
+
+# ---- 回滚 ----
+
+# 输入经过网络延迟到达的 World：没有到达的步按预测模拟，真实输入与预测不同时回滚重新模拟
+class RollbackWorld:
+    def __init__(self, world, max_rollback=NET_MAX_ROLLBACK):
+        self.world = world
+        self.max_rollback = max_rollback
+        # 已经确认的输入（第 k 个是第 k 步的输入）和实际模拟每一步时用的输入
+        self.inputs = bytearray()
+        self.used = bytearray()
+        # 预测的步模拟之前的快照：步数 -> 快照
+        self.snapshots = {}
+        # 应该模拟到的步数（游戏结束后不再推进）
+        self.target = 0
+        # 最早的预测错误的步
+        self.mismatch = None
+        # 统计：回滚次数、重新模拟的总步数、最多回滚的步数、回滚的总用时和最长用时（秒）
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.max_depth = 0
+        self.rollback_time = 0.0
+        self.max_rollback_time = 0.0
+
+    # 跳跃是瞬间的输入，绝大多数步都不跳，预测"不跳"比重复上一步的输入更准
+    def predict(self):
+        return False
+
+    # 下一步（第 len(inputs) 步）的真实输入到达
+    def add_input(self, jump):
+        frame = len(self.inputs)
+        self.inputs.append(jump)
+        if frame < len(self.used) and self.used[frame] != jump:
+            if self.mismatch is None or frame < self.mismatch:
+                self.mismatch = frame
+
+    # 推进一步，先处理之前的预测错误
+    def advance(self):
+        self.target += 1
+        self.sync()
+
+    def sync(self):
+        world = self.world
+        if self.mismatch is not None:
+            start = time.perf_counter()
+            frame = self.mismatch
+            self.mismatch = None
+            depth = world.frame - frame
+            snapshot.restore(world, self.snapshots[frame])
+            del self.used[frame:]
+            while world.frame < self.target and not world.game_over:
+                self._step()
+            elapsed = time.perf_counter() - start
+            self.rollbacks += 1
+            self.resimulated += world.frame - frame
+            self.max_depth = max(self.max_depth, depth)
+            self.rollback_time += elapsed
+            self.max_rollback_time = max(self.max_rollback_time, elapsed)
+
+        while world.frame < self.target and not world.game_over:
+            self._step()
+
+        # 已经确认的步不会再回滚
+        confirmed = len(self.inputs)
+        for frame in [frame for frame in self.snapshots if frame < confirmed]:
+            del self.snapshots[frame]
+
+    def _step(self):
+        world = self.world
+        frame = world.frame
+        if frame < len(self.inputs):
+            jump = self.inputs[frame]
+        else:
+            jump = self.predict()
+            self.snapshots[frame] = snapshot.save(world)
+        self.used.append(jump)
+        world.step(jump)
+
+    # 当前的状态只用到了确认的输入
+    @property
+    def confirmed(self):
+        return self.mismatch is None and self.world.frame <= len(self.inputs)
+
+    # 游戏已经结束，不会再被回滚改变
+    @property
+    def finished(self):
+        return self.world.game_over and self.confirmed
+
+# 一场对战：本地的 World、对方的 RollbackWorld，以及和对方交换输入
+class RaceSession:
+    # timeout：超过这么多秒没有收到对方的消息时认为连接断开
+    def __init__(self, transport, seed, player, max_rollback=NET_MAX_ROLLBACK, timeout=5.0,
+                 clock=time.perf_counter, **world_args):
+        self.transport = transport
+        self.seed = seed
+        self.player = player
+        self.timeout = timeout
+        self.clock = clock
+        self.local = World(rng=random.Random(seed), **world_args)
+        self.remote = RollbackWorld(World(rng=random.Random(seed), **world_args), max_rollback)
+        # 本地每一步的输入，以及对方已经确认收到的数量
+        self.local_inputs = bytearray()
+        self.acked = 0
+        self.frame = 0
+        # 因为对方的输入落后太多而暂停的步数
+        self.stalls = 0
+        self.last_received = clock()
+
+    # 处理已经到达的消息
+    def poll(self):
+        remote = self.remote
+        for data, _ in self.transport.receive():
+            if len(data) < _INPUT.size or data[0] != MSG_INPUT:
+                continue
+            _, ack, start, count = _INPUT.unpack_from(data)
+            bits = data[_INPUT.size:]
+            if len(bits) * 8 < count:
+                continue
+            self.last_received = self.clock()
+            self.acked = max(self.acked, min(ack, len(self.local_inputs)))
+            # 重复或乱序的消息中已经收到的部分跳过
+            received = len(remote.inputs)
+            if start > received:
+                continue
+            for k in range(received - start, count):
+                remote.add_input(_bit(bits, k))
+
+    # 对方的输入没有落后太多，可以推进
+    def can_advance(self):
+        return self.frame - len(self.remote.inputs) < self.remote.max_rollback
+
+    # 用本地输入 jump 推进一步，返回本地 World 的事件
+    def advance(self, jump):
+        self.local_inputs.append(jump)
+        events = self.local.step(jump) if not self.local.game_over else []
+        self.frame += 1
+        self.remote.advance()
+        self.send()
+        return events
+
+    # 发送对方还没有确认的全部本地输入，暂停等待时也调用
+    def send(self):
+        start = self.acked
+        values = self.local_inputs[start:start + MAX_INPUTS_PER_MESSAGE]
+        self.transport.send(_INPUT.pack(MSG_INPUT, len(self.remote.inputs), start, len(values)) + _pack_bits(values))
+
+    @property
+    def disconnected(self):
+        return self.clock() - self.last_received > self.timeout
+
+    # 两局都已经结束，并且对方已经收到了模拟本地这一局需要的全部输入
+    @property
+    def done(self):
+        return self.local.game_over and self.remote.finished and self.acked >= self.local.frame
+
+    # 胜者的玩家编号，平局为 None
+    def winner(self):
+        local, remote = self.local.score, self.remote.world.score
+        if local == remote:
+            return None
+        return self.player if local > remote else 1 - self.player
+
+    def stats(self):
+        remote = self.remote
+        return {
+            "frames": self.frame,
+            "stalls": self.stalls,
+            "rollbacks": remote.rollbacks,
+            "resimulated": remote.resimulated,
+            "max_depth": remote.max_depth,
+            "mean_rollback_ms": remote.rollback_time / remote.rollbacks * 1000 if remote.rollbacks else 0.0,
+            "max_rollback_ms": remote.max_rollback_time * 1000,
+            "sent": self.transport.sent,
+            "bytes_sent": self.transport.bytes_sent,
+        }
+
+# 按真实时间（timestep.SIM_RATE 步每秒）进行一场对战，policy(world) 决定本地是否跳跃；
+# 结束后继续发送 linger 秒，让对方也能收到最后的确认
+def run(session, policy, linger=0.5):
+    timestep = FixedTimestep()
+    while not session.done:
+        if session.disconnected:
+            raise ConnectionError("与对方的连接断开")
+        session.poll()
+        for _ in range(timestep.advance()):
+            if session.can_advance():
+                local = session.local
+                session.advance(not local.game_over and policy(local))
+            else:
+                session.stalls += 1
+                session.send()
+        session.transport.wait(timestep.dt - timestep.accumulator)
+    end = time.perf_counter() + linger
+    while time.perf_counter() < end:
+        session.poll()
+        session.send()
+        session.transport.wait(timestep.dt)
+    return session
+
+def _address(text):
+    host, _, port = text.rpartition(":")
+    return host or NET_SERVER[0], int(port)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="天空机器人联机对战")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server = commands.add_parser("server", help="运行中继服务器")
+    server.add_argument("--host", default="0.0.0.0")
+    server.add_argument("--port", type=int, default=NET_SERVER[1])
+    server.add_argument("--delay", type=float, default=0, help="模拟的单向延迟（毫秒）")
+    server.add_argument("--loss", type=float, default=0, help="模拟的丢包率（0~1）")
+    server.add_argument("--seed", type=int, help="分配种子和模拟丢包用的随机数种子")
+    bot = commands.add_parser("bot", help="替身玩家：用悬停策略进行一场对战")
+    bot.add_argument("server", nargs="?", type=_address, default=NET_SERVER, help="服务器地址 HOST:PORT")
+    bot.add_argument("--height", type=float, default=SCREEN_HEIGHT / 2, help="悬停的高度")
+    args = parser.parse_args()
+
+    if args.command == "server":
+        relay = Relay((args.host, args.port), args.delay / 1000, args.loss, args.seed)
+        print("中继服务器 %s:%d" % relay.address)
+        try:
+            relay.serve()
+        except KeyboardInterrupt:
+            pass
+        relay.close()
+    else:
+        transport, seed, player = connect(args.server)
+        session = run(RaceSession(transport, seed, player), lambda world: hover(world, args.height))
+        transport.close()
+        winner = session.winner()
+        print("种子 %d，玩家 %d：本方 %d 分，对方 %d 分，%s" % (
+            seed, player, session.local.score, session.remote.world.score,
+            "平局" if winner is None else ("获胜" if winner == player else "落败")))
+        stats = session.stats()
+        print("%d 步，暂停 %d 步，回滚 %d 次（最多 %d 步，平均 %.2f ms，最长 %.2f ms），发送 %d 个数据报 %d 字节" % (
+            stats["frames"], stats["stalls"], stats["rollbacks"], stats["max_depth"], stats["mean_rollback_ms"],
+            stats["max_rollback_ms"], stats["sent"], stats["bytes_sent"]))
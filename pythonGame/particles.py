@@ -0,0 +1,139 @@
+import numpy as np
+
+# 粒子系统：按列存储所有粒子（结构数组），容量固定
+# 存活的粒子始终紧凑地排在 [0, count) 中，死亡的粒子用末尾的存活粒子填补（交换删除），
+# 更新、删除都是整体的数组运算，不再为每个粒子创建对象
+
+# 默认容量和预算
+PARTICLE_CAPACITY = 2048
+PARTICLE_BUDGET = 800
+
+class ParticleSystem:
+    # budget：同时存活粒子的上限，不超过 capacity；
+    # 存活数超过 budget * degrade_start 后，新爆发的粒子数按负载线性减少，最少保留 min_burst
+    def __init__(self, capacity=PARTICLE_CAPACITY, budget=PARTICLE_BUDGET, degrade_start=0.5,
+                 min_burst=0.25, rng=None):
+        self.capacity = capacity
+        self.budget = min(budget, capacity)
+        self.degrade_start = degrade_start
+        self.min_burst = min_burst
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int16)
+        self.count = 0
+
+        # 颜色表，粒子只保存颜色下标
+        self.palette = []
+        self.palette_index = {}
+
+        # 统计：请求生成的数量、因负载被减少的数量、被提前替换掉的数量、同时存活数量的最高值
+        self.requested = 0
+        self.degraded = 0
+        self.replaced = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    # 重新设置随机数种子（每局开始时），粒子使用与游戏模拟分开的随机数
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def color_index(self, color):
+        index = self.palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = index
+        return index
+
+    # 负载较高时减少爆发的粒子数
+    def _burst_size(self, n):
+        load = self.count / self.budget if self.budget else 1
+        if load <= self.degrade_start:
+            return n
+        scale = max(self.min_burst, 1 - (load - self.degrade_start) / (1 - self.degrade_start))
+        return max(1, int(n * scale))
+
+    # 在 (x, y) 生成 n 个粒子，参数分布与原来的 Particle 相同
+    def emit(self, x, y, color, n):
+        if self.budget <= 0:
+            return
+        self.requested += n
+        burst = self._burst_size(n)
+        self.degraded += n - burst
+
+        start = self.count
+        free = self.budget - start
+        if burst > free:
+            # 预算用完时，替换剩余寿命最短的粒子（它们本来也快消失了）
+            evict = min(burst - free, start)
+            burst = free + evict
+            victims = np.argpartition(self.life[:start], evict - 1)[:evict] if evict else np.arange(0)
+            slots = np.concatenate((victims, np.arange(start, start + free)))
+            self.replaced += evict
+            self.count = start + free
+        else:
+            slots = np.arange(start, start + burst)
+            self.count = start + burst
+
+        if self.count > self.high_water:
+            self.high_water = self.count
+
+        rng = self.rng
+        self.x[slots] = x
+        self.y[slots] = y
+        self.size[slots] = rng.integers(2, 7, burst)
+        self.vx[slots] = rng.uniform(-2, 2, burst)
+        self.vy[slots] = rng.uniform(-2, 2, burst)
+        self.life[slots] = rng.integers(20, 41, burst)
+        self.color[slots] = self.color_index(color)
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.life[:n] -= 1
+        size = self.size[:n]
+        np.maximum(size - 0.1, 0, out=size)
+
+        # 交换删除：前 alive 个位置中的空洞由后面存活的粒子填补
+        alive_mask = self.life[:n] > 0
+        alive = int(np.count_nonzero(alive_mask))
+        if alive == n:
+            return
+        holes = np.flatnonzero(~alive_mask[:alive])
+        if len(holes):
+            donors = alive + np.flatnonzero(alive_mask[alive:])
+            for array in (self.x, self.y, self.vx, self.vy, self.size, self.life, self.color):
+                array[holes] = array[donors]
+        self.count = alive
+
+    # 绘制用的数据：整数坐标、整数半径和颜色下标，已去掉半径为 0 的粒子
+    def draw_data(self):
+        n = self.count
+        radius = self.size[:n].astype(np.int32)
+        visible = radius > 0
+        return (self.x[:n][visible].astype(np.int32), self.y[:n][visible].astype(np.int32),
+                radius[visible], self.color[:n][visible])
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "budget": self.budget,
+            "requested": self.requested,
+            "degraded": self.degraded,
+            "replaced": self.replaced,
+            "high_water": self.high_water,
+        }
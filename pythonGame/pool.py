@@ -0,0 +1,50 @@
+# 实体对象池：每种类型一个空闲列表
+# 移除的障碍物和物品放回空闲列表，下次生成同类型的实体时用 reset() 原地重置后再次使用，
+# 长时间游戏时几乎不再创建新对象，也就不会触发垃圾回收
+class EntityPool:
+    def __init__(self):
+        self.free = {}
+        # 每种类型：正在使用的数量、同时使用数量的最高值、总共创建的对象数
+        self.live = {}
+        self.high_water = {}
+        self.created = {}
+        self.reused = 0
+
+    # 取出一个 cls 类型的对象，args 与构造函数的参数相同
+    def acquire(self, cls, *args):
+        free = self.free.get(cls)
+        if free:
+            entity = free.pop()
+            entity.reset(*args)
+            self.reused += 1
+        else:
+            entity = cls(*args)
+            self.created[cls] = self.created.get(cls, 0) + 1
+        live = self.live.get(cls, 0) + 1
+        self.live[cls] = live
+        if live > self.high_water.get(cls, 0):
+            self.high_water[cls] = live
+        return entity
+
+    # 放回对象，之后不能再使用它
+    def release(self, entity):
+        cls = type(entity)
+        self.free.setdefault(cls, []).append(entity)
+        self.live[cls] -= 1
+
+    # 预先创建 count 个对象，可以按 stats() 中的最高值设置，args 只用于构造，会在取出时重置
+    def reserve(self, cls, count, *args):
+        free = self.free.setdefault(cls, [])
+        while len(free) < count:
+            free.append(cls(*args))
+            self.created[cls] = self.created.get(cls, 0) + 1
+
+    # 每种类型的使用情况，键为类名
+    def stats(self):
+        return {cls.__name__: {
+                    "live": self.live.get(cls, 0),
+                    "free": len(self.free.get(cls, ())),
+                    "high_water": self.high_water.get(cls, 0),
+                    "created": self.created.get(cls, 0),
+                }
+                for cls in self.created}
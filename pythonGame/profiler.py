@@ -0,0 +1,184 @@
+import os
+import time
+from collections import deque
+
+import pygame
+
+from settings import WHITE, GREEN, YELLOW, RED
+
+# 帧性能分析：把主循环的每一帧分成若干阶段计时
+# 每个阶段结束时调用 mark(阶段名)，记录从上一次 mark 到现在的时间；
+# 一帧中同一个阶段可以出现多次（例如每个模拟步都有 update），时间会累加。
+# 最近 window 帧的数据用于叠加层显示，也可以逐帧写入 CSV 文件做离线分析
+
+PHASES = ("events", "update", "collision", "particles", "background", "entities", "hud", "flip")
+
+# 帧时间直方图的分段上限（毫秒），最后一段为超过 33.3ms
+HISTOGRAM_BOUNDS = (8.0, 12.0, 16.7, 20.0, 33.3)
+
+class FrameProfiler:
+    def __init__(self, window=120, clock=time.perf_counter):
+        self.clock = clock
+        self.frames = deque(maxlen=window)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = None
+        self.last = None
+        self.interval = 0.0
+        self.frame_index = 0
+        # 上一帧的用时（秒），不包括等待帧率限制的时间
+        self.work = 0.0
+        self.trace = None
+        self.trace_path = None
+        self.trace_counts = None
+        # 输入延迟统计（controls.LatencyStats），设置后显示在叠加层上
+        self.latency = None
+
+    def begin_frame(self):
+        now = self.clock()
+        # 两帧开始时间的间隔，包括等待帧率限制的时间，用于计算 FPS
+        self.interval = now - self.frame_start if self.frame_start is not None else 0.0
+        self.frame_start = self.last = now
+        current = self.current
+        for phase in PHASES:
+            current[phase] = 0.0
+
+    # 结束一个阶段
+    def mark(self, phase):
+        now = self.clock()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    # 把已经计入 source 阶段的 seconds 秒移到 target 阶段（例如 World.step 中的碰撞检测）
+    def move(self, source, target, seconds):
+        self.current[source] -= seconds
+        self.current[target] += seconds
+
+    # counts：本帧的实体数量等，例如 {"obstacles": 3, "items": 1, "particles": 120}
+    def end_frame(self, counts):
+        work = self.work = self.clock() - self.frame_start
+        phases = tuple(self.current[phase] for phase in PHASES)
+        self.frames.append((self.interval, work, phases, counts))
+        if self.trace is not None:
+            self._write_trace(work, phases, counts)
+        self.frame_index += 1
+
+    # ---- 统计 ----
+
+    # 最近 window 帧的统计：FPS、平均和最长帧时间、各阶段平均毫秒数、直方图和最新的实体数量
+    def summary(self):
+        frames = self.frames
+        if not frames:
+            return None
+        count = len(frames)
+        intervals = [frame[0] for frame in frames if frame[0] > 0]
+        works = [frame[1] for frame in frames]
+        phase_ms = [sum(frame[2][k] for frame in frames) * 1000 / count for k in range(len(PHASES))]
+
+        histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for interval in intervals:
+            ms = interval * 1000
+            bucket = 0
+            while bucket < len(HISTOGRAM_BOUNDS) and ms >= HISTOGRAM_BOUNDS[bucket]:
+                bucket += 1
+            histogram[bucket] += 1
+
+        return {
+            "fps": len(intervals) / sum(intervals) if intervals else 0.0,
+            "work_ms": sum(works) * 1000 / count,
+            "max_ms": max(intervals, default=0.0) * 1000,
+            "phases_ms": dict(zip(PHASES, phase_ms)),
+            "histogram": histogram,
+            "counts": frames[-1][3],
+            "latency": self.latency.summary() if self.latency is not None else None,
+        }
+
+    # ---- 逐帧记录 ----
+
+    # 开始把每一帧的数据写入 CSV 文件（毫秒）
+    def start_trace(self, path):
+        self.stop_trace()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.trace = open(path, "w", encoding="utf-8")
+        self.trace_counts = None
+        self.trace_path = path
+
+    def stop_trace(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def _write_trace(self, work, phases, counts):
+        trace = self.trace
+        if self.trace_counts is None:
+            # 第一帧时写表头，数量列按第一帧的 counts 确定，加上 n_ 前缀
+            self.trace_counts = tuple(counts)
+            count_columns = tuple("n_" + name for name in self.trace_counts)
+            trace.write(",".join(("frame", "interval_ms", "work_ms") + PHASES + count_columns) + "\n")
+        values = ["%d" % self.frame_index, "%.3f" % (self.interval * 1000), "%.3f" % (work * 1000)]
+        values.extend("%.3f" % (value * 1000) for value in phases)
+        values.extend(str(counts.get(name, "")) for name in self.trace_counts)
+        trace.write(",".join(values) + "\n")
+
+# 性能叠加层：半透明面板，显示 FPS、帧时间直方图、各阶段用时和实体数量
+# 面板内容每 refresh 帧重新生成一次，其他帧直接 blit，避免每帧重新渲染文字
+class ProfilerOverlay:
+    WIDTH = 300
+    LINE_HEIGHT = 16
+
+    def __init__(self, profiler, font, refresh=15):
+        self.profiler = profiler
+        self.font = font
+        self.refresh = refresh
+        self.panel = None
+        self.age = 0
+
+    def _build(self):
+        summary = self.profiler.summary()
+        if summary is None:
+            return None
+        lines = ["FPS %.0f  work %.2fms  max %.1fms" % (summary["fps"], summary["work_ms"], summary["max_ms"])]
+        latency = summary["latency"]
+        if latency is not None:
+            lines.append("input %.1fms  p95 %.1fms" % (latency["mean_ms"], latency["p95_ms"]))
+        for phase, ms in summary["phases_ms"].items():
+            lines.append("%-10s %6.2f ms" % (phase, ms))
+        for name, value in summary["counts"].items():
+            lines.append("%-10s %6s" % (name, value))
+
+        histogram = summary["histogram"]
+        bar_height = 40
+        height = len(lines) * self.LINE_HEIGHT + bar_height + 28
+        panel = pygame.Surface((self.WIDTH, height))
+        panel.fill((0, 0, 0))
+        panel.set_alpha(200)
+
+        y = 4
+        for line in lines:
+            panel.blit(self.font.render(line, True, WHITE), (6, y))
+            y += self.LINE_HEIGHT
+
+        # 直方图：每段一根柱子，绿色在 60 FPS 预算内，黄色接近，红色超出
+        labels = ["<8", "<12", "<17", "<20", "<33", "33+"]
+        colors = [GREEN, GREEN, GREEN, YELLOW, RED, RED]
+        total = max(sum(histogram), 1)
+        bar_width = (self.WIDTH - 12) // len(histogram)
+        base = y + 4 + bar_height
+        for k, count in enumerate(histogram):
+            x = 6 + k * bar_width
+            h = int(bar_height * count / total)
+            if h:
+                pygame.draw.rect(panel, colors[k], (x + 2, base - h, bar_width - 4, h))
+            panel.blit(self.font.render(labels[k], True, WHITE), (x + 2, base + 2))
+        return panel
+
+    # 画在 surface 的左下角，返回绘制区域（没有数据时返回 None）
+    def draw(self, surface):
+        if self.panel is None or self.age >= self.refresh:
+            self.panel = self._build()
+            self.age = 0
+        self.age += 1
+        if self.panel is None:
+            return None
+        return surface.blit(self.panel, (10, surface.get_height() - self.panel.get_height() - 10))
@@ -0,0 +1,369 @@
+import pygame
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLUE, RED, GREEN, BLACK, YELLOW, SKY_BLUE, DIRTY_RECTS
+from entities import (PipeObstacle, MovingObstacle, SpinningObstacle, Reward, Shield, Boost, Life, exact_blade_offsets,
+                      blade_table)
+from textcache import TextCache, get_font
+from sprites import SpriteCache, draw_spinner, ROBOT_MARGIN_LEFT, ROBOT_MARGIN_TOP
+from background import make_cloud_layer, make_star_layer, CLOUD_LAYER_HEIGHT
+from profiler import ProfilerOverlay
+from backends import SurfaceBackend
+
+# 云朵所在的带状区域，云朵移动时只需要刷新这一块
+CLOUD_BAND = pygame.Rect(0, 0, SCREEN_WIDTH, CLOUD_LAYER_HEIGHT)
+
+# 物品类型对应的精灵种类
+ITEM_KINDS = {
+    Reward: "reward",
+    Shield: "shield",
+    Boost: "boost",
+    Life: "life",
+}
+
+# 渲染器：读取 World 和粒子的状态并绘制到屏幕上
+# 原来各个实体类里的 show() 方法都集中到这里，画面怎样交给屏幕由后端（backends.py）负责：
+# 默认是画到 screen 上的 SurfaceBackend，也可以传入 TextureBackend
+class Renderer:
+    def __init__(self, screen=None, backend=None):
+        self.backend = backend or SurfaceBackend(screen)
+        # 所有绘制都画到后端的画布上
+        self.screen = self.backend.canvas
+        self.font = get_font(None, 36)
+        self.small_font = get_font(None, 24)
+        self.title_font = get_font(None, 72)
+        self.text = TextCache()
+        self.particle_sprites = {}
+        self.sprites = SpriteCache()
+        # 预先渲染的背景层，星空只在结束画面用到，第一次用到时再生成
+        self.clouds = make_cloud_layer()
+        self.stars = None
+        # 插值系数：实体绘制在上一步和当前步之间的 alpha 处，1 表示当前步
+        self.alpha = 1.0
+
+        # 脏矩形渲染状态，后端不支持只提交部分区域时每帧整屏重画
+        self.dirty_rects = DIRTY_RECTS and self.backend.partial_updates
+        self.show_dirty = False
+        self.background = self.backend.layer() if self.backend.partial_updates else None
+        self.cloud_offset = None
+        self.drawn = []
+        self.previous = []
+        self.partial_frame = False
+        self.full_redraw = True
+
+        # 性能分析：profiler 为 profiler.FrameProfiler，设置后按阶段计时，show_profiler 控制叠加层
+        self.profiler = None
+        self.profiler_overlay = None
+        self.show_profiler = False
+        # 按实体类型分发绘制方法
+        self.drawers = {
+            PipeObstacle: self.draw_pipe,
+            MovingObstacle: self.draw_moving,
+            SpinningObstacle: self.draw_spinning,
+            Reward: self.draw_item,
+            Shield: self.draw_item,
+            Boost: self.draw_item,
+            Life: self.draw_item,
+        }
+
+    # 预先生成耗时较多的缓存（旋转图集、星空），避免第一次用到时卡顿
+    def prepare(self):
+        if self.stars is None:
+            self.stars = make_star_layer()
+        spinner = SpinningObstacle(0)
+        if self.backend.rotation:
+            self.sprites.spinner(spinner.num_blades, spinner.blade_length, spinner.color)
+        elif spinner.angle_steps:
+            self.sprites.spinner_atlas(spinner.angle_steps, spinner.num_blades, spinner.blade_length, spinner.color)
+
+    # 上一步的值 previous 和当前值 current 之间按 alpha 插值
+    def lerp(self, previous, current):
+        return previous + (current - previous) * self.alpha
+
+    def set_profiler(self, profiler):
+        self.profiler = profiler
+        self.profiler_overlay = ProfilerOverlay(profiler, get_font("dejavusansmono,consolas,monospace", 15))
+
+    # 结束一个计时阶段
+    def phase(self, name):
+        if self.profiler is not None:
+            self.profiler.mark(name)
+
+    # 性能叠加层，画在所有内容之上
+    def draw_profiler(self):
+        if self.show_profiler and self.profiler_overlay is not None:
+            rect = self.profiler_overlay.draw(self.screen)
+            if rect is not None:
+                self.mark(rect)
+
+    def draw_entity(self, entity):
+        self.drawers[type(entity)](entity)
+
+    def draw_robot(self, robot):
+        # 绘制机器人主体
+        if robot.invulnerable and robot.invulnerable_timer % 12 < 6:
+            # 无敌状态闪烁（每 12 步隐藏 6 步，按模拟步计时，导出视频时画面也是确定的）
+            pass
+        else:
+            sprite = self.sprites.robot(robot.width, robot.height, robot.color,
+                                        robot.shield_active, robot.boost_active)
+            y = self.lerp(robot.prev_y, robot.y)
+            self.mark(self.screen.blit(sprite, (int(robot.x) - ROBOT_MARGIN_LEFT, int(y) - ROBOT_MARGIN_TOP)))
+
+    def draw_pipe(self, pipe):
+        strip = self.sprites.strip(pipe.width, pipe.color)
+        x = int(self.lerp(pipe.prev_x, pipe.x))
+        # 绘制上方障碍物
+        self.mark(self.screen.blit(strip, (x, 0), (0, 0, pipe.width, pipe.top_height)))
+        # 绘制下方障碍物
+        self.mark(self.screen.blit(strip, (x, pipe.bottom_y), (0, 0, pipe.width, SCREEN_HEIGHT - pipe.bottom_y)))
+
+    def draw_moving(self, obstacle):
+        x = self.lerp(obstacle.prev_x, obstacle.x)
+        y = self.lerp(obstacle.prev_y, obstacle.y)
+        self.mark(self.screen.blit(self.sprites.block(obstacle.width, obstacle.height, obstacle.color),
+                                   (int(x), int(y))))
+
+    def draw_spinning(self, spinner):
+        x = self.lerp(spinner.prev_x, spinner.x)
+        angle = self.lerp(spinner.prev_angle, spinner.angle)
+        rotation = self.backend.rotation
+        if not rotation and spinner.angle_steps:
+            # 从旋转图集中取出最接近当前角度的一帧
+            atlas = self.sprites.spinner_atlas(spinner.angle_steps, spinner.num_blades,
+                                               spinner.blade_length, spinner.color)
+            self.mark(self.screen.blit(atlas.frame(angle),
+                                       (int(x) - atlas.half, int(spinner.center_y) - atlas.half)))
+        elif not rotation and self.backend.primitives:
+            self.mark(draw_spinner(self.screen, x, spinner.center_y,
+                                   exact_blade_offsets(angle, spinner.num_blades, spinner.blade_length),
+                                   spinner.color))
+        else:
+            # 一张精灵按角度旋转绘制（纹理后端，或者不能直接画线的缩放画布），角度与碰撞检测一样量化
+            if spinner.angle_steps:
+                table = blade_table(spinner.angle_steps, spinner.num_blades, spinner.blade_length)
+                angle = table.index(angle) * table.step_angle
+            sprite = self.sprites.spinner(spinner.num_blades, spinner.blade_length, spinner.color)
+            self.mark(self.screen.blit_rotated(sprite, (int(x), int(spinner.center_y)), angle))
+
+    def draw_item(self, item):
+        sprite = self.sprites.item(ITEM_KINDS[type(item)], item.width, item.height, item.color)
+        x = self.lerp(item.prev_x, item.x)
+        self.mark(self.screen.blit(sprite, (int(x), int(item.y))))
+
+    # 粒子精灵：每种颜色、每种半径只画一次圆，之后批量 blit
+    def particle_sprite(self, color, radius):
+        key = (color, radius)
+        sprite = self.particle_sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((radius * 2, radius * 2))
+            sprite.fill(BLACK if color != BLACK else WHITE)
+            sprite.set_colorkey(sprite.get_at((0, 0)), pygame.RLEACCEL)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            self.particle_sprites[key] = sprite
+        return sprite
+
+    def draw_particles(self, particles):
+        xs, ys, radii, colors = particles.draw_data()
+        if not len(xs):
+            return
+        palette = particles.palette
+        sprite = self.particle_sprite
+        self.screen.blits([(sprite(palette[c], r), (x - r, y - r))
+                           for x, y, r, c in zip(xs.tolist(), ys.tolist(), radii.tolist(), colors.tolist())],
+                          doreturn=False)
+        # 所有粒子合成一个包围矩形
+        left = int((xs - radii).min())
+        top = int((ys - radii).min())
+        self.mark(pygame.Rect(left, top, int((xs + radii).max()) - left, int((ys + radii).max()) - top))
+
+    # 绘制云朵
+    def draw_clouds(self, frame_count, surface=None):
+        return self.clouds.draw(surface or self.screen, frame_count)
+
+    # 绘制背景星星（叠加在黑色底色上）
+    def draw_stars(self, frame_count):
+        if self.stars is None:
+            self.stars = make_star_layer()
+        return self.stars.draw(self.screen, frame_count)
+
+    # 离屏绘制：之后的画面画到 surface 上而不是显示窗口（导出视频用），需要关闭脏矩形，每帧整屏重画
+    def set_target(self, surface):
+        self.screen = surface
+        self.drawn = []
+        self.previous = []
+        self.partial_frame = False
+
+    # ---- 脏矩形 ----
+
+    # 记录本帧绘制过的区域
+    def mark(self, rect):
+        self.drawn.append(rect)
+
+    def set_dirty_rects(self, enabled):
+        self.dirty_rects = enabled and self.backend.partial_updates
+        self.full_redraw = True
+
+    # 改变内部分辨率（scaling.ScaledBackend），缩放过的精灵和背景缓存重新生成，下一帧整屏重画
+    def set_scale(self, scale):
+        self.backend.set_scale(scale)
+        if self.backend.partial_updates:
+            self.background = self.backend.layer()
+        self.cloud_offset = None
+        self.previous = []
+        self.full_redraw = True
+
+    # 1 像素宽的矩形边框，与 pygame.draw.rect(..., 1) 相同，画布不是 Surface 时也可以使用
+    def outline(self, color, rect):
+        screen = self.screen
+        bounds = screen.get_rect()
+        x, y, width, height = rect
+        if width <= 0 or height <= 0:
+            return
+        for side in ((x, y, width, 1), (x, y + height - 1, width, 1), (x, y, 1, height), (x + width - 1, y, 1, height)):
+            side = bounds.clip(side)
+            if side.width and side.height:
+                screen.fill(color, side)
+
+    # 背景（天空和云朵）缓存在 self.background 中，云朵移动时只重画云朵所在的带状区域
+    def update_background(self, frame_count):
+        clouds = self.clouds
+        cloud_offset = (frame_count // clouds.scroll_divisor) % clouds.width
+        if cloud_offset == self.cloud_offset and not self.full_redraw:
+            return None
+        self.cloud_offset = cloud_offset
+        if self.full_redraw:
+            area = self.background.get_rect()
+            self.background.fill(SKY_BLUE)
+        else:
+            area = CLOUD_BAND
+        self.draw_clouds(frame_count, self.background)
+        return area
+
+    # 绘制游戏画面：背景、机器人、障碍物、物品、粒子和状态栏
+    # 脏矩形模式下只把上一帧绘制过的区域用背景恢复，而不是重画整个屏幕
+    # alpha：固定时间步长下当前画面位于上一步和当前步之间的位置
+    def draw_world(self, world, particles, frame_count, alpha=1.0):
+        screen = self.screen
+        self.alpha = alpha
+        if self.dirty_rects:
+            background = self.background
+            for rect in self.previous:
+                screen.blit(background, rect, rect)
+            area = self.update_background(frame_count)
+            if area is not None:
+                self.mark(screen.blit(background, area, area))
+            self.partial_frame = True
+        else:
+            screen.fill(SKY_BLUE)
+            self.draw_clouds(frame_count)
+        self.phase("background")
+
+        self.draw_robot(world.robot)
+
+        for obstacle in world.obstacles:
+            self.draw_entity(obstacle)
+
+        for item in world.items:
+            self.draw_entity(item)
+
+        self.draw_particles(particles)
+        self.phase("entities")
+
+        self.draw_hud(world)
+        self.phase("hud")
+
+    def draw_hud(self, world):
+        screen = self.screen
+        robot = world.robot
+        text = self.text
+        mark = self.mark
+
+        # 绘制分数
+        mark(text.draw_number(screen, self.font, "得分: ", world.score, "", BLACK, (10, 10)))
+
+        # 绘制生命值
+        life = self.particle_sprite(RED, 10)
+        for i in range(robot.lives):
+            mark(screen.blit(life, (SCREEN_WIDTH - 40 - i * 30, 20)))
+
+        # 绘制等级
+        mark(text.draw_number(screen, self.font, "等级: ", world.level, "", BLACK, (10, 50)))
+
+        # 绘制道具状态
+        if robot.shield_active:
+            mark(text.draw_number(screen, self.small_font, "护盾: ", robot.shield_timer // 60 + 1, "s", BLUE,
+                                  (SCREEN_WIDTH - 100, 60)))
+
+        if robot.boost_active:
+            mark(text.draw_number(screen, self.small_font, "加速: ", robot.boost_timer // 60 + 1, "s", YELLOW,
+                                  (SCREEN_WIDTH - 100, 90)))
+
+    # 把本帧画面显示出来：
+    # 脏矩形模式下只更新上一帧和本帧绘制过的区域，其他情况（菜单、结束画面）整屏刷新
+    def present(self):
+        drawn = self.drawn
+        if self.partial_frame:
+            previous = self.previous
+            if self.show_dirty:
+                # 调试叠加层：绿色为本帧绘制的区域，红色为从背景恢复的区域
+                for rect in previous:
+                    self.outline(RED, rect)
+                for rect in drawn:
+                    self.outline(GREEN, rect)
+            if self.full_redraw:
+                self.backend.present()
+            else:
+                self.backend.present(previous + drawn)
+            self.full_redraw = False
+            # 叠加层画在恢复区域上的边框下一帧也要擦掉
+            self.previous = drawn + previous if self.show_dirty else drawn
+        else:
+            self.backend.present()
+            self.full_redraw = True
+            self.previous = []
+        self.drawn = []
+        self.partial_frame = False
+
+    def draw_menu(self, menu_options, menu_selection, high_score, frame_count):
+        screen = self.screen
+        font = self.font
+        small_font = self.small_font
+        text = self.text
+        center = SCREEN_WIDTH//2
+
+        # 绘制标题
+        screen.fill(SKY_BLUE)
+        self.draw_clouds(frame_count)
+        text.draw_centered(screen, self.title_font, "天空机器人", BLUE, center, 100)
+
+        # 绘制高分
+        if high_score > 0:
+            text.draw_number_centered(screen, font, "最高分数: ", high_score, "", BLACK, center, 200)
+
+        # 绘制菜单选项
+        for i, option in enumerate(menu_options):
+            color = RED if i == menu_selection else BLACK
+            text.draw_centered(screen, font, option, color, center, 300 + i * 50)
+
+        # 绘制帮助信息
+        text.draw_centered(screen, small_font, "使用 空格键 让机器人飞行", BLACK, center, 450)
+        text.draw_centered(screen, small_font, "躲避障碍物并收集物品", BLACK, center, 480)
+        text.draw_centered(screen, small_font, "红色物品: +5分  蓝色物品: 护盾  黄色物品: 加速  心形: 额外生命", BLACK,
+                           center, 510)
+
+    def draw_game_over(self, score, high_score, frame_count):
+        screen = self.screen
+        font = self.font
+        text = self.text
+        center = SCREEN_WIDTH//2
+        middle = SCREEN_HEIGHT//2
+
+        # 游戏结束画面
+        screen.fill(BLACK)
+        self.draw_stars(frame_count)
+
+        text.draw_centered(screen, font, "游戏结束!", WHITE, center, middle - 100)
+        text.draw_number_centered(screen, font, "得分: ", score, "", WHITE, center, middle - 50)
+        text.draw_number_centered(screen, font, "最高分数: ", high_score, "", WHITE, center, middle)
+        text.draw_centered(screen, font, "按空格键返回菜单", WHITE, center, middle + 50)
+        text.draw_centered(screen, font, "按ESC键退出游戏", WHITE, center, middle + 100)
@@ -0,0 +1,133 @@
+import os
+import random
+import struct
+
+from world import World
+
+# 回放：一局游戏由种子和每一步是否跳跃完全决定
+# （World 的随机数全部来自 random.Random(seed)，粒子等装饰效果用单独的随机数，不影响模拟），
+# 所以只需要记录种子和跳跃发生在哪些步。
+#
+# 文件格式（小端）：
+#   头部  "SRRP"、版本号(u8)、种子(u64)、总步数(u32)、最终得分(u32)、跳跃次数(u32)
+#   之后  每次跳跃与上一次跳跃相隔的步数（第一次从第 0 步算起），用变长整数编码，
+#         大多数间隔小于 128 步，每次跳跃只占一个字节
+
+MAGIC = b"SRRP"
+# 游戏规则改变（例如碰撞检测）时同样增加版本号：旧的回放在新规则下不能重现
+VERSION = 5
+_HEADER = struct.Struct("<4sBQIII")
+
+# 新一局游戏的种子
+def new_seed():
+    return random.randrange(2**32)
+
+class Replay:
+    def __init__(self, seed, jumps=None, steps=0, score=0):
+        self.seed = seed
+        # 发生跳跃的步（从 0 开始，递增）
+        self.jumps = jumps if jumps is not None else []
+        self.steps = steps
+        self.score = score
+
+    # 记录一步的输入，在调用 world.step(jump) 之前调用
+    def record(self, jump):
+        if jump:
+            self.jumps.append(self.steps)
+        self.steps += 1
+
+    # 游戏结束时记录最终得分，用于回放时校验
+    def finish(self, world):
+        self.score = world.score
+
+    def to_bytes(self):
+        data = bytearray(_HEADER.pack(MAGIC, VERSION, self.seed, self.steps, self.score, len(self.jumps)))
+        previous = 0
+        for step in self.jumps:
+            gap = step - previous
+            previous = step
+            while gap >= 0x80:
+                data.append(gap & 0x7F | 0x80)
+                gap >>= 7
+            data.append(gap)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size:
+            raise ValueError("回放数据不完整")
+        magic, version, seed, steps, score, count = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("不是回放文件")
+        if version != VERSION:
+            raise ValueError("不支持的回放版本: %d" % version)
+
+        jumps = []
+        position = _HEADER.size
+        step = 0
+        try:
+            for _ in range(count):
+                gap = 0
+                shift = 0
+                while True:
+                    byte = data[position]
+                    position += 1
+                    gap |= (byte & 0x7F) << shift
+                    shift += 7
+                    if byte < 0x80:
+                        break
+                step += gap
+                jumps.append(step)
+        except IndexError:
+            raise ValueError("回放数据不完整") from None
+        return cls(seed, jumps, steps, score)
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+# 无界面地重新模拟一局，返回模拟结束时的 World
+def play(replay, **world_args):
+    world = World(rng=random.Random(replay.seed), **world_args)
+    jumps = replay.jumps
+    next_jump = 0
+    pending = jumps[0] if jumps else -1
+    step = world.step
+    for index in range(replay.steps):
+        if index == pending:
+            next_jump += 1
+            pending = jumps[next_jump] if next_jump < len(jumps) else -1
+            step(True)
+        else:
+            step(False)
+    return world
+
+# 重新模拟并检查得分和步数是否与记录一致
+def verify(replay, **world_args):
+    world = play(replay, **world_args)
+    return world.score == replay.score and world.frame == replay.steps
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    replay = Replay.load(sys.argv[1] if len(sys.argv) > 1 else "replays/last.rpl")
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        world = play(replay)
+    elapsed = time.perf_counter() - start
+
+    print("种子 %d，%d 步，%d 次跳跃" % (replay.seed, replay.steps, len(replay.jumps)))
+    print("记录得分 %d，回放得分 %d，%s" % (replay.score, world.score,
+                                      "一致" if world.score == replay.score else "不一致"))
+    print("回放速度 %.0f 步/秒" % (replay.steps * repeat / elapsed))
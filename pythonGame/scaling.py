@@ -0,0 +1,330 @@
+import math
+import weakref
+from collections import OrderedDict, deque
+
+import pygame
+
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, BLACK
+from backends import SURFACE
+
+# 内部分辨率：游戏坐标始终是 SCREEN_WIDTH x SCREEN_HEIGHT，画面按 scale 画到一张离屏的内部画布上，
+# 再缩放到窗口中显示。大屏幕上用较低的内部分辨率，软件渲染要填充的像素按 scale² 减少。
+#
+#   ScaledCanvas       接口与 pygame.Surface 相同、使用游戏坐标的画布（与 backends.TextureCanvas 一样交给 Renderer），
+#                      精灵、文字和背景层第一次画到这里时按 scale 缩放并缓存，之后直接 blit
+#   ScaledBackend      内部画布 + 缩放到窗口："integer" 整数倍最近邻，只缩放有变化的区域（整数倍的黑边太大时按比例铺满）；
+#                      "nearest"/"smooth" 按比例铺满窗口（smooth 用 smoothscale），每帧整屏缩放
+#   DynamicResolution  帧时间超过预算时逐级降低内部分辨率，有余量时再升高
+#
+# 坐标换算：位置向下取整、尺寸向上取整，相邻的平铺图之间不会出现缝隙；
+# 返回给 Renderer 的区域换算回游戏坐标时向外取整，脏矩形总能覆盖实际绘制的像素。
+# python scaling.py 测量不同内部分辨率下的绘制和提交用时
+
+SCALE_FILTERS = ("integer", "nearest", "smooth")
+# integer 放大后的边长不到按比例铺满时的这个比例（例如 800x600 的窗口中只能放下 1 倍的 480x360）时，
+# 黑边太大，改为按比例铺满，与 nearest 相同
+INTEGER_MIN_FILL = 0.8
+
+# scale 对应的内部分辨率
+def internal_size(scale):
+    return max(1, round(SCREEN_WIDTH * scale)), max(1, round(SCREEN_HEIGHT * scale))
+
+# 内部画面在窗口中的位置：integer 为能放下的最大整数倍（放不下或黑边太大时按比例铺满），
+# 其他为保持宽高比铺满，居中
+def layout(window_size, size, filter):
+    window_width, window_height = window_size
+    width, height = size
+    fill = min(window_width / width, window_height / height)
+    factor = min(window_width // width, window_height // height)
+    if filter != "integer" or factor < 1 or factor < fill * INTEGER_MIN_FILL:
+        factor = fill
+    target_width = round(width * factor)
+    target_height = round(height * factor)
+    return pygame.Rect((window_width - target_width) // 2, (window_height - target_height) // 2,
+                       target_width, target_height)
+
+class ScaledCanvas:
+    # 旋转过的精灵最多缓存的数量（精确角度模式下每帧角度都不同）
+    MAX_ROTATED = 256
+
+    def __init__(self, surface, scale):
+        self.size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.rect = pygame.Rect((0, 0), self.size)
+        self.scaled = weakref.WeakKeyDictionary()
+        self.rotated = OrderedDict()
+        # 统计：缩放过的表面数
+        self.rescaled = 0
+        self.set_surface(surface, scale)
+
+    # 换一张内部画布（改变分辨率），缩放过的精灵全部作废
+    def set_surface(self, surface, scale):
+        self.surface = surface
+        self.scale = scale
+        self.scaled.clear()
+        self.rotated.clear()
+
+    # 游戏坐标的区域换算成覆盖它的内部画布区域
+    def to_internal(self, rect):
+        scale = self.scale
+        left = math.floor(rect[0] * scale)
+        top = math.floor(rect[1] * scale)
+        return pygame.Rect(left, top, math.ceil((rect[0] + rect[2]) * scale) - left,
+                           math.ceil((rect[1] + rect[3]) * scale) - top)
+
+    # 内部画布的区域换算成覆盖它的游戏坐标区域
+    def to_world(self, rect):
+        scale = self.scale
+        left = math.floor(rect.x / scale)
+        top = math.floor(rect.y / scale)
+        return pygame.Rect(left, top, math.ceil(rect.right / scale) - left, math.ceil(rect.bottom / scale) - top)
+
+    # source 按 scale 缩放后的表面；透明色和整体透明度保持不变，有透明色的精灵用最近邻，避免边缘混入透明色
+    def image(self, source):
+        if isinstance(source, ScaledCanvas):
+            return source.surface
+        if self.scale == 1:
+            return source
+        image = self.scaled.get(source)
+        if image is None:
+            width, height = source.get_size()
+            size = (max(1, math.ceil(width * self.scale)), max(1, math.ceil(height * self.scale)))
+            colorkey = source.get_colorkey()
+            if colorkey is None and source.get_bitsize() in (24, 32):
+                image = pygame.transform.smoothscale(source, size)
+            else:
+                image = pygame.transform.scale(source, size)
+            if colorkey is not None:
+                image.set_colorkey(colorkey, pygame.RLEACCEL)
+            alpha = source.get_alpha()
+            if alpha is not None and colorkey is None:
+                image.set_alpha(alpha)
+            self.scaled[source] = image
+            self.rescaled += 1
+        return image
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self):
+        return self.rect.copy()
+
+    # 与 Surface.blit 相同，dest 和 area 为游戏坐标，返回游戏坐标中被覆盖的区域
+    def blit(self, source, dest, area=None):
+        image = self.image(source)
+        if self.scale == 1:
+            return self.surface.blit(image, dest, area)
+        if area is not None:
+            area = self.to_internal(area)
+        scale = self.scale
+        rect = self.surface.blit(image, (math.floor(dest[0] * scale), math.floor(dest[1] * scale)), area)
+        return self.to_world(rect)
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = [self.blit(*arguments) for arguments in blit_sequence]
+        return rects if doreturn else None
+
+    # 把 source 绕自身的中心点顺时针旋转 angle（弧度）后画在 center 处
+    def blit_rotated(self, source, center, angle):
+        image = self.image(source)
+        key = (image, angle)
+        rotated = self.rotated.get(key)
+        if rotated is None:
+            rotated = self.rotated[key] = pygame.transform.rotate(image, -math.degrees(angle))
+            if len(self.rotated) > self.MAX_ROTATED:
+                self.rotated.popitem(last=False)
+        scale = self.scale
+        rect = rotated.get_rect(center=(math.floor(center[0] * scale), math.floor(center[1] * scale)))
+        return self.to_world(self.surface.blit(rotated, rect))
+
+    def fill(self, color, rect=None):
+        if rect is None:
+            self.surface.fill(color)
+            return self.rect.copy()
+        if self.scale == 1:
+            return self.surface.fill(color, rect)
+        return self.to_world(self.surface.fill(color, self.to_internal(rect).clip(self.surface.get_rect())))
+
+class ScaledBackend:
+    name = SURFACE
+    partial_updates = True
+    rotation = False
+    # 画布不是 Surface，不能直接用 pygame.draw
+    primitives = False
+
+    # window：显示窗口；scale：内部分辨率相对游戏坐标的比例；filter：SCALE_FILTERS 之一
+    def __init__(self, window, scale=1.0, filter="integer"):
+        if filter not in SCALE_FILTERS:
+            raise ValueError("未知的缩放方式 %s" % filter)
+        self.window = window
+        self.filter = filter
+        # 窗口中的显示区域按初始分辨率确定，动态分辨率改变时保持不变
+        self.target = layout(window.get_size(), internal_size(scale), filter)
+        self.canvas = ScaledCanvas(None, scale)
+        self.set_scale(scale)
+
+    # 改变内部分辨率，之后需要整屏重画
+    def set_scale(self, scale):
+        self.scale = scale
+        size = internal_size(scale)
+        self.surface = pygame.Surface(size, 0, self.window)
+        self.canvas.set_surface(self.surface, scale)
+        # 整数倍缩放时只缩放有变化的区域，与整屏缩放的结果完全相同
+        factor = self.target.width // size[0]
+        exact = self.target.size == (size[0] * factor, size[1] * factor)
+        self.factor = factor if self.filter == "integer" and exact else 0
+        self.cleared = False
+
+    # 与画布同样大小、同样缩放的离屏图层（Renderer 的背景缓存）
+    def layer(self):
+        return ScaledCanvas(pygame.Surface(self.surface.get_size(), 0, self.surface), self.scale)
+
+    def _scale(self, source, target):
+        destination = self.window.subsurface(target)
+        if source.get_size() == target.size:
+            destination.blit(source, (0, 0))
+        elif self.filter == "smooth":
+            pygame.transform.smoothscale(source, target.size, destination)
+        else:
+            pygame.transform.scale(source, target.size, destination)
+
+    # rects 为游戏坐标中有变化的区域，None 时提交整个画面
+    def present(self, rects=None):
+        if not self.cleared:
+            # 分辨率改变后第一次提交时清除显示区域外的黑边
+            self.window.fill(BLACK)
+            self.cleared = True
+            rects = None
+        if rects is None or not self.factor:
+            self._scale(self.surface, self.target)
+            pygame.display.flip()
+            return
+        factor = self.factor
+        bounds = self.surface.get_rect()
+        left, top = self.target.topleft
+        updated = []
+        for rect in rects:
+            area = self.canvas.to_internal(rect).clip(bounds)
+            if area.width and area.height:
+                target = pygame.Rect(left + area.x * factor, top + area.y * factor,
+                                     area.width * factor, area.height * factor)
+                self._scale(self.surface.subsurface(area), target)
+                updated.append(target)
+        pygame.display.update(updated)
+
+    def read_pixels(self):
+        return self.window.copy()
+
+    def stats(self):
+        return {"scale": self.scale, "internal": self.surface.get_size(), "rescaled": self.canvas.rescaled}
+
+    def close(self):
+        pass
+
+class DynamicResolution:
+    # levels：内部分辨率比例，从高到低；budget：每帧绘制等工作的预算（秒）；
+    # window：按最近多少帧的平均用时判断；headroom：升高一级后预计用时低于预算的这个比例才升高；
+    # cooldown：改变分辨率后多少帧内不再判断（缩放精灵缓存需要重新生成）
+    def __init__(self, levels, budget, window=30, headroom=0.8, cooldown=120):
+        self.levels = levels
+        self.budget = budget
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.samples = deque(maxlen=window)
+        self.level = 0
+        self.wait = 0
+        self.changes = 0
+
+    @property
+    def scale(self):
+        return self.levels[self.level]
+
+    # 每帧调用，work 为这一帧的用时（不包括等待帧率限制）；需要改变分辨率时返回新的比例，否则返回 None
+    def update(self, work):
+        if self.wait:
+            self.wait -= 1
+            return None
+        samples = self.samples
+        samples.append(work)
+        if len(samples) < samples.maxlen:
+            return None
+        mean = sum(samples) / len(samples)
+        level = self.level
+        if mean > self.budget and level + 1 < len(self.levels):
+            level += 1
+        elif level > 0:
+            # 用时大致与像素数成正比，估计升高一级后的用时
+            ratio = self.levels[level - 1] / self.levels[level]
+            if mean * ratio * ratio < self.budget * self.headroom:
+                level -= 1
+        if level == self.level:
+            return None
+        self.level = level
+        self.changes += 1
+        samples.clear()
+        self.wait = self.cooldown
+        return self.scale
+
+# 用 ScaledBackend 在 window_size 的窗口中绘制同样的游戏画面，返回每个比例下每帧的绘制和提交用时（毫秒）；
+# dirty_rects 为 False 时每帧整屏重画
+def measure(window_size=(1920, 1080), scales=(1.0, 0.75, 0.5), filter="integer", frames=300, seed=0,
+            dirty_rects=True):
+    import random
+    import time
+
+    from world import World
+    from particles import ParticleSystem
+    from render import Renderer
+    from sky_robot_game import handle_events
+    from audio import Sounds
+
+    window = pygame.display.set_mode(window_size)
+    results = []
+    for scale in scales:
+        backend = ScaledBackend(window, scale, filter)
+        renderer = Renderer(backend=backend)
+        renderer.set_dirty_rects(dirty_rects)
+        renderer.prepare()
+        world = World(rng=random.Random(seed))
+        particles = ParticleSystem()
+        particles.seed(seed)
+        silent = Sounds()
+        draw = present = 0.0
+        for index in range(frames):
+            world.robot.lives = 3
+            robot = world.robot
+            handle_events(world.step(robot.y > SCREEN_HEIGHT / 2 and robot.velocity > 0), particles, silent)
+            particles.update()
+            t0 = time.perf_counter()
+            renderer.draw_world(world, particles, index)
+            t1 = time.perf_counter()
+            renderer.present()
+            t2 = time.perf_counter()
+            if index >= 10:
+                draw += t1 - t0
+                present += t2 - t1
+        counted = frames - 10
+        results.append((scale, backend.surface.get_size(), backend.target.size,
+                        draw * 1000 / counted, present * 1000 / counted))
+    return results
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    pygame.display.init()
+    pygame.font.init()
+
+    # python scaling.py [integer|nearest|smooth] [--full]，--full 为每帧整屏重画
+    arguments = [argument for argument in sys.argv[1:] if argument != "--full"]
+    filter = arguments[0] if arguments else "integer"
+    for scale, size, target, draw, present in measure(filter=filter, dirty_rects="--full" not in sys.argv):
+        print("比例 %.2f  内部 %dx%d -> %dx%d  绘制 %.2f ms  提交 %.2f ms" % (
+            scale, size[0], size[1], target[0], target[1], draw, present))
@@ -0,0 +1,229 @@
+import random
+from collections import deque
+
+from settings import SCREEN_HEIGHT
+from entities import Robot
+
+# 生成计划：障碍物和物品的种类与摆放参数由生成器流水线提前生成，放在一个前瞻缓冲区里，
+# World 到了生成的时刻只需从缓冲区取出一个（O(1)），不再在这一步里抽随机数。
+#
+#   种类 → 摆放 → 可达性检查 → 缓冲区
+#
+# 可达性检查按机器人的物理参数（gravity、lift）计算：经过上一个障碍物时机器人可能所在的高度范围，
+# 在两个障碍物之间的这段时间里最多能上升、下降多少，能否进入下一个障碍物可以通过的高度范围。
+# 不能通过的摆放重新抽取；重试多次仍然不行时这一次不生成障碍物（空位一定可以通过）。
+#
+# 两次生成之间的步数按 min_interval（spawn_rate 随等级降低后的最小值）计算，间隔更长时时间只会更多。
+# 速度则不同：障碍物保持生成时的速度，后生成的更快时会追近前一个，两者之间的时间变短；
+# 加速道具也会让还没有到达的障碍物更早到达（见 gap_frames()）。缓冲区中的条目是按加入时的速度检查的，
+# 到生成时速度可能已经提高了几级，所以取出时再按实际的速度检查一次，不能通过的留空。
+# 留空不会让之后的障碍物更难通过：机器人仍然可以按有这个障碍物时的路线走。
+#
+# 障碍物和物品各用一个从 World 的 rng 派生的随机数流，提前生成障碍物不会改变物品的顺序
+
+# 随机选择种类，first 不为 None 时第一个固定为 first
+def choose_kinds(rng, types, weights, first=None):
+    if first is not None:
+        yield first
+    while True:
+        yield rng.choices(types, weights=weights, k=1)[0]
+
+# 为每个种类生成摆放参数
+def place(rng, kinds):
+    for cls in kinds:
+        yield cls, cls.place(rng)
+
+# 可达的高度范围是 (low, high, fall) 的列表：机器人可以在 low 到 high 之间的任何高度，
+# 并且可以以向下的速度 fall 位于下边缘 high。范围中间的高度只保证速度不小于 lift（随时可以跳跃），
+# 下边缘的速度决定了之后最多能下降多少
+
+# 合并重叠的区间，合并后的下边缘取较低的那个（相同时取速度较大的）
+def _merge(bands):
+    merged = []
+    for band in sorted(bands):
+        if merged and band[0] <= merged[-1][1]:
+            low, high, fall = merged[-1]
+            if (band[1], band[2]) > (high, fall):
+                merged[-1] = (low, band[1], band[2])
+        else:
+            merged.append(band)
+    return merged
+
+# 机器人 frames 步之后可能到达的高度（不足一步的部分不算）：
+# 一直跳跃时每步上升 -(lift + gravity)，与之前的速度无关；范围中间的高度按最不利的速度 lift 计算，
+# frames 步最多下降 gravity * frames * (frames + 1) / 2 + lift * frames（前 -lift / gravity 步还在上升，结果为负）。
+# 从下边缘以速度 fall 一直不跳跃可以下降得更多，到达新的下边缘时速度为 fall + gravity * frames；
+# 落到屏幕底部或者顶部时速度归零
+def reach(bands, frames, robot):
+    frames = int(frames)
+    gravity = robot.gravity
+    up = -(robot.lift + gravity) * frames
+    bottom = SCREEN_HEIGHT - robot.height
+    result = []
+    for low, high, fall in bands:
+        top = max(0, low - up)
+        drop = high + fall * frames + gravity * frames * (frames + 1) / 2
+        if drop >= bottom:
+            result.append((top, bottom, 0))
+        elif drop <= 0:
+            result.append((0, 0, 0))
+        else:
+            result.append((top, drop, fall + gravity * frames))
+    return _merge(result)
+
+# 与障碍物可以通过的高度范围（(low, high) 的列表）相交。下边缘被截掉时，
+# 机器人在新的下边缘的速度不再确定，按最不利的 lift 计算
+def _intersect(bands, safe, robot):
+    result = []
+    for low, high, fall in bands:
+        for safe_low, safe_high in safe:
+            low_ = max(low, safe_low)
+            if high <= safe_high:
+                high_, fall_ = high, fall
+            else:
+                high_, fall_ = safe_high, robot.lift
+            if low_ <= high_:
+                result.append((low_, high_, fall_))
+    return _merge(result)
+
+# 上一个障碍物的右边经过机器人之后，到下一个障碍物的左边到达机器人，留给机器人的最少步数。
+# 两个障碍物生成时的 x 相同，生成时相隔 interval 步，各自保持生成时的速度：
+# previous_right、previous_speed 是上一个的右边缘和速度，left、speed 是下一个的。
+# 加速道具让所有障碍物同时变快：上一个经过机器人之前加速只会拉开两者，
+# 最坏的情况是上一个经过机器人时才开始加速，下一个剩下的距离都按加速后的速度走完
+def gap_frames(previous_right, previous_speed, left, speed, interval, robot):
+    # 上一个的右边经过机器人左边的时刻（从上一个生成时算起）
+    passed = (previous_right - robot.x) / previous_speed
+    # 这时下一个的左边离机器人右边还有多远
+    remaining = left - robot.x - robot.width - speed * max(0, passed - interval)
+    return max(0, interval - passed) + remaining / (speed + robot.boost_speed)
+
+# 一串障碍物的可达性状态：经过上一个障碍物时机器人可能所在的高度范围（以及下边缘的速度），上一个障碍物的右边缘和速度。
+# 状态都是普通属性，可以保存和恢复（见 snapshot.py）
+class Passage:
+    def __init__(self, robot):
+        self.robot = robot
+        # 开始时为整个屏幕，在底部时速度为 0
+        self.bands = [(0, SCREEN_HEIGHT - robot.height, 0)]
+        self.previous_right = None
+        self.previous_speed = None
+        # 上一个障碍物之后的空位数
+        self.skipped = 0
+
+    # prototype（已经按摆放参数重置）以 speed 生成时机器人可以通过它的高度范围，空列表表示不能通过；
+    # 两次生成之间至少相隔 interval 步，中间的空位也算一次生成
+    def allowed(self, prototype, speed, interval):
+        robot = self.robot
+        possible = self.bands
+        if self.previous_right is not None:
+            left, _ = prototype.x_extent(robot)
+            frames = gap_frames(self.previous_right, self.previous_speed, left, speed,
+                                (1 + self.skipped) * interval, robot)
+            possible = reach(self.bands, max(0, frames), robot)
+        return _intersect(possible, prototype.safe_bands(robot), robot)
+
+    # 生成了 prototype，之后从它开始计算
+    def advance(self, prototype, speed, allowed):
+        self.bands = allowed
+        self.previous_right = prototype.x_extent(self.robot)[1]
+        self.previous_speed = speed
+        self.skipped = 0
+
+    def skip(self):
+        self.skipped += 1
+
+# 可达性检查，schedule 提供当前的速度、最小间隔和统计。
+# 写成迭代器类而不是生成器：检查的状态在 self.passage 中，可以保存和恢复
+class Reachable:
+    def __init__(self, rng, spawns, schedule, retries=20):
+        self.rng = rng
+        self.spawns = spawns
+        self.schedule = schedule
+        self.retries = retries
+        self.passage = Passage(schedule.robot)
+        self.prototypes = {}
+
+    def __iter__(self):
+        return self
+
+    # cls 按摆放参数重置后的实例，只用来检查，每个种类一个
+    def prototype(self, cls, speed, placement):
+        prototype = self.prototypes.get(cls)
+        if prototype is None:
+            prototype = self.prototypes[cls] = cls(speed, self.rng, placement)
+        else:
+            prototype.reset(speed, self.rng, placement)
+        return prototype
+
+    def __next__(self):
+        rng = self.rng
+        schedule = self.schedule
+        passage = self.passage
+        cls, placement = next(self.spawns)
+        speed = schedule.speed
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                placement = cls.place(rng)
+                schedule.resampled += 1
+            prototype = self.prototype(cls, speed, placement)
+            allowed = passage.allowed(prototype, speed, schedule.min_interval)
+            if allowed:
+                break
+        else:
+            schedule.skipped += 1
+            passage.skip()
+            return None, None
+
+        passage.advance(prototype, speed, allowed)
+        return cls, placement
+
+class SpawnSchedule:
+    # speed：初始的障碍物速度；min_interval：两次生成障碍物之间最少的步数；lookahead：缓冲区长度
+    def __init__(self, rng, obstacle_types, obstacle_weights, item_types, item_weights,
+                 speed, min_interval, lookahead=8, first=None):
+        self.obstacle_rng = obstacle_rng = random.Random(rng.getrandbits(64))
+        self.item_rng = item_rng = random.Random(rng.getrandbits(64))
+        self.robot = Robot()
+        self.speed = speed
+        self.min_interval = min_interval
+        # 统计：重新抽取摆放参数的次数、因为无法通过而留空的次数，
+        # 以及其中加入缓冲区时能通过、按生成时的速度不能通过的次数
+        self.resampled = 0
+        self.skipped = 0
+        self.dropped = 0
+        # 已经生成的障碍物的可达性状态，按实际生成时的速度计算
+        self.spawned = Passage(self.robot)
+        # 每次从随机数流取出新的条目时加一，用于判断随机数的状态是否改变（见 snapshot.py）
+        self.revision = 0
+
+        self.obstacle_stream = Reachable(
+            obstacle_rng, place(obstacle_rng, choose_kinds(obstacle_rng, obstacle_types, obstacle_weights, first)), self)
+        self.item_stream = place(item_rng, choose_kinds(item_rng, item_types, item_weights))
+        self.obstacles = deque(next(self.obstacle_stream) for _ in range(lookahead))
+        self.items = deque(next(self.item_stream) for _ in range(lookahead))
+
+    # 下一个障碍物 (种类, 摆放参数)，种类为 None 表示这一次不生成；
+    # speed 为当前的障碍物速度，用于补充缓冲区和检查取出的条目
+    def next_obstacle(self, speed):
+        self.speed = speed
+        self.revision += 1
+        self.obstacles.append(next(self.obstacle_stream))
+        cls, placement = self.obstacles.popleft()
+        spawned = self.spawned
+        if cls is not None:
+            prototype = self.obstacle_stream.prototype(cls, speed, placement)
+            allowed = spawned.allowed(prototype, speed, self.min_interval)
+            if allowed:
+                spawned.advance(prototype, speed, allowed)
+                return cls, placement
+            self.skipped += 1
+            self.dropped += 1
+        spawned.skip()
+        return None, None
+
+    # 下一个物品 (种类, 摆放参数)
+    def next_item(self):
+        self.revision += 1
+        self.items.append(next(self.item_stream))
+        return self.items.popleft()
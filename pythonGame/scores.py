@@ -0,0 +1,248 @@
+import os
+import queue
+import threading
+import time
+
+from settings import SCORES_PATH
+from timestep import SIM_RATE
+from world import EVENT_HIT, EVENT_COLLECT
+
+# 成绩和统计数据：每局结束时记录一行（得分、等级、时长、收集的物品数、被哪种障碍物击败），
+# 保存在 SQLite 数据库中。
+#
+# 写入由后台线程完成：record() 只把记录放进队列，主循环不会因为磁盘写入而卡顿；
+# 写入线程把队列中积累的记录放在一个事务里批量写入，事务是原子的，
+# 程序在写入中途退出时数据库保持上一次提交的状态。
+# 查询通过索引（按得分）和随写入一起更新的汇总表完成，记录了几十万局后也不需要扫描全表。
+# sqlite3 在用到时才导入（约 10ms），不影响启动时间
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    seed INTEGER,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    steps INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    items INTEGER NOT NULL,
+    death TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_score ON runs (score DESC, id);
+CREATE TABLE IF NOT EXISTS totals (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+_COLUMNS = ("time", "seed", "score", "level", "steps", "duration", "items", "death")
+_INSERT = "INSERT INTO runs (%s) VALUES (%s)" % (", ".join(_COLUMNS), ", ".join("?" * len(_COLUMNS)))
+_SELECT = "SELECT id, %s FROM runs" % ", ".join(_COLUMNS)
+
+# 一局游戏的统计，每步用 observe() 处理 World.step() 返回的事件
+class RunStats:
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.items = 0
+        # 最后一次让机器人失去生命的障碍物种类，游戏结束时就是结束这一局的障碍物
+        self.death = None
+
+    def observe(self, events):
+        for event in events:
+            kind = event[0]
+            if kind == EVENT_COLLECT:
+                self.items += 1
+            elif kind == EVENT_HIT and event[3]:
+                self.death = event[4].__name__
+
+    # 这一局的记录，时长按模拟步数计算，与帧率和暂停无关
+    def finish(self, world):
+        return {
+            "time": time.time(),
+            "seed": self.seed,
+            "score": world.score,
+            "level": world.level,
+            "steps": world.frame,
+            "duration": world.frame / SIM_RATE,
+            "items": self.items,
+            "death": self.death if world.game_over else None,
+        }
+
+class ScoreStore:
+    # batch：一个事务最多写入的记录数
+    def __init__(self, path=SCORES_PATH, batch=512):
+        self.path = path
+        self.batch = batch
+        self.queue = queue.Queue()
+        self.thread = None
+        # 写入线程建好表之后设置
+        self.ready = threading.Event()
+        self.error = None
+        # 已保存的最高分，写入线程启动时读取，之后随写入更新
+        self.best = 0
+        self.written = 0
+        self.reader = None
+
+    # 启动写入线程
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+        self.thread.start()
+        return self
+
+    # 记录一局，立即返回
+    def record(self, run):
+        if self.thread is not None and self.error is None:
+            self.queue.put(run)
+
+    # 等待队列中的记录全部写入
+    def flush(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.join()
+
+    # 写入剩余的记录并结束写入线程
+    def close(self, timeout=5):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def _connect(self):
+        import sqlite3
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return sqlite3.connect(self.path)
+
+    def _run(self):
+        import sqlite3
+
+        try:
+            connection = self._connect()
+            # WAL 模式下查询不会被写入阻塞
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self.best = connection.execute("SELECT MAX(score) FROM runs").fetchone()[0] or 0
+        except (OSError, sqlite3.Error) as e:
+            self.error = e
+        finally:
+            self.ready.set()
+        if self.error is not None:
+            self._discard()
+            return
+
+        running = True
+        while running:
+            runs = [self.queue.get()]
+            # 把已经在排队的记录一起写入
+            while len(runs) < self.batch:
+                try:
+                    runs.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in runs:
+                running = False
+                done = len(runs)
+                runs = [run for run in runs if run is not None]
+            else:
+                done = len(runs)
+            try:
+                if runs:
+                    self._write(connection, runs)
+            except sqlite3.Error as e:
+                self.error = e
+                running = False
+            for _ in range(done):
+                self.queue.task_done()
+        connection.close()
+        self._discard()
+
+    # 出错后丢弃剩余的记录，flush() 不会一直等待
+    def _discard(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.queue.task_done()
+
+    def _write(self, connection, runs):
+        totals = {"runs": len(runs), "score": 0, "steps": 0, "duration": 0, "items": 0}
+        for run in runs:
+            totals["score"] += run["score"]
+            totals["steps"] += run["steps"]
+            totals["duration"] += run["duration"]
+            totals["items"] += run["items"]
+            if run["death"] is not None:
+                name = "death:" + run["death"]
+                totals[name] = totals.get(name, 0) + 1
+        with connection:
+            connection.executemany(_INSERT, [tuple(run[column] for column in _COLUMNS) for run in runs])
+            connection.executemany("INSERT INTO totals (name, value) VALUES (?, ?) "
+                                   "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                                   totals.items())
+        self.best = max(self.best, max(run["score"] for run in runs))
+        self.written += len(runs)
+
+    # ---- 查询 ----
+    # 只能看到已经写入的记录，需要包括刚记录的局时先调用 flush()。
+    # 没有调用 start()（例如 SCORES_PATH 为 None）或数据库打不开时与 record() 一样不报错，查询结果为空
+
+    def _query(self, sql, parameters=()):
+        if self.thread is None:
+            return []
+        self.ready.wait()
+        if self.error is not None:
+            return []
+        if self.reader is None:
+            self.reader = self._connect()
+        return self.reader.execute(sql, parameters).fetchall()
+
+    def _rows(self, sql, parameters=()):
+        columns = ("id",) + _COLUMNS
+        return [dict(zip(columns, row)) for row in self._query(sql, parameters)]
+
+    # 得分最高的 n 局，得分相同时先记录的在前
+    def top(self, n=10):
+        return self._rows(_SELECT + " ORDER BY score DESC, id LIMIT ?", (n,))
+
+    # 最近的 n 局
+    def recent(self, n=10):
+        return self._rows(_SELECT + " ORDER BY id DESC LIMIT ?", (n,))
+
+    # 得分为 score 时的排名（得分更高的局数加一）
+    def rank(self, score):
+        rows = self._query("SELECT COUNT(*) FROM runs WHERE score > ?", (score,))
+        return rows[0][0] + 1 if rows else 1
+
+    # 汇总统计：总局数、平均得分、最高分、平均时长、收集的物品总数、各种障碍物结束的局数
+    def summary(self):
+        totals = dict(self._query("SELECT name, value FROM totals"))
+        runs = int(totals.get("runs", 0))
+        best = self._query("SELECT MAX(score) FROM runs")
+        return {
+            "runs": runs,
+            "best": (best[0][0] if best else None) or 0,
+            "average_score": totals.get("score", 0) / runs if runs else 0.0,
+            "average_duration": totals.get("duration", 0) / runs if runs else 0.0,
+            "steps": int(totals.get("steps", 0)),
+            "items": int(totals.get("items", 0)),
+            "deaths": {name[6:]: int(value) for name, value in totals.items() if name.startswith("death:")},
+        }
+
+if __name__ == "__main__":
+    import sys
+
+    # 打印成绩统计：python scores.py [数据库路径]
+    store = ScoreStore(sys.argv[1] if len(sys.argv) > 1 else SCORES_PATH).start()
+    summary = store.summary()
+    print("共 %d 局，最高分 %d，平均得分 %.1f，平均时长 %.1f 秒，收集物品 %d 个" %
+          (summary["runs"], summary["best"], summary["average_score"], summary["average_duration"], summary["items"]))
+    for name, count in sorted(summary["deaths"].items(), key=lambda entry: -entry[1]):
+        print("  被 %s 击败 %d 次" % (name, count))
+    for k, run in enumerate(store.top(10), 1):
+        print("%2d. %5d 分  第 %d 级  %.1f 秒  %s" % (k, run["score"], run["level"], run["duration"],
+                                                time.strftime("%Y-%m-%d %H:%M", time.localtime(run["time"]))))
+    store.close()
@@ -0,0 +1,67 @@
+# 游戏全局设置：屏幕尺寸、颜色和游戏状态
+# 这里只放常量，不做任何pygame初始化，方便无界面的模拟代码导入
+
+# 屏幕设置
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# 颜色
+WHITE = (255, 255, 255)
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLACK = (0, 0, 0)
+SKY_BLUE = (135, 206, 235)
+YELLOW = (255, 255, 0)
+PURPLE = (128, 0, 128)
+ORANGE = (255, 165, 0)
+
+# 游戏状态
+MENU = 0
+PLAYING = 1
+GAME_OVER = 2
+
+# 旋转障碍物的角度量化级数：叶片外观和碰撞都按这么多个角度预先计算，0 表示使用精确的三角函数
+SPINNER_ANGLE_STEPS = 128
+# 旋转障碍物的连续碰撞检测：一步中的相对位移超过叶片宽度时分成几个子步检测，
+# 速度很快（高等级加上加速道具）时机器人也不会在两步之间穿过叶片
+SPINNER_SWEPT = True
+
+# 脏矩形渲染：游戏中只刷新有变化的区域，关闭后每帧整屏刷新（游戏中按 F3 切换，F4 显示刷新区域）
+DIRTY_RECTS = True
+
+# 渲染后端："surface" 软件渲染（支持脏矩形），"texture" 用 SDL 的 Renderer 和纹理绘制（见 backends.py），
+# 也可以用 python sky_robot_game.py --backend texture 选择
+RENDER_BACKEND = "surface"
+
+# 窗口大小，None 表示与 SCREEN_WIDTH x SCREEN_HEIGHT 相同。游戏坐标始终是 SCREEN_WIDTH x SCREEN_HEIGHT，
+# 画面按内部分辨率绘制后缩放到窗口中（见 scaling.py；python sky_robot_game.py --window 1920x1080）
+WINDOW_SIZE = None
+# 内部分辨率相对游戏坐标的比例，例如 0.6 为 480x360（--scale 0.6）
+RENDER_SCALE = 1.0
+# 缩放到窗口的方式："integer" 整数倍最近邻（只缩放有变化的区域，黑边太大时改为铺满），"nearest" 最近邻铺满，"smooth" 平滑缩放
+SCALE_FILTER = "integer"
+# 动态分辨率：帧时间超过预算时按 RESOLUTION_LEVELS（相对 RENDER_SCALE）逐级降低内部分辨率（--dynamic）
+DYNAMIC_RESOLUTION = False
+RESOLUTION_LEVELS = (1.0, 0.85, 0.7, 0.5)
+# 每帧用时预算（毫秒），None 表示按显示帧率计算
+FRAME_BUDGET_MS = None
+
+# 显示帧率上限，0 表示不限制；模拟频率（timestep.SIM_RATE）不受显示帧率影响，两步之间的画面由渲染器插值
+FRAME_RATE = 60
+# 机器卡顿时一帧最多补的模拟步数，超出的时间直接丢弃
+MAX_STEPS_PER_FRAME = 5
+
+# 每局结束时把回放（种子和跳跃输入）保存到这里，None 表示不保存；用 python replay.py 回放校验
+REPLAY_PATH = "replays/last.rpl"
+
+# 成绩和统计数据库（SQLite），在后台线程中写入；用 python scores.py 查看统计
+SCORES_PATH = "scores/scores.db"
+
+# 性能分析：游戏中按 F5 显示性能叠加层，按 F6 开始/停止把每帧的计时写入这个 CSV 文件
+TRACE_PATH = "traces/frame_trace.csv"
+
+# 联机对战（netplay.py）：中继服务器的地址（局域网中的一台机器，测试时用本机），
+# 对方的输入最多可以落后多少步，超过时暂停等待网络，预测错误时最多回滚这么多步
+NET_SERVER = ("127.0.0.1", 47800)
+NET_MAX_ROLLBACK = 8
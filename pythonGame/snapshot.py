@@ -0,0 +1,281 @@
+import math
+import struct
+import weakref
+
+from entities import PipeObstacle, MovingObstacle
+from world import OBSTACLE_TYPES, ITEM_TYPES
+
+# 状态快照：把 World 的完整状态（机器人、障碍物和物品、分数、等级、步数、生成计划和它的随机数）
+# 保存为紧凑的二进制数据，之后可以恢复到同一个 World（回滚）或用相同参数新建的 World 中，
+# 恢复后继续模拟的结果与没有保存、恢复时逐位相同。
+#
+# 快照不包括构造 World 时的参数（level_threshold、item_rate、权重等），恢复到的 World 必须用相同的参数创建；
+# 也不包括碰撞统计和计时这类只用于分析的数据。
+#
+# 格式（小端）：
+#   头部      "SRSS"、版本号(u8)、步数、分数、等级、障碍物速度(f64)、生成间隔、下一次生成障碍物和物品的步数、是否结束
+#   机器人    y、上一步的 y、速度(f64)，护盾、加速、无敌的开关和计时器，生命数
+#   实体      障碍物和物品的数量，之后每个实体一条记录：种类、x、上一步的 x，以及各自的状态
+#   生成计划  速度、统计、可达性检查的状态（计划中的和已经生成的各一份）、前瞻缓冲区中的条目，
+#             最后是两个随机数流的状态
+#
+# 生成计划的状态（主要是两个随机数流，各 2.5KB）占了快照的大部分，而它只在取出新条目时才改变（每秒一两次），
+# 所以打包后的结果按 schedule.revision 缓存；恢复时状态没有变化就跳过这一部分。
+# 实体也尽量原地重置，每一帧保存一次快照、回滚时恢复都只需要几微秒
+
+MAGIC = b"SRSS"
+VERSION = 3
+
+_HEADER = struct.Struct("<4sBIIIdIIIB")
+_ROBOT = struct.Struct("<dddBhBhBhH")
+_COUNTS = struct.Struct("<HH")
+# 障碍物：种类、x、上一步的 x、速度、是否已通过，之后是各自的状态
+_PIPE = struct.Struct("<BdddBi")
+_MOVING = struct.Struct("<BdddBiib")
+_SPINNER = struct.Struct("<BdddBidd")
+# 物品：种类、x、上一步的 x、y
+_ITEM = struct.Struct("<Bddi")
+# 生成计划：速度、重新抽取、留空和取出时留空的次数、两个缓冲区的长度
+_SCHEDULE = struct.Struct("<dIIIBB")
+# 可达性检查的状态（schedule.Passage）：上一个障碍物的右边缘和速度（NaN 表示没有）、之后的空位数、
+# 可达高度区间的数量，之后是各个区间（上边缘、下边缘和下边缘的速度）
+_PASSAGE = struct.Struct("<ddIB")
+_BAND = struct.Struct("<ddd")
+# 缓冲区中的条目：种类（255 表示空位）、摆放参数的个数和值
+_SPAWN = struct.Struct("<BBii")
+# 随机数流：Mersenne Twister 的 624 个状态字和位置，以及 gauss() 的缓存值（NaN 表示没有）
+_RNG = struct.Struct("<625Id")
+
+_OBSTACLE_KINDS = {cls: kind for kind, cls in enumerate(OBSTACLE_TYPES)}
+_ITEM_KINDS = {cls: kind for kind, cls in enumerate(ITEM_TYPES)}
+_NO_SPAWN = 255
+
+# 每个生成计划最近一次打包的状态：schedule -> (revision, 数据)
+_schedule_cache = weakref.WeakKeyDictionary()
+
+# ---- 保存 ----
+
+def save(world):
+    robot = world.robot
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, world.frame, world.score, world.level, world.obstacle_speed,
+                     world.spawn_rate, world.next_obstacle_frame, world.next_item_frame, world.game_over),
+        _ROBOT.pack(robot.y, robot.prev_y, robot.velocity, robot.shield_active, robot.shield_timer,
+                    robot.boost_active, robot.boost_timer, robot.invulnerable, robot.invulnerable_timer,
+                    robot.lives),
+        _COUNTS.pack(len(world.obstacles), len(world.items)),
+    ]
+    append = parts.append
+    for obstacle in world.obstacles:
+        cls = type(obstacle)
+        kind = _OBSTACLE_KINDS[cls]
+        if cls is PipeObstacle:
+            append(_PIPE.pack(kind, obstacle.x, obstacle.prev_x, obstacle.speed, obstacle.passed,
+                              obstacle.top_height))
+        elif cls is MovingObstacle:
+            append(_MOVING.pack(kind, obstacle.x, obstacle.prev_x, obstacle.speed, obstacle.passed,
+                                obstacle.y, obstacle.prev_y, obstacle.direction))
+        else:
+            append(_SPINNER.pack(kind, obstacle.x, obstacle.prev_x, obstacle.speed, obstacle.passed,
+                                 obstacle.center_y, obstacle.angle, obstacle.prev_angle))
+    for item in world.items:
+        append(_ITEM.pack(_ITEM_KINDS[type(item)], item.x, item.prev_x, item.y))
+    append(_schedule_state(world.schedule))
+    return b"".join(parts)
+
+# 生成计划的状态放在快照的最后，只在 revision 改变后重新打包
+def _schedule_state(schedule):
+    cached = _schedule_cache.get(schedule)
+    if cached is not None and cached[0] == schedule.revision:
+        return cached[1]
+
+    parts = [_SCHEDULE.pack(schedule.speed, schedule.resampled, schedule.skipped, schedule.dropped,
+                            len(schedule.obstacles), len(schedule.items))]
+    for passage in (schedule.obstacle_stream.passage, schedule.spawned):
+        if passage.previous_right is None:
+            previous = (math.nan, math.nan)
+        else:
+            previous = (passage.previous_right, passage.previous_speed)
+        parts.append(_PASSAGE.pack(*previous, passage.skipped, len(passage.bands)))
+        for band in passage.bands:
+            parts.append(_BAND.pack(*band))
+    for kinds, entries in ((_OBSTACLE_KINDS, schedule.obstacles), (_ITEM_KINDS, schedule.items)):
+        for cls, placement in entries:
+            if cls is None:
+                parts.append(_SPAWN.pack(_NO_SPAWN, 0, 0, 0))
+            else:
+                parts.append(_SPAWN.pack(kinds[cls], len(placement), *(placement + (0, 0))[:2]))
+    for rng in (schedule.obstacle_rng, schedule.item_rng):
+        _, state, gauss_next = rng.getstate()
+        parts.append(_RNG.pack(*state, math.nan if gauss_next is None else gauss_next))
+    data = b"".join(parts)
+    _schedule_cache[schedule] = (schedule.revision, data)
+    return data
+
+# ---- 恢复 ----
+
+def restore(world, data):
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise ValueError("快照数据不完整")
+    (magic, version, frame, score, level, obstacle_speed, spawn_rate, next_obstacle_frame, next_item_frame,
+     game_over) = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("不是快照数据")
+    if version != VERSION:
+        raise ValueError("不支持的快照版本: %d" % version)
+    world.frame = frame
+    world.score = score
+    world.level = level
+    world.obstacle_speed = obstacle_speed
+    world.spawn_rate = spawn_rate
+    world.next_obstacle_frame = next_obstacle_frame
+    world.next_item_frame = next_item_frame
+    world.game_over = bool(game_over)
+    offset = _HEADER.size
+
+    robot = world.robot
+    (robot.y, robot.prev_y, robot.velocity, shield_active, robot.shield_timer, boost_active, robot.boost_timer,
+     invulnerable, robot.invulnerable_timer, robot.lives) = _ROBOT.unpack_from(data, offset)
+    robot.shield_active = bool(shield_active)
+    robot.boost_active = bool(boost_active)
+    robot.invulnerable = bool(invulnerable)
+    offset += _ROBOT.size
+
+    obstacle_count, item_count = _COUNTS.unpack_from(data, offset)
+    offset += _COUNTS.size
+
+    # 同一位置上种类相同的实体原地重置（回滚几步时通常都是这样），其余的放回对象池再按快照取出
+    pool = world.pool
+    previous = world.obstacles[:]
+    obstacles = world.obstacles
+    obstacles.clear()
+    for index in range(obstacle_count):
+        cls = OBSTACLE_TYPES[data[offset]]
+        if cls is PipeObstacle:
+            _, x, prev_x, speed, passed, top_height = _PIPE.unpack_from(data, offset)
+            offset += _PIPE.size
+            obstacle = _reuse(pool, previous, index, cls, speed, None, (top_height,))
+        elif cls is MovingObstacle:
+            _, x, prev_x, speed, passed, y, prev_y, direction = _MOVING.unpack_from(data, offset)
+            offset += _MOVING.size
+            obstacle = _reuse(pool, previous, index, cls, speed, None, (y, direction))
+            obstacle.prev_y = prev_y
+        else:
+            _, x, prev_x, speed, passed, center_y, angle, prev_angle = _SPINNER.unpack_from(data, offset)
+            offset += _SPINNER.size
+            obstacle = _reuse(pool, previous, index, cls, speed, None, (center_y,))
+            obstacle.angle = angle
+            obstacle.prev_angle = prev_angle
+        obstacle.x = x
+        obstacle.prev_x = prev_x
+        obstacle.passed = bool(passed)
+        obstacles.append(obstacle)
+    _release_rest(pool, previous, obstacle_count)
+
+    previous = world.items[:]
+    items = world.items
+    items.clear()
+    for index in range(item_count):
+        kind, x, prev_x, y = _ITEM.unpack_from(data, offset)
+        offset += _ITEM.size
+        item = _reuse(pool, previous, index, ITEM_TYPES[kind], None, (y,))
+        item.x = x
+        item.prev_x = prev_x
+        items.append(item)
+    _release_rest(pool, previous, item_count)
+
+    _restore_schedule(world.schedule, data, offset)
+
+# previous[index] 的种类为 cls 时原地重置，否则从对象池取出一个；args 与构造函数的参数相同
+def _reuse(pool, previous, index, cls, *args):
+    if index < len(previous):
+        entity = previous[index]
+        if type(entity) is cls:
+            entity.reset(*args)
+            previous[index] = None
+            return entity
+    return pool.acquire(cls, *args)
+
+def _release_rest(pool, previous, count):
+    for entity in previous:
+        if entity is not None:
+            pool.release(entity)
+
+def _restore_schedule(schedule, data, offset):
+    # 与生成计划当前的状态相同（回滚的几步中没有生成新的实体）时不需要恢复
+    cached = _schedule_cache.get(schedule)
+    if (cached is not None and cached[0] == schedule.revision and len(cached[1]) == len(data) - offset
+            and data.endswith(cached[1])):
+        return
+    state = data[offset:]
+
+    speed, resampled, skipped, dropped, obstacle_count, item_count = _SCHEDULE.unpack_from(state)
+    offset = _SCHEDULE.size
+    passages = []
+    for _ in range(2):
+        previous_right, previous_speed, passage_skipped, band_count = _PASSAGE.unpack_from(state, offset)
+        offset += _PASSAGE.size
+        bands = []
+        for _ in range(band_count):
+            bands.append(_BAND.unpack_from(state, offset))
+            offset += _BAND.size
+        passages.append((previous_right, previous_speed, passage_skipped, bands))
+    entries = ([], [])
+    for types, spawns, count in ((OBSTACLE_TYPES, entries[0], obstacle_count),
+                                 (ITEM_TYPES, entries[1], item_count)):
+        for _ in range(count):
+            kind, size, first, second = _SPAWN.unpack_from(state, offset)
+            offset += _SPAWN.size
+            if kind == _NO_SPAWN:
+                spawns.append((None, None))
+            else:
+                spawns.append((types[kind], (first, second)[:size]))
+    rngs = []
+    for rng in (schedule.obstacle_rng, schedule.item_rng):
+        values = _RNG.unpack_from(state, offset)
+        offset += _RNG.size
+        gauss_next = values[-1]
+        rngs.append((rng, (3, values[:-1], None if math.isnan(gauss_next) else gauss_next)))
+    if offset != len(state):
+        raise ValueError("快照数据长度不正确")
+
+    schedule.speed = speed
+    schedule.resampled = resampled
+    schedule.skipped = skipped
+    schedule.dropped = dropped
+    for passage, (previous_right, previous_speed, passage_skipped, bands) in zip(
+            (schedule.obstacle_stream.passage, schedule.spawned), passages):
+        if math.isnan(previous_right):
+            passage.previous_right = passage.previous_speed = None
+        else:
+            passage.previous_right = previous_right
+            passage.previous_speed = previous_speed
+        passage.skipped = passage_skipped
+        passage.bands = bands
+    schedule.obstacles.clear()
+    schedule.obstacles.extend(entries[0])
+    schedule.items.clear()
+    schedule.items.extend(entries[1])
+    for rng, rng_state in rngs:
+        rng.setstate(rng_state)
+    schedule.revision += 1
+    _schedule_cache[schedule] = (schedule.revision, state)
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import timeit
+
+    from world import World
+
+    # 保存、恢复的用时和快照大小：python snapshot.py [种子]
+    world = World(rng=random.Random(int(sys.argv[1]) if len(sys.argv) > 1 else 0))
+    while world.frame < 600 and not world.game_over:
+        robot = world.robot
+        world.step(robot.y > 300 and robot.velocity > 0)
+    data = save(world)
+    count = 20000
+    print("%d 个障碍物、%d 个物品，快照 %d 字节" % (len(world.obstacles), len(world.items), len(data)))
+    print("保存 %.1f µs，恢复 %.1f µs" % (timeit.timeit(lambda: save(world), number=count) / count * 1e6,
+                                       timeit.timeit(lambda: restore(world, data), number=count) / count * 1e6))
@@ -0,0 +1,194 @@
+import pygame
+
+from settings import SCREEN_HEIGHT, WHITE, BLUE, RED, BLACK, ORANGE
+from entities import blade_table, exact_blade_offsets
+
+# 精灵缓存：每种实体的外观只用 pygame.draw 画一次，之后每帧直接 blit
+# 缓存按 (种类, 尺寸, 颜色, 变体) 索引，以后换皮肤只会多画一次
+
+# 透明色，游戏中不会用到的洋红色
+COLORKEY = (255, 0, 255)
+
+# 机器人精灵相对机器人左上角的偏移：天线在上方，护盾圈和加速火焰会超出机身
+ROBOT_MARGIN_LEFT = 32
+ROBOT_MARGIN_TOP = 22
+ROBOT_MARGIN_RIGHT = 12
+ROBOT_MARGIN_BOTTOM = 12
+
+# rle：用 RLE 加速透明色 blit；需要反复绘制或截取区域的表面不要开启，否则每次都会重新编码
+def _new_surface(width, height, rle=True):
+    surface = pygame.Surface((width, height))
+    surface.fill(COLORKEY)
+    surface.set_colorkey(COLORKEY, pygame.RLEACCEL if rle else 0)
+    return surface
+
+# 已经打开窗口时转换成显示格式，blit 更快
+def display_format(surface):
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    return surface
+
+# 以下绘制函数把实体画在 surface 的 (x, y) 处，与原来 show() 中的绘制完全相同
+
+def draw_robot(surface, x, y, width, height, color, shield, boost):
+    pygame.draw.rect(surface, color, (x, y, width, height))
+    # 绘制机器人眼睛
+    pygame.draw.circle(surface, WHITE, (x + 35, y + 15), 8)
+    pygame.draw.circle(surface, BLACK, (x + 35, y + 15), 4)
+    # 绘制机器人天线
+    pygame.draw.line(surface, BLACK, (x + 25, y), (x + 25, y - 15), 3)
+    pygame.draw.circle(surface, RED, (x + 25, y - 15), 5)
+
+    # 如果有护盾，绘制护盾效果
+    if shield:
+        pygame.draw.circle(surface, BLUE, (x + width//2, y + height//2), width//2 + 10, 3)
+
+    # 如果有加速，绘制加速效果
+    if boost:
+        for i in range(3):
+            offset = i * 5
+            pygame.draw.line(surface, ORANGE,
+                            (x - 10 - offset, y + height//4),
+                            (x - 20 - offset, y + height//2), 3)
+            pygame.draw.line(surface, ORANGE,
+                            (x - 10 - offset, y + 3*height//4),
+                            (x - 20 - offset, y + height//2), 3)
+
+def draw_reward(surface, x, y, width, height, color):
+    pygame.draw.rect(surface, color, (x, y, width, height))
+    pygame.draw.line(surface, WHITE, (x + 5, y + height//2), (x + width - 5, y + height//2), 2)
+    pygame.draw.line(surface, WHITE, (x + width//2, y + 5), (x + width//2, y + height - 5), 2)
+
+def draw_shield(surface, x, y, width, height, color):
+    pygame.draw.circle(surface, color, (int(x + width//2), int(y + height//2)), width//2)
+    pygame.draw.circle(surface, WHITE, (int(x + width//2), int(y + height//2)), width//2, 2)
+
+def draw_boost(surface, x, y, width, height, color):
+    # 绘制一个加速图标
+    pygame.draw.polygon(surface, color, [
+        (x, y + height//2),
+        (x + width, y),
+        (x + width, y + height)
+    ])
+
+def draw_life(surface, x, y, width, height, color):
+    # 绘制一个心形
+    pygame.draw.circle(surface, color, (int(x + width//3), int(y + height//3)), width//3)
+    pygame.draw.circle(surface, color, (int(x + 2*width//3), int(y + height//3)), width//3)
+    pygame.draw.polygon(surface, color, [
+        (x, y + height//3),
+        (x + width, y + height//3),
+        (x + width//2, y + height)
+    ])
+
+# 旋转障碍物：中心圆加上若干条叶片，offsets 为叶片末端相对中心的偏移，返回绘制区域
+def draw_spinner(surface, x, y, offsets, color):
+    rect = pygame.draw.circle(surface, color, (int(x), int(y)), 20)
+    for dx, dy in offsets:
+        rect.union_ip(pygame.draw.line(surface, color, (int(x), int(y)), (int(x + dx), int(y + dy)), 8))
+    return rect
+
+ITEM_DRAWERS = {
+    "reward": draw_reward,
+    "shield": draw_shield,
+    "boost": draw_boost,
+    "life": draw_life,
+}
+
+# 旋转障碍物的旋转图集：所有量化角度的画面排在一张精灵表里
+# 第 k 帧对应 entities.BladeTable 的第 k 个角度，和碰撞检测使用同一张偏移表。
+# 带透明色的 RLE 表面从大图中截取区域 blit 很慢，所以每帧再单独复制成一个小表面
+class SpinnerAtlas:
+    COLUMNS = 16
+
+    def __init__(self, steps, num_blades, blade_length, color):
+        self.table = blade_table(steps, num_blades, blade_length)
+        # 线宽 8，叶片末端向外多留一些
+        self.half = blade_length + 5
+        size = self.half * 2 + 1
+        rows = (steps + self.COLUMNS - 1) // self.COLUMNS
+        self.sheet = _new_surface(size * self.COLUMNS, size * rows, rle=False)
+        self.rects = []
+        for k, offsets in enumerate(self.table.offsets):
+            left = (k % self.COLUMNS) * size
+            top = (k // self.COLUMNS) * size
+            draw_spinner(self.sheet, left + self.half, top + self.half, offsets, color)
+            self.rects.append(pygame.Rect(left, top, size, size))
+
+        self.frames = []
+        for rect in self.rects:
+            frame = _new_surface(size, size)
+            frame.blit(self.sheet, (0, 0), rect)
+            self.frames.append(display_format(frame))
+
+    # 最接近 angle 的一帧，绘制位置为中心减去 half
+    def frame(self, angle):
+        return self.frames[self.table.index(angle)]
+
+class SpriteCache:
+    def __init__(self):
+        self.sprites = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key, build):
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            self.misses += 1
+            sprite = display_format(build())
+            self.sprites[key] = sprite
+        else:
+            self.hits += 1
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+    # 机器人：基础外观、护盾、加速以及两者同时存在的四种变体
+    # 绘制位置为 (robot.x - ROBOT_MARGIN_LEFT, robot.y - ROBOT_MARGIN_TOP)
+    def robot(self, width, height, color, shield, boost):
+        def build():
+            surface = _new_surface(ROBOT_MARGIN_LEFT + width + ROBOT_MARGIN_RIGHT,
+                                   ROBOT_MARGIN_TOP + height + ROBOT_MARGIN_BOTTOM)
+            draw_robot(surface, ROBOT_MARGIN_LEFT, ROBOT_MARGIN_TOP, width, height, color, shield, boost)
+            return surface
+        return self._get(("robot", width, height, color, shield, boost), build)
+
+    # 物品：kind 为 ITEM_DRAWERS 中的名字，绘制位置为物品左上角
+    def item(self, kind, width, height, color):
+        def build():
+            surface = _new_surface(width + 1, height + 1)
+            ITEM_DRAWERS[kind](surface, 0, 0, width, height, color)
+            return surface
+        return self._get(("item", kind, width, height, color), build)
+
+    def spinner_atlas(self, steps, num_blades, blade_length, color):
+        key = ("spinner", steps, num_blades, blade_length, color)
+        atlas = self.sprites.get(key)
+        if atlas is None:
+            self.misses += 1
+            atlas = self.sprites[key] = SpinnerAtlas(steps, num_blades, blade_length, color)
+        else:
+            self.hits += 1
+        return atlas
+
+    # 旋转障碍物角度为 0 时的画面，中心在 (half, half)，纹理后端按角度旋转绘制
+    def spinner(self, num_blades, blade_length, color):
+        def build():
+            half = blade_length + 5
+            surface = _new_surface(half * 2 + 1, half * 2 + 1)
+            draw_spinner(surface, half, half, exact_blade_offsets(0, num_blades, blade_length), color)
+            return surface
+        return self._get(("spinner_base", num_blades, blade_length, color), build)
+
+    # 纯色矩形块（移动障碍物）
+    def block(self, width, height, color):
+        def build():
+            surface = pygame.Surface((width, height))
+            surface.fill(color)
+            return surface
+        return self._get(("block", width, height, color), build)
+
+    # 管道条带：一条与屏幕等高的纯色条，任意高度的管道都从中截取一段
+    def strip(self, width, color):
+        return self.block(width, SCREEN_HEIGHT, color)
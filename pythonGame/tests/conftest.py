@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 测试不打开窗口、不播放声音
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# 游戏模块直接放在 pythonGame 目录下
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+import pygame
+
+from audio import Sounds
+
+
+class FakeChannel:
+    def __init__(self):
+        self.playing = []
+        self.busy = False
+
+    def get_busy(self):
+        return self.busy
+
+    def play(self, sound):
+        self.playing.append(sound)
+        self.busy = True
+
+
+# 不初始化混音器，直接放入假的声道和音效（与 _load() 加载完成后的状态相同）
+def fake_sounds(channels=2):
+    now = [0.0]
+    sounds = Sounds(clock=lambda: now[0])
+    sounds.channels = [FakeChannel() for _ in range(channels)]
+    sounds.channel_priority = [0] * channels
+    sounds.sounds = {name: name for name in sounds.files}
+    sounds.loaded.set()
+    return sounds, now
+
+
+def playbacks(sounds):
+    return [sound for channel in sounds.channels for sound in channel.playing]
+
+
+def test_duplicates_in_one_frame_play_once():
+    sounds, _ = fake_sounds()
+    for _ in range(3):
+        sounds.play("collect")
+    sounds.flush()
+    assert playbacks(sounds) == ["collect"]
+    assert sounds.coalesced == 2
+
+
+def test_throttled_within_interval():
+    sounds, now = fake_sounds(channels=4)
+    sounds.play("jump")
+    sounds.flush()
+    now[0] = sounds.intervals["jump"] / 2
+    sounds.play("jump")
+    sounds.flush()
+    assert playbacks(sounds) == ["jump"]
+    assert sounds.throttled == 1
+    now[0] = sounds.intervals["jump"] * 2
+    sounds.play("jump")
+    sounds.flush()
+    assert playbacks(sounds) == ["jump", "jump"]
+
+
+def test_game_over_preempts_jump_when_pool_full():
+    sounds, now = fake_sounds(channels=1)
+    sounds.play("jump")
+    sounds.flush()
+    now[0] = 1.0
+    # 声道还在播放跳跃：游戏结束先播放并抢占这个声道，之后优先级更低的 collect 没有声道可用，被丢弃
+    sounds.play("collect")
+    sounds.play("game_over")
+    sounds.flush()
+    assert sounds.channels[0].playing == ["jump", "game_over"]
+    assert sounds.preempted == 1
+    assert sounds.dropped == 1
+
+
+def test_silent_without_start():
+    sounds = Sounds()
+    sounds.play("jump")
+    sounds.flush()
+    assert sounds.stats()["played"] == 0
+
+
+def test_silent_without_mixer(monkeypatch):
+    def no_device():
+        raise pygame.error("没有音频设备")
+
+    monkeypatch.setattr(pygame.mixer, "get_init", lambda: None)
+    monkeypatch.setattr(pygame.mixer, "init", no_device)
+    sounds = Sounds()
+    sounds.start()
+    assert sounds.wait(5)
+    assert sounds.channels == [] and sounds.sounds == {}
+    sounds.play("game_over")
+    sounds.flush()
+    assert sounds.stats() == {"played": 0, "coalesced": 0, "throttled": 0, "dropped": 0, "preempted": 0}
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("pygame._sdl2.video")
+
+import backends
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_texture_matches_surface(seed):
+    results = backends.parity(seed)
+    assert [name for name, _, _ in results] == ["menu", "step 1", "step 120", "step 400", "game over"]
+    for name, fraction, largest in results:
+        assert fraction <= backends.PARITY_MAX_FRACTION, (name, fraction, largest)
+
+
+def test_compare_pixels():
+    import pygame
+
+    first = pygame.Surface((10, 10))
+    second = pygame.Surface((10, 10))
+    second.fill((2, 2, 2))
+    assert backends.compare_pixels(first, second) == (0.0, 2)
+    second.fill((200, 0, 0), (0, 0, 5, 2))
+    assert backends.compare_pixels(first, second) == (0.1, 200)
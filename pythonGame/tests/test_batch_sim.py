@@ -0,0 +1,12 @@
+import batch_sim
+
+
+def test_matches_world():
+    assert batch_sim.verify(range(50)) == []
+
+
+def test_per_game_params():
+    # 每局一个值的参数按种子拆开交给 World
+    assert batch_sim.verify(range(20), obstacle_speed=[3, 5] * 10) == []
+    assert batch_sim.verify(range(20), spawn_rate=[100, 140] * 10,
+                            level_threshold=[5, 20] * 10, item_rate=[150, 200] * 10) == []
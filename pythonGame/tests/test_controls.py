@@ -0,0 +1,35 @@
+import pygame
+
+from controls import Controls, LatencyStats
+
+
+def test_latency_stats():
+    stats = LatencyStats(window=4)
+    assert stats.summary() is None
+    for seconds in (0.010, 0.020, 0.030, 0.040, 0.050):
+        stats.add(seconds)
+    summary = stats.summary()
+    assert summary["count"] == 5
+    assert summary["max_ms"] == 50
+    assert abs(summary["mean_ms"] - 35) < 1e-9
+
+
+def test_press_to_present_estimate():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    now = [1.0]
+    controls = Controls(clock=lambda: now[0]).start()
+    controls.poll()
+    # 按键发生在 1.000 和 1.016 两次取事件之间，按中点 1.008 估计
+    now[0] = 1.016
+    controls.poll()
+    controls.press()
+    now[0] = 1.017
+    assert controls.take_jump()
+    assert not controls.take_jump()
+    now[0] = 1.024
+    controls.presented()
+    latency = controls.latency()
+    assert abs(latency["step"]["mean_ms"] - 1) < 1e-6
+    assert abs(latency["photon"]["mean_ms"] - 16) < 1e-6
+    pygame.display.quit()
@@ -0,0 +1,66 @@
+import math
+
+import pytest
+
+import entities
+
+EPSILON = 1e-9
+
+
+def test_blade_quantization():
+    # 128 步时叶片末端误差不到 2 像素，靠近旋转障碍物的碰撞结果不一致的不到 1%
+    max_error, mismatch = entities.validate_blade_quantization(samples=5000)
+    assert max_error < 2
+    assert mismatch < 0.01
+
+
+def test_more_steps_smaller_error():
+    coarse, _ = entities.validate_blade_quantization(steps=32, samples=1)
+    fine, _ = entities.validate_blade_quantization(steps=256, samples=1)
+    assert fine < coarse
+
+
+# 矩形 [0, 10] × [0, 10]
+@pytest.mark.parametrize("segment, radius, expected", [
+    # 线段穿过矩形
+    (((-20, 5), (30, 5)), 1, True),
+    (((-5, -5), (15, 15)), 1, True),
+    # 端点在矩形内，包括退化成一个点的线段
+    (((5, 5), (50, 50)), 1, True),
+    (((5, 5), (5, 5)), 1, True),
+    # 与右边正好相距 radius：不算相交；近 ε 时相交，远 ε 时不相交
+    (((14, -20), (14, 30)), 4, False),
+    (((14 - EPSILON, -20), (14 - EPSILON, 30)), 4, True),
+    (((14 + EPSILON, -20), (14 + EPSILON, 30)), 4, False),
+    # 端点离矩形的角正好 5
+    (((13, 14), (30, 40)), 5, False),
+    (((13, 14), (30, 40)), 5 + EPSILON, True),
+    # 斜线段从角旁边经过，最近点在线段中间：与角 (10, 10) 相距 5 / √2 ≈ 3.536
+    (((25, 0), (0, 25)), 3.6, True),
+    (((25, 0), (0, 25)), 3.5, False),
+])
+def test_capsule_hits_rect(segment, radius, expected):
+    (x1, y1), (x2, y2) = segment
+    assert entities.capsule_hits_rect(x1, y1, x2, y2, radius, 0, 0, 10, 10) is expected
+    # 线段方向反过来结果相同
+    assert entities.capsule_hits_rect(x2, y2, x1, y1, radius, 0, 0, 10, 10) is expected
+
+
+class UnsweptSpinner(entities.SpinningObstacle):
+    swept = False
+
+
+def test_swept_blade_through_robot():
+    # 一片叶片竖直向上，障碍物一步移动 70 像素，从机器人右边 10 像素处移到左边 10 像素处，
+    # 两个位置都碰不到机器人，叶片在这一步中间扫过机器人
+    robot = entities.Robot()
+    for cls, expected in ((entities.SpinningObstacle, True), (UnsweptSpinner, False)):
+        spinner = cls(70, placement=(300,))
+        spinner.angle = 3 * math.pi / 2
+        robot.y = robot.prev_y = spinner.center_y - 75
+        spinner.prev_x = robot.x + robot.width + 10
+        spinner.x = robot.x - 10
+        offsets = entities.blade_offsets(spinner.angle, spinner.num_blades, spinner.blade_length, spinner.angle_steps)
+        for x in (spinner.prev_x, spinner.x):
+            assert not spinner.hit_at(robot.x, robot.y, robot, x, offsets)
+        assert spinner.hit(robot) is expected
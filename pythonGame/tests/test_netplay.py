@@ -0,0 +1,79 @@
+import random
+
+import snapshot
+from netplay import (Relay, RaceSession, UdpTransport, hover, MSG_HELLO, MSG_START, _HELLO, _START)
+from settings import NET_MAX_ROLLBACK
+
+
+# 模拟的时钟，每一步前进 1/60 秒，中继服务器的延迟按它计算
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# 两个玩家连接到本机的中继服务器，返回 [(transport, 种子, 玩家编号)]，按玩家编号排序
+def pair(relay):
+    transports = [UdpTransport(("127.0.0.1", 0), relay.address) for _ in range(2)]
+    started = {}
+    for _ in range(500):
+        for transport in transports:
+            if transport not in started:
+                transport.send(_HELLO.pack(MSG_HELLO))
+        relay.transport.wait(0.002)
+        relay.poll()
+        for transport in transports:
+            transport.wait(0.002)
+            for data, _ in transport.receive():
+                if len(data) == _START.size and data[0] == MSG_START:
+                    _, seed, player = _START.unpack(data)
+                    started[transport] = (transport, seed, player)
+        if len(started) == 2:
+            return sorted(started.values(), key=lambda start: start[2])
+    raise TimeoutError("没有完成配对")
+
+
+def test_race_over_relay_converges():
+    clock = FakeClock()
+    # 延迟 4 步、丢包 10%：对方的输入总是晚到，经常要回滚，丢失的输入由之后的消息补上
+    relay = Relay(("127.0.0.1", 0), delay=4 / 60, loss=0.1, seed=3, clock=clock)
+    starts = pair(relay)
+    sessions = [RaceSession(transport, seed, player, clock=clock, obstacle_speed=5, spawn_rate=80)
+                for transport, seed, player in starts]
+    # 悬停之外随机多跳几次：对方预测的是不跳跃，这些输入都与预测不同
+    rngs = [random.Random(player) for player in range(2)]
+    heights = [300, 220]
+
+    for _ in range(20000):
+        if all(session.done for session in sessions):
+            break
+        clock.now += 1 / 60
+        relay.poll()
+        for session, rng, height in zip(sessions, rngs, heights):
+            session.transport.wait(0.0005)
+            session.poll()
+            if session.can_advance():
+                local = session.local
+                session.advance(not local.game_over and (hover(local, height) or rng.random() < 0.05))
+            else:
+                session.stalls += 1
+                session.send()
+    else:
+        raise AssertionError("对战没有结束")
+
+    first, second = sessions
+    # 两边对同一局的模拟逐位相同
+    assert snapshot.save(first.local) == snapshot.save(second.remote.world)
+    assert snapshot.save(second.local) == snapshot.save(first.remote.world)
+    assert first.winner() == second.winner()
+    for session in sessions:
+        stats = session.stats()
+        assert stats["rollbacks"] > 0
+        assert stats["max_depth"] <= NET_MAX_ROLLBACK
+    assert relay.dropped > 0
+
+    relay.close()
+    for session in sessions:
+        session.transport.close()
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from replay import Replay, play, verify
+from world import World
+
+
+# 用简单的策略玩一局（机器人下落到屏幕下半部分时跳跃），返回录下的回放
+def record_game(seed, max_steps=3000):
+    replay = Replay(seed)
+    world = World(rng=random.Random(seed))
+    while not world.game_over and replay.steps < max_steps:
+        jump = world.robot.y > 300 and world.robot.velocity > 0
+        replay.record(jump)
+        world.step(jump)
+    replay.finish(world)
+    return replay
+
+
+@pytest.mark.parametrize("seed", [0, 1, 42])
+def test_verify_recorded_game(seed):
+    replay = record_game(seed)
+    assert replay.jumps
+    assert verify(Replay.from_bytes(replay.to_bytes()))
+
+
+def test_verify_detects_changes():
+    replay = record_game(7)
+    wrong_score = Replay(replay.seed, replay.jumps, replay.steps, replay.score + 1)
+    assert not verify(wrong_score)
+    # 少一次跳跃会改变这一局的走向
+    changed = Replay(replay.seed, replay.jumps[1:], replay.steps, replay.score)
+    assert play(changed).robot.y != play(replay).robot.y
+
+
+def test_from_bytes_rejects_bad_data():
+    data = record_game(3).to_bytes()
+    with pytest.raises(ValueError):
+        Replay.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b"XXXX" + data[4:])
@@ -0,0 +1,22 @@
+import pytest
+
+from scaling import layout, internal_size
+
+
+@pytest.mark.parametrize("window, scale, expected", [
+    # 整数倍正好铺满或黑边不大时用整数倍
+    ((1920, 1080), 0.6, (240, 0, 1440, 1080)),
+    ((1920, 1080), 0.75, (360, 90, 1200, 900)),
+    ((1600, 1200), 1, (0, 0, 1600, 1200)),
+    # 只能放下 1 倍、黑边太大时按比例铺满
+    ((800, 600), 0.6, (0, 0, 800, 600)),
+    ((1920, 1080), 1, (240, 0, 1440, 1080)),
+    # 窗口比内部画面小时按比例缩小
+    ((640, 480), 1, (0, 0, 640, 480)),
+])
+def test_integer_layout(window, scale, expected):
+    assert tuple(layout(window, internal_size(scale), "integer")) == expected
+
+
+def test_fill_layout():
+    assert tuple(layout((1920, 1080), internal_size(0.75), "nearest")) == (240, 0, 1440, 1080)
@@ -0,0 +1,92 @@
+import random
+
+from entities import Robot, PipeObstacle
+from schedule import SpawnSchedule, gap_frames
+from world import OBSTACLE_TYPES, OBSTACLE_WEIGHTS, ITEM_TYPES, ITEM_WEIGHTS
+
+
+def test_gap_equal_speeds_without_boost():
+    robot = Robot()
+    robot.boost_speed = 0
+    # 速度相同、没有加速时两者之间的距离不变：间隔加上边缘之间的距离按速度换算
+    frames = gap_frames(850, 4, 800, 4, 60, robot)
+    assert frames == 60 + (800 - 850 - robot.width) / 4
+
+
+def test_gap_shrinks_with_faster_next_obstacle_and_boost():
+    robot = Robot()
+    robot.boost_speed = 0
+    same = gap_frames(850, 8, 800, 8, 60, robot)
+    faster = gap_frames(850, 8, 800, 8.5, 60, robot)
+    assert faster < same
+    robot.boost_speed = 2
+    assert gap_frames(850, 8, 800, 8.5, 60, robot) < faster
+
+
+def test_entries_rechecked_at_spawn_speed():
+    # 缓冲区中的条目按速度 3 检查，生成时速度已经是 5：不能通过的条目取出时留空
+    dropped = 0
+    for seed in range(50):
+        schedule = SpawnSchedule(random.Random(seed), OBSTACLE_TYPES, OBSTACLE_WEIGHTS, ITEM_TYPES, ITEM_WEIGHTS,
+                                 3, 60, first=PipeObstacle)
+        spawned = [schedule.next_obstacle(3)] + [schedule.next_obstacle(5) for _ in range(8)]
+        assert sum(cls is None for cls, _ in spawned) >= schedule.dropped
+        dropped += schedule.dropped
+    assert dropped > 0
+
+
+# 机器人从 y 以速度 velocity 出发，按 plan 逐步跳跃或不跳，用真实的 Robot 物理模拟
+def fly(y, velocity, plan):
+    robot = Robot()
+    robot.y = y
+    robot.velocity = velocity
+    for jump in plan:
+        if jump:
+            robot.jump()
+        robot.update()
+    return robot.y
+
+
+# 候选的操作：先一直跳跃 j 步再下落，或者先下落 j 步、跳一次再下落
+def plans(frames):
+    for j in range(frames + 1):
+        yield [True] * j + [False] * (frames - j)
+        if j < frames:
+            yield [False] * j + [True] + [False] * (frames - j - 1)
+
+
+# 从 start 中的某个状态出发 frames 步之后能否到达 target 中的高度：
+# 范围中的高度按最不利的速度 lift 出发，下边缘按记录的速度 fall 出发
+def reachable(start, frames, target):
+    low, high = target
+    for plan in plans(frames):
+        lift = Robot().lift
+        shift = fly(300, lift, plan) - 300
+        for band_low, band_high, fall in start:
+            y = min(max((low + high) / 2 - shift, band_low), band_high)
+            if low <= fly(y, lift, plan) <= high or low <= fly(band_high, fall, plan) <= high:
+                return True
+    return False
+
+
+def test_accepted_pipe_transitions_are_reachable():
+    # 只有管道、速度每次生成提高 0.5：每一对相邻的管道，经过上一个时机器人所在的高度范围内都有一条路线，
+    # 用真实的物理逐步模拟能够进入下一个管道可以通过的每个高度范围
+    checked = 0
+    for seed in range(20):
+        schedule = SpawnSchedule(random.Random(seed), [PipeObstacle], [1], ITEM_TYPES, ITEM_WEIGHTS,
+                                 3, 60, first=PipeObstacle)
+        spawned = schedule.spawned
+        speed = 3
+        for _ in range(30):
+            start, previous_right, previous_speed = spawned.bands, spawned.previous_right, spawned.previous_speed
+            follows = previous_right is not None and spawned.skipped == 0
+            cls, placement = schedule.next_obstacle(speed)
+            if cls is not None and follows:
+                pipe = PipeObstacle(speed, placement=placement)
+                frames = gap_frames(previous_right, previous_speed, pipe.x, speed, 60, schedule.robot)
+                for low, high, _ in spawned.bands:
+                    assert reachable(start, max(0, int(frames)), (low, high))
+                    checked += 1
+            speed += 0.5
+    assert checked > 400
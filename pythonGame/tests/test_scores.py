@@ -0,0 +1,29 @@
+from scores import ScoreStore
+
+
+def run(score):
+    return {"time": 0.0, "seed": 1, "score": score, "level": 1, "steps": 60, "duration": 1.0,
+            "items": 2, "death": "PipeObstacle"}
+
+
+def test_not_started():
+    # 没有启动写入线程时查询立即返回空结果
+    store = ScoreStore(None)
+    store.record(run(5))
+    assert store.top() == []
+    assert store.rank(5) == 1
+    assert store.summary()["runs"] == 0
+    store.close()
+
+
+def test_record_and_query(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db")).start()
+    for score in (3, 9, 5):
+        store.record(run(score))
+    store.flush()
+    assert [entry["score"] for entry in store.top(2)] == [9, 5]
+    assert store.rank(6) == 2
+    summary = store.summary()
+    assert summary["runs"] == 3 and summary["best"] == 9
+    assert summary["deaths"] == {"PipeObstacle": 3}
+    store.close()
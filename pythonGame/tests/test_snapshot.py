@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+import snapshot
+from pool import EntityPool
+from world import World
+
+
+def make_world(seed, pool=None):
+    return World(rng=random.Random(seed), obstacle_speed=4, spawn_rate=80, pool=pool)
+
+
+# 随机的输入，跳跃得比较频繁，障碍物和物品都会碰到
+def make_inputs(seed, steps):
+    rng = random.Random(seed)
+    return [rng.random() < 0.08 for _ in range(steps)]
+
+
+# 事件中的实体（被收集的物品）换成种类，不同 World 中的对象才能比较
+def plain(events):
+    return [tuple(type(value).__name__ if hasattr(value, "reset") else value for value in event)
+            for event in events]
+
+
+# 逐步模拟，返回每一步之后的快照和事件
+def run(world, inputs):
+    trace = []
+    for jump in inputs:
+        if world.game_over:
+            break
+        events = world.step(jump)
+        trace.append((snapshot.save(world), plain(events)))
+    return trace
+
+
+@pytest.mark.parametrize("seed", [0, 3, 11])
+def test_round_trip_resimulates_identically(seed):
+    inputs = make_inputs(seed, 1500)
+    world = make_world(seed)
+    run(world, inputs[:400])
+    data = snapshot.save(world)
+    expected = run(world, inputs[400:])
+
+    # 恢复到同一个 World（回滚）和用相同参数新建的 World，之后的每一步都与原来逐位相同
+    snapshot.restore(world, data)
+    assert snapshot.save(world) == data
+    assert run(world, inputs[400:]) == expected
+
+    fresh = make_world(seed)
+    snapshot.restore(fresh, data)
+    assert snapshot.save(fresh) == data
+    assert run(fresh, inputs[400:]) == expected
+
+
+def test_restore_into_world_with_different_entities():
+    seed = 5
+    inputs = make_inputs(seed, 1200)
+    source = make_world(seed)
+    run(source, inputs[:300])
+    data = snapshot.save(source)
+    expected = run(source, inputs[300:])
+
+    # 目标 World 用另一个种子模拟到别的步数：障碍物、物品和对象池中空闲对象的数量都与源不同
+    for other_seed, steps in ((seed + 1, 900), (seed + 2, 40)):
+        pool = EntityPool()
+        target = make_world(other_seed, pool)
+        run(target, make_inputs(other_seed, steps))
+        counts = (len(target.obstacles), len(target.items))
+        snapshot.restore(target, data)
+        assert counts != (len(target.obstacles), len(target.items))
+        assert snapshot.save(target) == data
+        assert run(target, inputs[300:]) == expected
+        # 放回对象池的实体没有泄漏：正在使用的数量与 World 中的实体一致
+        assert sum(pool.live.values()) == len(target.obstacles) + len(target.items)
+
+
+def test_restore_rejects_bad_data():
+    world = make_world(0)
+    data = snapshot.save(world)
+    with pytest.raises(ValueError):
+        snapshot.restore(world, b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        snapshot.restore(world, data[:4] + bytes([snapshot.VERSION + 1]) + data[5:])
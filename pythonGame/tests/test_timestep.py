@@ -0,0 +1,20 @@
+import pytest
+
+from timestep import FixedTimestep, SIM_RATE
+
+
+def test_steps_follow_sim_rate_not_display_rate():
+    for fps in (30, 60, 144):
+        now = [0.0]
+        timestep = FixedTimestep(clock=lambda: now[0])
+        for frame in range(fps * 2):
+            now[0] = frame / fps
+            timestep.advance()
+        # 最后一帧在 2 秒之前一帧，加上浮点误差，最多差两步
+        assert abs(timestep.steps - 2 * SIM_RATE) <= 2
+
+
+def test_rate_is_not_configurable():
+    # 计时器、速度都按每秒 SIM_RATE 步定义，其他频率会改变游戏速度
+    with pytest.raises(TypeError):
+        FixedTimestep(rate=120)
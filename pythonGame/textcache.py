@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+import pygame
+
+# 文字渲染缓存
+# font.render 每次都要重新光栅化文字，是菜单和结算界面里最耗时的部分。
+# 这里缓存字体对象和渲染结果（LRU），频繁变化的数字按单个数字字形拼接，
+# 分数从 0 涨到 9999 也只需要渲染十个数字字形
+
+_fonts = {}
+
+# 缓存的 SysFont，相同参数只创建一次
+def get_font(name, size, bold=False, italic=False):
+    key = (name, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold, italic)
+    return font
+
+class TextCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surfaces = self.surfaces
+        surface = surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        surfaces[key] = surface
+        if len(surfaces) > self.maxsize:
+            surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    # 绘制文字，返回绘制区域
+    def draw(self, surface, font, text, color, pos, antialias=True):
+        return surface.blit(self.render(font, text, color, antialias), pos)
+
+    # 水平居中绘制文字，返回绘制区域
+    def draw_centered(self, surface, font, text, color, center_x, y, antialias=True):
+        text_surface = self.render(font, text, color, antialias)
+        return surface.blit(text_surface, (center_x - text_surface.get_width()//2, y))
+
+    def number_width(self, font, prefix, value, suffix, color, antialias=True):
+        width = self.render(font, prefix, color, antialias).get_width() if prefix else 0
+        for digit in str(value):
+            width += self.render(font, digit, color, antialias).get_width()
+        if suffix:
+            width += self.render(font, suffix, color, antialias).get_width()
+        return width
+
+    # 绘制 "前缀 + 数字 + 后缀"：前后缀整体缓存，数字逐个字形拼接，返回绘制区域
+    def draw_number(self, surface, font, prefix, value, suffix, color, pos, antialias=True):
+        x, y = pos
+        rect = pygame.Rect(x, y, 0, 0)
+        parts = [prefix] if prefix else []
+        parts.extend(str(value))
+        if suffix:
+            parts.append(suffix)
+        for part in parts:
+            glyph = self.render(font, part, color, antialias)
+            rect.union_ip(surface.blit(glyph, (x, y)))
+            x += glyph.get_width()
+        return rect
+
+    def draw_number_centered(self, surface, font, prefix, value, suffix, color, center_x, y, antialias=True):
+        width = self.number_width(font, prefix, value, suffix, color, antialias)
+        return self.draw_number(surface, font, prefix, value, suffix, color, (center_x - width//2, y), antialias)
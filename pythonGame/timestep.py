@@ -0,0 +1,50 @@
+import time
+
+from settings import MAX_STEPS_PER_FRAME
+
+# 模拟频率（步每秒）。所有计时器、速度、重力和生成间隔都以步为单位，按每秒 60 步设计，
+# 批量模拟、回放和联机也都依赖同样的步长，所以这不是可以调整的设置
+SIM_RATE = 60
+
+# 固定时间步长：模拟总是以 SIM_RATE 步每秒推进，与显示帧率无关
+# 每个显示帧把经过的真实时间累加起来，够一步就推进一步，剩下不足一步的部分
+# 留到下一帧，并作为插值系数 alpha（0~1）交给渲染器在上一步和当前步之间插值
+class FixedTimestep:
+    # max_steps：一帧最多补多少步，机器太慢时丢弃多出的时间，避免越补越慢
+    def __init__(self, max_steps=MAX_STEPS_PER_FRAME, clock=time.perf_counter):
+        self.dt = 1.0 / SIM_RATE
+        self.max_steps = max_steps
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+        self.steps = 0
+        # 因为超过 max_steps 而丢弃的步数
+        self.dropped = 0
+
+    # 重新开始计时（例如切换状态或暂停之后），下一帧立即推进一步
+    def reset(self):
+        self.last = None
+
+    # 返回这一帧需要推进的步数
+    def advance(self):
+        now = self.clock()
+        if self.last is None:
+            self.accumulator = self.dt
+        else:
+            self.accumulator += now - self.last
+        self.last = now
+
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            self.dropped += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt
+        self.steps += steps
+        return steps
+
+    # 当前显示时刻位于上一步和下一步之间的位置
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)
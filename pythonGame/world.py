@@ -0,0 +1,216 @@
+import random
+import time
+
+from settings import SCREEN_HEIGHT
+from entities import Robot, PipeObstacle, MovingObstacle, SpinningObstacle, Reward, Shield, Boost, Life
+from pool import EntityPool
+from schedule import SpawnSchedule
+
+# 无界面的游戏模拟核心
+# World 拥有机器人、障碍物、物品、分数、等级和生成逻辑，不依赖显示窗口，
+# 每次 step() 推进一帧并返回这一帧发生的事件，音效和粒子由界面层根据事件处理
+
+# 事件类型
+EVENT_JUMP = "jump"            # ("jump",)
+EVENT_HIT = "hit"              # ("hit", x, y, lost_life, obstacle_type)
+EVENT_GAME_OVER = "game_over"  # ("game_over",)
+EVENT_PASS = "pass"            # ("pass", x, y)
+EVENT_COLLECT = "collect"      # ("collect", x, y, color, item)，item 已放回对象池，只在本步有效
+EVENT_POWER_UP = "power_up"    # ("power_up",)
+
+# 默认的生成概率，平衡测试时可以在创建 World 时替换
+OBSTACLE_TYPES = [PipeObstacle, MovingObstacle, SpinningObstacle]
+OBSTACLE_WEIGHTS = [0.5, 0.3, 0.2]
+ITEM_TYPES = [Reward, Shield, Boost, Life]
+ITEM_WEIGHTS = [0.6, 0.2, 0.15, 0.05]
+
+# spawn_rate 随等级降低后的最小值，与 step() 中的规则一致
+def min_spawn_rate(spawn_rate):
+    while spawn_rate > 60:
+        spawn_rate -= 10
+    return spawn_rate
+
+# pool：障碍物和物品的对象池，多局游戏可以共用一个
+class World:
+    def __init__(self, rng=random, obstacle_speed=3, spawn_rate=120, level_threshold=10,
+                 item_rate=180, obstacle_weights=OBSTACLE_WEIGHTS, item_weights=ITEM_WEIGHTS, pool=None):
+        self.rng = rng
+        self.pool = pool if pool is not None else EntityPool()
+        self.level_threshold = level_threshold
+        self.item_rate = item_rate
+        self.obstacle_weights = obstacle_weights
+        self.item_weights = item_weights
+
+        self.robot = Robot()
+        self.obstacle_speed = obstacle_speed
+        self.spawn_rate = spawn_rate  # 帧数
+        # 障碍物和物品的种类、位置由生成计划提前生成，第一个障碍物总是管道
+        self.schedule = SpawnSchedule(rng, OBSTACLE_TYPES, obstacle_weights, ITEM_TYPES, item_weights,
+                                      obstacle_speed, min_spawn_rate(spawn_rate), first=PipeObstacle)
+        obstacle_type, placement = self.schedule.next_obstacle(obstacle_speed)
+        self.obstacles = [self.pool.acquire(obstacle_type, obstacle_speed, rng, placement)]
+        # 下一次生成障碍物和物品的步数
+        self.next_obstacle_frame = spawn_rate
+        self.next_item_frame = item_rate
+        self.items = []
+        self.frame = 0
+        self.score = 0
+        self.level = 1
+        self.game_over = False
+
+        # 碰撞检测统计：粗检测的实体数和实际进行精确检测（hit()/collect()）的次数
+        self.broad_checks = 0
+        self.narrow_checks = 0
+        # 碰撞阶段（碰撞检测、计分和移除）累计用时（秒），用于性能分析
+        self.collision_time = 0.0
+
+    def step(self, jump=False):
+        events = []
+        robot = self.robot
+        rng = self.rng
+
+        if jump:
+            robot.jump()
+            events.append((EVENT_JUMP,))
+
+        self.frame += 1
+
+        # 难度随分数提高
+        current_level = 1 + self.score // self.level_threshold
+        if current_level > self.level:
+            self.level = current_level
+            self.obstacle_speed += 0.5
+            if self.spawn_rate > 60:
+                self.spawn_rate -= 10
+
+        # 生成障碍物：间隔为生成时的 spawn_rate
+        if self.frame == self.next_obstacle_frame:
+            self.next_obstacle_frame += self.spawn_rate
+            obstacle_type, placement = self.schedule.next_obstacle(self.obstacle_speed)
+            if obstacle_type is not None:
+                self.obstacles.append(self.pool.acquire(obstacle_type, self.obstacle_speed, rng, placement))
+
+        # 生成物品
+        if self.frame == self.next_item_frame:
+            self.next_item_frame += self.item_rate
+            item_type, placement = self.schedule.next_item()
+            self.items.append(self.pool.acquire(item_type, rng, placement))
+
+        # 更新机器人
+        robot.update()
+
+        # 计算加速值
+        boost_speed = robot.boost_speed if robot.boost_active else 0
+
+        # 先移动所有障碍物和物品，再统一做碰撞检测：
+        # 移动只取决于实体自己和 boost_speed，所以结果与逐个"移动后检测"完全相同
+        obstacles = self.obstacles
+        items = self.items
+        for obstacle in obstacles:
+            obstacle.update(boost_speed)
+        for item in items:
+            item.update(boost_speed)
+        collision_start = time.perf_counter()
+
+        # 粗检测：所有实体都向左移动而机器人只上下移动，
+        # 只有水平范围与机器人重叠的实体才需要做精确的碰撞检测
+        robot_left = robot.x
+        robot_right = robot.x + robot.width
+        broad_checks = len(obstacles) + len(items)
+        narrow_checks = 0
+
+        # 障碍物：留下的按原来的顺序原地前移，移除的放回对象池
+        kept = 0
+        for obstacle in obstacles:
+            # 检查碰撞
+            left, right = obstacle.x_extent(robot)
+            if left <= robot_right and right >= robot_left:
+                narrow_checks += 1
+                hit = obstacle.hit(robot)
+            else:
+                hit = False
+            if hit:
+                lives = robot.lives
+                game_over = robot.hit()
+                events.append((EVENT_HIT, robot.x + robot.width//2, robot.y + robot.height//2,
+                               robot.lives < lives, type(obstacle)))
+
+                if game_over:
+                    self.game_over = True
+                    events.append((EVENT_GAME_OVER,))
+
+            # 检查是否通过障碍物
+            if obstacle.pass_robot(robot):
+                self.score += 1
+                events.append((EVENT_PASS, obstacle.x, SCREEN_HEIGHT//2))
+
+            # 移除屏幕外的障碍物
+            if obstacle.offscreen():
+                self.pool.release(obstacle)
+            else:
+                obstacles[kept] = obstacle
+                kept += 1
+        del obstacles[kept:]
+
+        # 物品
+        kept = 0
+        for item in items:
+            # 检查是否收集物品
+            left, right = item.x_extent(robot)
+            if left <= robot_right and right >= robot_left:
+                narrow_checks += 1
+                collected = item.collect(robot)
+            else:
+                collected = False
+            if collected:
+                events.append((EVENT_COLLECT, item.x, item.y, item.color, item))
+
+                # 根据物品类型执行对应效果
+                if isinstance(item, Reward):
+                    self.score += 5
+                elif isinstance(item, Shield):
+                    robot.activate_shield()
+                    events.append((EVENT_POWER_UP,))
+                elif isinstance(item, Boost):
+                    robot.activate_boost()
+                    events.append((EVENT_POWER_UP,))
+                elif isinstance(item, Life):
+                    robot.lives += 1
+
+                self.pool.release(item)
+
+            # 移除屏幕外的物品
+            elif item.offscreen():
+                self.pool.release(item)
+            else:
+                items[kept] = item
+                kept += 1
+        del items[kept:]
+
+        self.broad_checks += broad_checks
+        self.narrow_checks += narrow_checks
+        self.collision_time += time.perf_counter() - collision_start
+        return events
+
+    # 把剩下的障碍物和物品放回对象池，之后不再使用这个 World
+    def release_entities(self):
+        for entity in self.obstacles:
+            self.pool.release(entity)
+        for entity in self.items:
+            self.pool.release(entity)
+        self.obstacles.clear()
+        self.items.clear()
+
+    # 按 stats() 中的最高值预先创建对象：每种障碍物 obstacles 个，每种物品 items 个
+    def reserve(self, obstacles, items):
+        rng = random.Random(0)
+        for obstacle_type in OBSTACLE_TYPES:
+            self.pool.reserve(obstacle_type, obstacles, self.obstacle_speed, rng)
+        for item_type in ITEM_TYPES:
+            self.pool.reserve(item_type, items, rng)
+
+    def collision_stats(self):
+        return {
+            "broad_checks": self.broad_checks,
+            "narrow_checks": self.narrow_checks,
+        }